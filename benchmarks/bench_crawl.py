@@ -0,0 +1,259 @@
+"""
+Benchmark the crawl and PDF rendering against local stand-ins for Jina and Gemini.
+
+Synthetic lesson sites are served by a FakeJinaReader running in its own
+process, and Gemini is replaced by FakeGemini. Each combination of
+concurrency setting and site size runs in a fresh process, so its peak RSS
+is its own. Reports articles/sec, per-article latency (fetch start to
+translated article) and peak RSS.
+
+Usage:
+    python -m benchmarks.bench_crawl [--concurrency 4x2,8x4,16x8] [--pages 2,8]
+        [--jina-latency lognormal:0.2:0.5] [--gemini-latency lognormal:1.0:0.4]
+        [--jina-error-rate 0.01] [--gemini-rate-limit-rate 0.05] [--json results.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_services import FakeGemini, FakeJinaReader, LatencyDistribution, build_sites
+from src import config, scraper
+from src.llm_scheduler import LLMScheduler
+from src.markdown_preprocessor import MarkdownPreprocessor
+from src.metrics import metrics, percentile
+from src.pdf_generator import fonts_available, generate_pdf
+
+
+@dataclass
+class BenchSettings:
+    """One benchmark run: site shape, fault injection and crawl settings."""
+    sites: int = 2
+    pages: int = 2
+    articles_per_page: int = 10
+    paragraphs: int = 8
+    jina_latency: str = "lognormal:0.2:0.5"
+    jina_error_rate: float = 0.0
+    jina_rate_limit_rate: float = 0.0
+    gemini_latency: str = "lognormal:1.0:0.4"
+    gemini_error_rate: float = 0.0
+    gemini_rate_limit_rate: float = 0.0
+    gemini_requests_per_minute: float = 100_000
+    gemini_retry_base_delay: float = 0.1
+    fetch_concurrency: int = config.FETCH_CONCURRENCY
+    llm_concurrency: int = config.LLM_CONCURRENCY
+    render_pdf: bool = True
+    render_workers: int = 1
+    seed: int = 0
+
+
+def parse_concurrency(spec: str) -> List[Tuple[int, int]]:
+    """
+    Parse "FETCHxLLM[,FETCHxLLM...]" into (fetch, llm) concurrency pairs.
+
+    Raises:
+        ValueError: If a pair is malformed or below 1.
+    """
+    pairs = []
+    for item in spec.split(','):
+        try:
+            fetch, llm = (int(value) for value in item.lower().split('x'))
+        except ValueError:
+            raise ValueError(f"Invalid concurrency setting: {item}") from None
+        if fetch < 1 or llm < 1:
+            raise ValueError(f"Invalid concurrency setting: {item}")
+        pairs.append((fetch, llm))
+    return pairs
+
+
+def peak_rss_bytes() -> int:
+    """Return this process's peak resident set size."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+async def run_crawl(settings: BenchSettings, jina_prefix: str) -> Dict[str, Any]:
+    """
+    Crawl the synthetic sites served at jina_prefix and optionally render the PDF.
+
+    Uses the same preprocessing as main.py, without any page or Gemini
+    caches. Returns the measurements of the run.
+    """
+    sites = build_sites(settings.sites, settings.pages, settings.articles_per_page, settings.paragraphs)
+    gemini = FakeGemini(
+        LatencyDistribution.parse(settings.gemini_latency),
+        error_rate=settings.gemini_error_rate,
+        rate_limit_rate=settings.gemini_rate_limit_rate,
+        seed=settings.seed,
+    )
+    previous_prefix = config.JINA_AI_PREFIX
+    config.JINA_AI_PREFIX = jina_prefix
+    scheduler = LLMScheduler(
+        gemini.generate,
+        requests_per_minute=settings.gemini_requests_per_minute,
+        base_delay=settings.gemini_retry_base_delay,
+    )
+    metrics.enable()
+    try:
+        started = time.perf_counter()
+        articles, _ = await scraper.crawl(
+            [site.seed_url for site in sites],
+            fetch_concurrency=settings.fetch_concurrency,
+            llm_concurrency=settings.llm_concurrency,
+            per_host_concurrency=settings.fetch_concurrency,
+            per_host_delay=0,
+            llm_scheduler=scheduler,
+            preprocessor=MarkdownPreprocessor(None),
+        )
+        crawl_seconds = time.perf_counter() - started
+
+        pdf_seconds = pdf_bytes = None
+        # generate_pdf reports on stdout; keep that out of the results table.
+        with contextlib.redirect_stdout(sys.stderr):
+            render = settings.render_pdf and articles and fonts_available()
+        if render:
+            with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(sys.stderr):
+                pdf_path = os.path.join(tmp_dir, "bench.pdf")
+                started = time.perf_counter()
+                generate_pdf(articles, pdf_path, workers=settings.render_workers)
+                pdf_seconds = time.perf_counter() - started
+                pdf_bytes = os.path.getsize(pdf_path)
+    finally:
+        await scheduler.close()
+        config.JINA_AI_PREFIX = previous_prefix
+        metrics.enabled = False
+
+    article_latencies = metrics.samples("article_seconds")
+    return {
+        'expected_articles': sum(site.article_count for site in sites),
+        'articles': len(articles),
+        'crawl_seconds': crawl_seconds,
+        'articles_per_second': len(articles) / crawl_seconds if crawl_seconds > 0 else 0.0,
+        'article_p50': percentile(article_latencies, 0.50),
+        'article_p99': percentile(article_latencies, 0.99),
+        'fetch_p99': percentile(metrics.samples("fetch_seconds"), 0.99),
+        'gemini_p99': percentile(metrics.samples("gemini_call_seconds"), 0.99),
+        'gemini_calls': sum(gemini.calls.values()),
+        'gemini_retries': scheduler.retries,
+        'pdf_seconds': pdf_seconds,
+        'pdf_bytes': pdf_bytes,
+    }
+
+
+def run_benchmark(settings: BenchSettings, jina_prefix: str, log_level: str = "CRITICAL") -> Dict[str, Any]:
+    """Run one benchmark in this process and add its peak RSS; the entry point of each worker process."""
+    logging.basicConfig(level=log_level, force=True)
+    result = asyncio.run(run_crawl(settings, jina_prefix))
+    result['peak_rss_bytes'] = peak_rss_bytes()
+    return result
+
+
+def _serve_reader(settings: BenchSettings, ready) -> None:
+    async def serve():
+        sites = build_sites(settings.sites, settings.pages, settings.articles_per_page, settings.paragraphs)
+        async with FakeJinaReader(
+            sites,
+            LatencyDistribution.parse(settings.jina_latency),
+            error_rate=settings.jina_error_rate,
+            rate_limit_rate=settings.jina_rate_limit_rate,
+            seed=settings.seed,
+        ) as reader:
+            ready.put(reader.prefix)
+            await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    defaults = BenchSettings()
+    parser = argparse.ArgumentParser(description="Benchmark the crawl against fake Jina and Gemini services.")
+    parser.add_argument("--concurrency", default="4x2,8x4,16x8", help="Comma-separated FETCHxLLM concurrency settings (default: 4x2,8x4,16x8).")
+    parser.add_argument("--pages", default="2,8", help="Comma-separated listing pages per site, one run each (default: 2,8).")
+    parser.add_argument("--sites", type=int, default=defaults.sites, help=f"Number of synthetic sites (default: {defaults.sites}).")
+    parser.add_argument("--articles-per-page", type=int, default=defaults.articles_per_page, help=f"Articles per listing page (default: {defaults.articles_per_page}).")
+    parser.add_argument("--paragraphs", type=int, default=defaults.paragraphs, help=f"Paragraphs per article, i.e. the page size (default: {defaults.paragraphs}).")
+    parser.add_argument("--jina-latency", default=defaults.jina_latency, help=f"Reader latency: SECONDS, uniform:LOW:HIGH, lognormal:MEDIAN:SIGMA or exponential:MEAN (default: {defaults.jina_latency}).")
+    parser.add_argument("--jina-error-rate", type=float, default=0.0, help="Share of reader requests failing with 503 (default: 0).")
+    parser.add_argument("--jina-rate-limit-rate", type=float, default=0.0, help="Share of reader requests failing with 429 (default: 0).")
+    parser.add_argument("--gemini-latency", default=defaults.gemini_latency, help=f"Gemini latency, in the same forms as --jina-latency (default: {defaults.gemini_latency}).")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0, help="Share of Gemini calls failing with 503 (default: 0).")
+    parser.add_argument("--gemini-rate-limit-rate", type=float, default=0.0, help="Share of Gemini calls failing with 429 (default: 0).")
+    parser.add_argument("--gemini-rpm", type=float, default=defaults.gemini_requests_per_minute, help=f"Gemini request quota per minute (default: {defaults.gemini_requests_per_minute:g}).")
+    parser.add_argument("--render-workers", type=int, default=1, help="Processes rendering the PDF (default: 1).")
+    parser.add_argument("--no-pdf", action="store_true", help="Only benchmark the crawl.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for latencies and faults (default: 0).")
+    parser.add_argument("--log-level", default="CRITICAL", help="Log level of the benchmark processes (default: CRITICAL).")
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    try:
+        concurrency = parse_concurrency(args.concurrency)
+        page_counts = [int(value) for value in args.pages.split(',')]
+        LatencyDistribution.parse(args.jina_latency)
+        LatencyDistribution.parse(args.gemini_latency)
+    except ValueError as e:
+        parser.error(str(e))
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    print(f"{'fetch x llm':>11}{'pages':>7}{'articles':>10}{'seconds':>9}{'art/s':>8}"
+          f"{'p50 s':>8}{'p99 s':>8}{'retries':>9}{'pdf s':>8}{'pdf MB':>8}{'peak MB':>9}")
+    for pages in page_counts:
+        base = BenchSettings(
+            sites=args.sites,
+            pages=pages,
+            articles_per_page=args.articles_per_page,
+            paragraphs=args.paragraphs,
+            jina_latency=args.jina_latency,
+            jina_error_rate=args.jina_error_rate,
+            jina_rate_limit_rate=args.jina_rate_limit_rate,
+            gemini_latency=args.gemini_latency,
+            gemini_error_rate=args.gemini_error_rate,
+            gemini_rate_limit_rate=args.gemini_rate_limit_rate,
+            gemini_requests_per_minute=args.gemini_rpm,
+            render_pdf=not args.no_pdf,
+            render_workers=args.render_workers,
+            seed=args.seed,
+        )
+        ready = context.Queue()
+        reader = context.Process(target=_serve_reader, args=(base, ready), daemon=True)
+        reader.start()
+        try:
+            jina_prefix = ready.get(timeout=60)
+            for fetch_concurrency, llm_concurrency in concurrency:
+                settings = BenchSettings(**{**asdict(base), 'fetch_concurrency': fetch_concurrency, 'llm_concurrency': llm_concurrency})
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(run_benchmark, settings, jina_prefix, args.log_level).result()
+                results.append({'settings': asdict(settings), **result})
+                pdf_seconds = f"{result['pdf_seconds']:.2f}" if result['pdf_seconds'] is not None else "-"
+                pdf_mb = f"{result['pdf_bytes'] / 1e6:.1f}" if result['pdf_bytes'] is not None else "-"
+                setting = f"{fetch_concurrency}x{llm_concurrency}"
+                done = f"{result['articles']}/{result['expected_articles']}"
+                print(f"{setting:>11}{pages:>7}{done:>10}"
+                      f"{result['crawl_seconds']:>9.2f}{result['articles_per_second']:>8.1f}"
+                      f"{result['article_p50']:>8.2f}{result['article_p99']:>8.2f}{result['gemini_retries']:>9}"
+                      f"{pdf_seconds:>8}{pdf_mb:>8}{result['peak_rss_bytes'] / 1e6:>9.0f}")
+        finally:
+            reader.terminate()
+            reader.join()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare whole-string Arabic shaping with the cached line-by-line TextShaper.
+
+Usage:
+    python -m benchmarks.bench_text_shaping [--articles N] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import arabic_reshaper
+import bidi.algorithm
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dummy_articles import DUMMY_ARTICLES
+from src.text_shaping import TextShaper, shape_line
+
+
+def build_corpus(article_count: int):
+    """
+    Build a corpus of lesson-like articles from the dummy articles.
+
+    Each article mixes lines unique to it with headings and vocabulary
+    lines that recur across the corpus, like real lessons do.
+    """
+    samples = list(DUMMY_ARTICLES.values())
+    shared_lines = [line for article in samples for line in article['content'].split('.') if line.strip()]
+    corpus = []
+    for i in range(article_count):
+        sample = samples[i % len(samples)]
+        lines = [f"{sample['title']} {i}"]
+        lines += shared_lines[i % len(shared_lines):] + shared_lines[:i % len(shared_lines)]
+        lines += [f"{line} {i}" for line in sample['content'].split('.') if line.strip()]
+        corpus.append({'title': sample['title'], 'content': '\n'.join(lines)})
+    return corpus
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Arabic text shaping.")
+    parser.add_argument("--articles", type=int, default=500, help="Number of articles to shape (default: 500).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; the best is reported (default: 3).")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.articles)
+
+    # The rendering path before TextShaper: the whole text through the stock reshaper
+    def whole_string():
+        for article in corpus:
+            bidi.algorithm.get_display(arabic_reshaper.reshape(article['title']))
+            bidi.algorithm.get_display(arabic_reshaper.reshape(article['content']))
+
+    def whole_string_fixed_reshaper():
+        for article in corpus:
+            shape_line(article['title'])
+            shape_line(article['content'])
+
+    def line_cached():
+        shaper = TextShaper()
+        for article in corpus:
+            shaper.shape(article['title'])
+            shaper.shape(article['content'])
+
+    warm_shaper = TextShaper()
+    for article in corpus:
+        warm_shaper.shape(article['content'])
+
+    def warm_cache():
+        for article in corpus:
+            warm_shaper.shape(article['title'])
+            warm_shaper.shape(article['content'])
+
+    variants = (
+        ("whole string", whole_string),
+        ("whole string, fixed regex", whole_string_fixed_reshaper),
+        ("lines, cold cache", line_cached),
+        ("lines, warm cache", warm_cache),
+    )
+    baseline = None
+    print(f"{'variant':<28}{'seconds':>10}{'speedup':>10}")
+    for name, fn in variants:
+        best = min(timed(fn) for _ in range(args.repeat))
+        baseline = baseline or best
+        print(f"{name:<28}{best:>10.3f}{baseline / best:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
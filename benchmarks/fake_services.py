@@ -0,0 +1,313 @@
+"""
+Local stand-ins for the Jina reader and Gemini, for benchmarking the crawl.
+
+FakeJinaReader is an aiohttp server that answers "<prefix><url>" requests
+like r.jina.ai does, with markdown for synthetic multi-page lesson sites.
+FakeGemini is a generate coroutine for LLMScheduler that answers the
+scraper's prompts from the markdown they contain. Both add latency drawn
+from a LatencyDistribution and fail a configurable share of requests with
+rate-limit (429) or server errors.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from aiohttp import web
+
+from src import prompts
+from src.dummy_articles import DUMMY_ARTICLES
+from src.link_extractor import LINK_PATTERN
+from src.llm_scheduler import estimate_tokens
+
+ARABIC_LETTER = re.compile(r'[؀-ۿ]')
+CHUNK_PART_PATTERN = re.compile(r'part (\d+) of (\d+)')
+NEXT_PAGE_TEXT = "Next page"
+
+
+@dataclass
+class LatencyDistribution:
+    """
+    A distribution of response delays in seconds.
+
+    kind is "constant" (a), "uniform" (between a and b), "lognormal"
+    (median a, shape b) or "exponential" (mean a).
+    """
+    kind: str = "constant"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        """
+        Parse "SECONDS", "uniform:LOW:HIGH", "lognormal:MEDIAN:SIGMA" or "exponential:MEAN".
+
+        Raises:
+            ValueError: If spec is not one of these forms.
+        """
+        kind, *values = spec.split(':')
+        try:
+            if not values:
+                return cls("constant", float(kind))
+            numbers = [float(value) for value in values]
+        except ValueError:
+            raise ValueError(f"Invalid latency: {spec}") from None
+        if kind in ("uniform", "lognormal") and len(numbers) == 2:
+            return cls(kind, *numbers)
+        if kind in ("constant", "exponential") and len(numbers) == 1:
+            return cls(kind, numbers[0])
+        raise ValueError(f"Invalid latency: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one delay."""
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        if self.kind == "exponential":
+            return rng.expovariate(1 / self.a) if self.a > 0 else 0.0
+        return self.a
+
+
+@dataclass
+class SyntheticSite:
+    """
+    A lesson site with pages listing pages of articles_per_page articles each.
+
+    Every page carries the same navigation and footer blocks, like real
+    sites do, and each article has paragraphs paragraphs of Arabic text.
+    """
+    host: str
+    pages: int
+    articles_per_page: int
+    paragraphs: int
+
+    @property
+    def seed_url(self) -> str:
+        return self.listing_url(1)
+
+    @property
+    def article_count(self) -> int:
+        return self.pages * self.articles_per_page
+
+    def listing_url(self, page: int) -> str:
+        return f"https://{self.host}/level/1" if page == 1 else f"https://{self.host}/level/1/page/{page}"
+
+    def article_url(self, page: int, position: int) -> str:
+        return f"https://{self.host}/lesson/{page}-{position}"
+
+    def _frame(self, title: str, url: str, body: List[str]) -> str:
+        navigation = " ".join(
+            f"[{name}](https://{self.host}/{path})"
+            for name, path in (("Home", ""), ("Levels", "levels"), ("Vocabulary", "vocabulary"), ("About", "about"))
+        )
+        footer = f"© 2026 {self.host}. All rights reserved. [Privacy](https://{self.host}/privacy) [Terms](https://{self.host}/terms)"
+        return "\n\n".join([f"Title: {title}\nURL Source: {url}\nMarkdown Content:", navigation] + body + [footer])
+
+    def render(self, url: str) -> Optional[str]:
+        """Return the markdown the reader serves for url, or None if the site has no such page."""
+        path = urlparse(url).path
+        samples = list(DUMMY_ARTICLES.values())
+        listing = re.fullmatch(r'/level/1(?:/page/(\d+))?', path)
+        if listing:
+            page = int(listing.group(1) or 1)
+            if not 1 <= page <= self.pages:
+                return None
+            items = [
+                f"- [{samples[position % len(samples)]['title']}]({self.article_url(page, position)})"
+                for position in range(self.articles_per_page)
+            ]
+            body = [f"# Level 1 lessons, page {page}", "\n".join(items)]
+            if page < self.pages:
+                body.append(f"[{NEXT_PAGE_TEXT}]({self.listing_url(page + 1)})")
+            return self._frame(f"Level 1 lessons - page {page}", url, body)
+
+        article = re.fullmatch(r'/lesson/(\d+)-(\d+)', path)
+        if article:
+            page, position = int(article.group(1)), int(article.group(2))
+            if not (1 <= page <= self.pages and 0 <= position < self.articles_per_page):
+                return None
+            sample = samples[position % len(samples)]
+            sentences = [sentence.strip() for sentence in sample['content'].split('.') if sentence.strip()]
+            paragraphs = [
+                f"{sentences[i % len(sentences)]}، الدَّرْسُ {page}-{position} الْفِقْرَةُ {i + 1}."
+                for i in range(self.paragraphs)
+            ]
+            return self._frame(sample['title'], url, [f"# {sample['title']} {page}-{position}"] + paragraphs)
+        return None
+
+
+def build_sites(count: int, pages: int, articles_per_page: int, paragraphs: int) -> List[SyntheticSite]:
+    """Build count synthetic lesson sites of the same shape."""
+    return [SyntheticSite(f"lessons{i}.test", pages, articles_per_page, paragraphs) for i in range(count)]
+
+
+class FakeJinaReader:
+    """
+    An aiohttp server imitating the Jina reader for synthetic sites.
+
+    A request for "<prefix><url>" is answered with the markdown of url
+    after a delay from latency. A share of requests fail: rate_limit_rate
+    with 429 and a Retry-After header, error_rate with 503.
+    """
+
+    def __init__(
+        self,
+        sites: List[SyntheticSite],
+        latency: LatencyDistribution = LatencyDistribution(),
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.sites = {site.host: site for site in sites}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rng = random.Random(seed)
+        self.responses: Dict[int, int] = {}
+        self.prefix: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the prefix to use as config.JINA_AI_PREFIX."""
+        app = web.Application()
+        app.router.add_get('/{target:.*}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self.prefix = f"http://{bound_host}:{bound_port}/"
+        return self.prefix
+
+    async def close(self) -> None:
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _respond(self, status: int, **kwargs) -> web.Response:
+        self.responses[status] = self.responses.get(status, 0) + 1
+        return web.Response(status=status, **kwargs)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        # raw_path keeps the target URL's "//" and query string intact.
+        target = request.raw_path[1:]
+        await asyncio.sleep(self.latency.sample(self.rng))
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return self._respond(429, text="Rate limit exceeded", headers={'Retry-After': '1'})
+        if roll < self.rate_limit_rate + self.error_rate:
+            return self._respond(503, text="Service unavailable")
+        site = self.sites.get(urlparse(target).netloc)
+        markdown = site.render(target) if site else None
+        if markdown is None:
+            return self._respond(404, text=f"No such page: {target}")
+        return self._respond(200, text=markdown, content_type='text/plain', charset='utf-8')
+
+
+class FakeGeminiError(Exception):
+    """An API error carrying a status code, like the google-genai client raises."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeGemini:
+    """
+    Answers the scraper's Gemini prompts without calling the API.
+
+    Listing prompts are answered with the article and next-page links
+    found in their markdown, article prompts with the article's title and
+    paragraphs plus placeholder translations. Calls take a delay from
+    latency; rate_limit_rate of them fail with a 429 asking for a retry
+    after retry_delay seconds and error_rate with a 503.
+    """
+
+    def __init__(
+        self,
+        latency: LatencyDistribution = LatencyDistribution(),
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_delay: float = 0.1,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_delay = retry_delay
+        self.rng = random.Random(seed)
+        self.calls: Dict[str, int] = {}
+        # Each prompt template up to its markdown, to recognize the prompt kind
+        self._templates = [
+            ("listing", prompts.get_listing_prompt("")),
+            ("links", prompts.get_extract_links_prompt("")),
+            ("next_page", prompts.get_next_page_prompt("")),
+            ("filter_article", prompts.get_filter_article_prompt("")),
+        ]
+
+    def _kind(self, prompt: str) -> str:
+        for kind, template in self._templates:
+            if prompt.startswith(template):
+                return kind
+        if CHUNK_PART_PATTERN.search(prompt.split('\n', 1)[0]):
+            return "filter_article_chunk"
+        raise ValueError(f"Unrecognized prompt: {prompt[:80]}")
+
+    async def generate(self, prompt: str) -> Any:
+        """Answer one prompt, with the signature LLMScheduler expects."""
+        kind = self._kind(prompt)
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+        await asyncio.sleep(self.latency.sample(self.rng))
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            raise FakeGeminiError(429, f"RESOURCE_EXHAUSTED {{'retryDelay': '{self.retry_delay}s'}}")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise FakeGeminiError(503, "UNAVAILABLE")
+
+        markdown = prompt.split("Markdown Content:\n", 1)[1]
+        if kind in ("listing", "links", "next_page"):
+            links = [(text.strip(), url) for text, url in LINK_PATTERN.findall(markdown)]
+            articles = [url for _, url in links if '/lesson/' in url]
+            next_page = next((url for text, url in links if text == NEXT_PAGE_TEXT), None)
+            answer = {"listing": {"articles": articles, "next_page": next_page}, "links": articles, "next_page": next_page}[kind]
+        else:
+            answer = self._translate(markdown, kind, prompt)
+        text = json.dumps(answer, ensure_ascii=False) if answer is not None else "null"
+        usage = SimpleNamespace(
+            prompt_token_count=estimate_tokens(prompt),
+            candidates_token_count=estimate_tokens(text),
+            total_token_count=estimate_tokens(prompt) + estimate_tokens(text),
+        )
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+    @staticmethod
+    def _translate(markdown: str, kind: str, prompt: str) -> Dict[str, str]:
+        blocks = [block.strip() for block in markdown.split('\n\n') if block.strip()]
+        title = next((block[2:] for block in blocks if block.startswith('# ')), "")
+        paragraphs = [
+            block for block in blocks
+            if ARABIC_LETTER.search(block) and not block.startswith(('#', '[', '-', 'Title:'))
+        ]
+        answer = {
+            'content': '\n\n'.join(paragraphs),
+            'content_english': '\n\n'.join(f"Translation of paragraph {i + 1}." for i in range(len(paragraphs))),
+        }
+        part = CHUNK_PART_PATTERN.search(prompt.split('\n', 1)[0]) if kind == "filter_article_chunk" else None
+        if part is None or part.group(1) == '1':
+            answer['title'] = title
+            answer['title_english'] = f"Lesson {title.split()[-1]}" if title else ""
+        return answer
@@ -2,6 +2,12 @@ import os
 
 # --- API Settings ---
 API_MODEL = "gemini-2.5-pro" # Gemini API model to use
+GEMINI_REQUESTS_PER_MINUTE = 150 # Request quota for API_MODEL
+GEMINI_TOKENS_PER_MINUTE = 2_000_000 # Input token quota for API_MODEL
+GEMINI_MAX_CONCURRENCY = 16 # Maximum number of Gemini calls in flight
+GEMINI_MAX_RETRIES = 6 # Retries for rate-limited or failed Gemini calls
+GEMINI_RETRY_BASE_DELAY = 2.0 # Seconds before the first retry, doubled each attempt
+GEMINI_RETRY_MAX_DELAY = 120.0 # Upper bound on the retry delay in seconds
 
 # --- Paths ---
 # Base directory of the project (one level up from src)
@@ -9,9 +15,89 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Output directory for PDFs
 OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+PDF_PATH = os.path.join(OUTPUT_DIR, 'arabic_lessons.pdf')
+
+# Journal of crawl progress, used to resume interrupted crawls
+JOURNAL_PATH = os.path.join(OUTPUT_DIR, 'crawl_journal.jsonl')
+JOURNAL_FSYNC = True # Force each journal record to disk as it's written
+
+# Durable store of translated articles, rendered again without re-crawling
+CORPUS_PATH = os.path.join(OUTPUT_DIR, 'corpus.sqlite3')
 
 # Fonts directory
 FONTS_DIR = os.path.join(BASE_DIR, 'fonts')
 
+# Cache directory for fetched pages and other reusable results
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+
 # --- Scraping Settings ---
-JINA_AI_PREFIX = "https://r.jina.ai/"
\ No newline at end of file
+JINA_AI_PREFIX = "https://r.jina.ai/"
+DIRECT_FETCH_HOSTS = () # Hosts (and their subdomains) fetched directly and converted to markdown locally instead of via Jina
+HTML_CONVERT_WORKERS = 2 # Processes converting directly fetched HTML to markdown (0 converts in the event loop)
+HTTP_CONNECTION_LIMIT = 100 # Maximum open connections in the shared connection pool
+HTTP_KEEPALIVE_TIMEOUT = 30 # Seconds an idle pooled connection is kept open for reuse
+HTTP_DNS_CACHE_TTL = 300 # Seconds resolved host addresses are cached
+USER_AGENT = "Mozilla/5.0 (compatible; ArabicScraper/1.0)" # Sent with direct page fetches
+
+# --- Concurrency Settings ---
+FETCH_CONCURRENCY = 8 # Number of concurrent article page fetches
+LLM_CONCURRENCY = 4 # Number of concurrent Gemini article calls
+LISTING_PREFETCH_DEPTH = 2 # Listing pages fetched ahead of the page being processed
+PER_HOST_CONCURRENCY = 8 # Maximum concurrent network requests per target host
+PER_HOST_DELAY = 0.1 # Minimum seconds between request starts to the same host
+
+# --- Fetch Timeout and Retry Settings ---
+FETCH_TIMEOUT_MAX = 90.0 # Seconds; the timeout until a host has enough latency samples, and the upper bound after
+FETCH_TIMEOUT_MIN = 10.0 # Lower bound in seconds on a host's adaptive timeout
+FETCH_TIMEOUT_P99_MULTIPLIER = 3.0 # Adaptive timeout as a multiple of the host's p99 latency
+FETCH_LATENCY_WINDOW = 200 # Recent successful requests per host that latency percentiles are taken over
+FETCH_LATENCY_MIN_SAMPLES = 20 # Samples a host needs before its timeout adapts and requests are hedged
+FETCH_HEDGE_PERCENTILE = 0.95 # A duplicate request is sent once a request runs past this latency percentile (0 disables)
+FETCH_MAX_RETRIES = 3 # Retries for timed out, dropped or rate-limited page fetches
+FETCH_RETRY_BASE_DELAY = 1.0 # Seconds before the first fetch retry, doubled each attempt
+FETCH_RETRY_MAX_DELAY = 30.0 # Upper bound on the fetch retry delay in seconds
+
+# --- Page Cache Settings ---
+PAGE_CACHE_DIR = os.path.join(CACHE_DIR, 'pages')
+PAGE_CACHE_TTL = 7 * 24 * 60 * 60 # Seconds before a cached page is revalidated
+PAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024 # Least recently used pages are evicted beyond this size
+
+# --- LLM Cache Settings ---
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, 'llm_responses.sqlite3')
+LLM_CACHE_MAX_ENTRIES = 100_000 # Least recently used responses are evicted beyond this count
+
+# --- Link Extraction Settings ---
+LINK_PATTERNS_PATH = os.path.join(CACHE_DIR, 'link_patterns.json') # URL templates learned per host
+LINK_PATTERN_MIN_COUNT = 2 # Times a template must be confirmed before it is trusted
+LINK_EXTRACTION_MIN_CONFIDENCE = 0.75 # Below this, listing pages fall back to Gemini
+LISTING_LLM_MODE = "combined" # "combined" (one Gemini call per listing page) or "separate" (two calls)
+
+# --- Markdown Preprocessing Settings ---
+BOILERPLATE_PATH = os.path.join(CACHE_DIR, 'boilerplate.json') # Page blocks seen per host, used to spot boilerplate
+BOILERPLATE_MIN_PAGES = 3 # A block repeated on this many pages of a host is stripped as boilerplate
+BOILERPLATE_MAX_BLOCKS_PER_HOST = 20_000 # Least seen blocks are forgotten beyond this count
+MARKDOWN_TOKEN_BUDGET = 30_000 # Estimated tokens of listing page markdown sent to Gemini per call
+
+# --- Article Translation Settings ---
+ARTICLE_CHUNK_MIN_TOKENS = 3_000 # Articles longer than this are translated in concurrent chunks
+ARTICLE_CHUNK_TOKENS = 1_500 # Approximate size of each article chunk
+
+# --- Near-Duplicate Detection Settings ---
+NEAR_DUPLICATE_INDEX_PATH = os.path.join(CACHE_DIR, 'near_duplicates.sqlite3') # Article signatures, translations and aliases
+NEAR_DUPLICATE_THRESHOLD = 0.9 # Estimated Jaccard similarity at which an article reuses an earlier translation
+NEAR_DUPLICATE_SHINGLE_WORDS = 5 # Words per shingle when comparing article text
+NEAR_DUPLICATE_PERMUTATIONS = 64 # MinHash signature length; more is more precise but slower
+NEAR_DUPLICATE_BANDS = 16 # LSH bands the signature is split into for candidate lookup
+NEAR_DUPLICATE_MIN_SHINGLES = 30 # Articles with fewer distinct shingles in their body are too short to compare and always translated
+
+# --- PDF Settings ---
+PDF_VOLUME_ARTICLES = 200 # Articles per volume when streaming PDF output
+PDF_VOLUME_BYTES = 50 * 1024 * 1024 # Approximate page content size per streamed volume
+PDF_STREAM_QUEUE_SIZE = 16 # Articles waiting for the streaming renderer before the crawl holds back
+RENDER_WORKERS = 1 # Processes used to render a PDF; more than 1 renders shards in parallel and merges them
+PDF_FRAGMENT_CACHE_DIR = os.path.join(CACHE_DIR, 'pdf_fragments') # Rendered articles reused across runs
+PDF_FRAGMENT_CACHE_MAX_BYTES = 1024 * 1024 * 1024 # Least recently used fragments are evicted beyond this size
+SHAPING_CACHE_MAX_ENTRIES = 50_000 # Shaped Arabic lines kept in memory (and in the cache file)
+
+# --- Font Cache Settings ---
+FONT_CACHE_DIR = os.path.join(CACHE_DIR, 'fonts') # Preprocessed font metrics shared by all render processes
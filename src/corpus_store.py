@@ -0,0 +1,200 @@
+import datetime
+import os
+import re
+import sqlite3
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from src import config
+from src.metrics import metrics
+
+ARTICLE_FIELDS = ('title', 'title_english', 'content', 'content_english')
+
+# Tashkeel, Quranic marks and tatweel are dropped from indexed text and
+# queries, and alef variants unified, so a search for كتاب matches كِتَابٌ.
+_ARABIC_MARKS_RE = re.compile('[\u0610-\u061a\u0640\u064b-\u065f\u0670\u06d6-\u06ed]')
+_ALEF_RE = re.compile('[\u0622\u0623\u0625\u0671]')
+
+
+def normalize_search_text(text: str) -> str:
+    """Normalize Arabic text for the full-text index and for search queries."""
+    return _ALEF_RE.sub('ا', _ARABIC_MARKS_RE.sub('', text))
+
+
+def level_from_url(url: str) -> Optional[str]:
+    """
+    Return the lesson level in a URL such as .../lessons/level/elementary, or None.
+    """
+    segments = [segment for segment in urlparse(url).path.split('/') if segment]
+    for name, value in zip(segments, segments[1:]):
+        if name.lower() == 'level':
+            return value.lower()
+    return None
+
+
+def _sort_key(run_id: str, order: Sequence[Any]) -> str:
+    # The run comes first, so separate crawls don't interleave. Parts are
+    # zero-padded so that string order matches the crawl's tuple order.
+    return '.'.join([run_id] + [f"{part:010d}" if isinstance(part, int) else str(part) for part in order])
+
+
+class CorpusStore:
+    """
+    A durable SQLite store of translated articles.
+
+    The crawler writes each article as soon as it is translated, together
+    with its crawl order, level and crawl date. Articles are ordered by the
+    run that wrote them (when the store was opened), then by crawl order. An FTS5 index over the
+    Arabic and English fields makes keyword searches fast, and select()
+    returns a lazy, filtered view that generate_pdf can render without the
+    network or Gemini.
+    """
+
+    def __init__(self, path: str = config.CORPUS_PATH):
+        """
+        Open (or create) the corpus database at path.
+        """
+        self.path = path
+        # Fixed-width timestamp, so string order is chronological.
+        self.run_id = datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            "url TEXT PRIMARY KEY, seed TEXT, level TEXT, sort_key TEXT NOT NULL, crawled_on TEXT NOT NULL, "
+            "title TEXT NOT NULL, title_english TEXT NOT NULL, content TEXT NOT NULL, content_english TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_sort_key ON articles (sort_key)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_level ON articles (level, sort_key)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_crawled_on ON articles (crawled_on)")
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+            "title, title_english, content, content_english, tokenize='unicode61 remove_diacritics 2')"
+        )
+        self._conn.commit()
+
+    def put(
+        self,
+        url: str,
+        article: Dict[str, str],
+        order: Sequence[Any] = (),
+        seed: Optional[str] = None,
+        crawled_on: Optional[datetime.date] = None,
+    ) -> None:
+        """
+        Store (or replace) an article.
+
+        order is its position in this run's crawl, used to sort the corpus
+        after earlier runs' articles. The level is taken from the seed URL
+        it was found under, or from url.
+        """
+        crawled_on = crawled_on or datetime.date.today()
+        values = [article.get(field, '') for field in ARTICLE_FIELDS]
+        row = (seed, level_from_url(seed or url), _sort_key(self.run_id, order), crawled_on.isoformat(), *values)
+        existing = self._conn.execute("SELECT rowid FROM articles WHERE url = ?", (url,)).fetchone()
+        if existing:
+            rowid = existing[0]
+            self._conn.execute(
+                "UPDATE articles SET seed = ?, level = ?, sort_key = ?, crawled_on = ?, "
+                "title = ?, title_english = ?, content = ?, content_english = ? WHERE rowid = ?",
+                (*row, rowid),
+            )
+            self._conn.execute("DELETE FROM articles_fts WHERE rowid = ?", (rowid,))
+        else:
+            rowid = self._conn.execute(
+                "INSERT INTO articles (url, seed, level, sort_key, crawled_on, "
+                "title, title_english, content, content_english) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, *row),
+            ).lastrowid
+        self._conn.execute(
+            "INSERT INTO articles_fts (rowid, title, title_english, content, content_english) VALUES (?, ?, ?, ?, ?)",
+            (rowid, *(normalize_search_text(value) for value in values)),
+        )
+        self._conn.commit()
+        metrics.incr("corpus_writes")
+
+    def select(
+        self,
+        level: Optional[str] = None,
+        since: Optional[datetime.date] = None,
+        until: Optional[datetime.date] = None,
+        keyword: Optional[str] = None,
+    ) -> "CorpusSelection":
+        """
+        Return the articles matching all of the given filters, in crawl order.
+
+        since and until are inclusive crawl dates. keyword is a full-text
+        search over the Arabic and English titles and content; every word
+        in it must match.
+        """
+        conditions, params = [], []
+        if level:
+            conditions.append("articles.level = ?")
+            params.append(level.lower())
+        if since:
+            conditions.append("articles.crawled_on >= ?")
+            params.append(since.isoformat())
+        if until:
+            conditions.append("articles.crawled_on <= ?")
+            params.append(until.isoformat())
+        if keyword and keyword.strip():
+            terms = normalize_search_text(keyword).split()
+            conditions.append("articles.rowid IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)")
+            params.append(' '.join('"' + term.replace('"', '""') + '"' for term in terms))
+        return CorpusSelection(self._conn, conditions, params)
+
+    def levels(self) -> List[str]:
+        """Return the levels present in the corpus."""
+        rows = self._conn.execute("SELECT DISTINCT level FROM articles WHERE level IS NOT NULL ORDER BY level")
+        return [level for level, in rows]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+
+class CorpusSelection(Mapping):
+    """
+    A read-only mapping of URL to article over a filtered part of the corpus.
+
+    Nothing is loaded up front: iterating runs the query and reads one
+    article at a time, so a selection can be rendered without holding the
+    whole corpus in memory.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, conditions: List[str], params: List[Any]):
+        self._conn = conn
+        self._where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        self._params = params
+
+    def _rows(self, columns: str, extra: str = "", params: Tuple[Any, ...] = ()) -> sqlite3.Cursor:
+        sql = f"SELECT {columns} FROM articles{self._where}{extra}"
+        return self._conn.execute(sql, (*self._params, *params))
+
+    def __len__(self) -> int:
+        return self._rows("COUNT(*)").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        for url, in self._rows("url", " ORDER BY sort_key, url"):
+            yield url
+
+    def __getitem__(self, url: str) -> Dict[str, str]:
+        extra = " AND url = ?" if self._where else " WHERE url = ?"
+        row = self._rows(', '.join(ARTICLE_FIELDS), extra, (url,)).fetchone()
+        if row is None:
+            raise KeyError(url)
+        return dict(zip(ARTICLE_FIELDS, row))
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, str]]]:
+        for url, *values in self._rows(f"url, {', '.join(ARTICLE_FIELDS)}", " ORDER BY sort_key, url"):
+            yield url, dict(zip(ARTICLE_FIELDS, values))
+
+    def values(self) -> Iterator[Dict[str, str]]:
+        for _, article in self.items():
+            yield article
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from src import config
+from src.utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """A cached page body together with its validators."""
+    url: str
+    body: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    backend: Optional[str] = None
+
+
+class FetchCache:
+    """
+    A persistent on-disk cache for fetched page markdown.
+
+    Entries are stored as one JSON file per page, named by the SHA-256 of the
+    normalized URL and the backend it was fetched with, since the same page
+    converted by different backends gives different markdown. Entries older than ttl are stale and must be revalidated,
+    and the least recently used entries are evicted once the cache grows
+    beyond max_bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = config.PAGE_CACHE_DIR,
+        ttl: float = config.PAGE_CACHE_TTL,
+        max_bytes: int = config.PAGE_CACHE_MAX_BYTES,
+    ):
+        """
+        Initialize the cache, creating cache_dir if needed.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._sizes: Dict[str, int] = {
+            entry.path: entry.stat().st_size
+            for entry in os.scandir(cache_dir)
+            if entry.is_file() and entry.name.endswith('.json')
+        }
+
+    @property
+    def total_bytes(self) -> int:
+        """The combined size of all cache entries on disk."""
+        return sum(self._sizes.values())
+
+    def _path(self, url: str, backend: Optional[str] = None) -> str:
+        name = normalize_url(url) if backend is None else f"{backend} {normalize_url(url)}"
+        key = hashlib.sha256(name.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str, backend: Optional[str] = None) -> Optional[CacheEntry]:
+        """
+        Look up a page fetched with backend, marking it as recently used.
+
+        Returns:
+            Optional[CacheEntry]: The cached entry (fresh or stale), or None.
+        """
+        path = self._path(url, backend)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = CacheEntry(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(path)
+            return None
+        os.utime(path)
+        return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Return True if the entry is younger than the cache TTL."""
+        return time.time() - entry.fetched_at < self.ttl
+
+    def put(
+        self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None, backend: Optional[str] = None,
+    ) -> CacheEntry:
+        """Store a page freshly fetched with backend and evict old entries if over budget."""
+        entry = CacheEntry(url=url, body=body, fetched_at=time.time(), etag=etag, last_modified=last_modified, backend=backend)
+        self._write(entry)
+        self._evict()
+        return entry
+
+    def refresh(self, entry: CacheEntry) -> CacheEntry:
+        """Mark a stale entry as fresh again after a successful revalidation."""
+        entry.fetched_at = time.time()
+        self._write(entry)
+        return entry
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        """Return the request headers needed to revalidate an entry."""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def _write(self, entry: CacheEntry) -> None:
+        path = self._path(entry.url, entry.backend)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry.__dict__, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._sizes[path] = os.path.getsize(path)
+
+    def _evict(self) -> None:
+        if self.total_bytes <= self.max_bytes:
+            return
+        by_last_use = sorted(self._sizes, key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+        for path in by_last_use:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        self._sizes.pop(path, None)
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import fpdf
+from fontTools import ttLib
+from fpdf.enums import FontDescriptorFlags, TextEmphasis
+from fpdf.fonts import PDFFontDescriptor, SubsetMap, TTFFont
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of FontMetrics changes, so old cache files are rebuilt.
+FONT_CACHE_VERSION = 1
+
+# fpdf2 releases whose TTFFont.__init__ CachedTTFFont mirrors. With any other
+# version, fonts are added with FPDF.add_font and parsed as usual.
+CACHED_FONT_FPDF_VERSIONS = ("2.7.7",)
+
+
+@dataclass
+class FontMetrics:
+    """The parsed metrics of a font file, as fpdf's TTFFont computes them."""
+    fingerprint: List
+    name: str
+    scale: float
+    default_width: int
+    ascent: int
+    descent: int
+    cap_height: int
+    flags: int
+    font_b_box: str
+    italic_angle: int
+    stem_v: int
+    up: int
+    ut: int
+    # (unicode code point, glyph name, width, glyph id) for every mapped character
+    glyphs: List[Tuple[int, str, int, int]]
+
+
+def font_fingerprint(font_path: str) -> List:
+    """Identify a font file's current contents by its size and modification time."""
+    stat = os.stat(font_path)
+    return [FONT_CACHE_VERSION, fpdf.__version__, stat.st_size, stat.st_mtime_ns]
+
+
+def parse_font(font_path: str) -> FontMetrics:
+    """Parse a TTF file into FontMetrics, the slow path the cache avoids."""
+    ttfont = ttLib.TTFont(font_path, recalcTimestamp=False, fontNumber=0, lazy=True)
+    try:
+        scale = 1000 / ttfont["head"].unitsPerEm
+        try:
+            cap_height = ttfont["OS/2"].sCapHeight
+        except AttributeError:
+            cap_height = ttfont["hhea"].ascent
+
+        flags = FontDescriptorFlags.SYMBOLIC
+        if ttfont["post"].isFixedPitch:
+            flags |= FontDescriptorFlags.FIXED_PITCH
+        if ttfont["post"].italicAngle != 0:
+            flags |= FontDescriptorFlags.ITALIC
+        if ttfont["OS/2"].usWeightClass >= 600:
+            flags |= FontDescriptorFlags.FORCE_BOLD
+
+        metrics = ttfont["hmtx"].metrics
+        glyphs = []
+        for char, glyph in ttfont.getBestCmap().items():
+            width = metrics[glyph][0]
+            if width == 65535:
+                width = 0
+            glyphs.append((char, glyph, round(scale * width + 0.001), ttfont.getGlyphID(glyph)))
+
+        head = ttfont["head"]
+        return FontMetrics(
+            fingerprint=font_fingerprint(font_path),
+            name=re.sub("[ ()]", "", ttfont["name"].getBestFullName()),
+            scale=scale,
+            default_width=round(scale * metrics[".notdef"][0]),
+            ascent=round(ttfont["hhea"].ascent * scale),
+            descent=round(ttfont["hhea"].descent * scale),
+            cap_height=round(cap_height * scale),
+            flags=flags.value,
+            font_b_box=(
+                f"[{head.xMin * scale:.0f} {head.yMin * scale:.0f}"
+                f" {head.xMax * scale:.0f} {head.yMax * scale:.0f}]"
+            ),
+            italic_angle=int(ttfont["post"].italicAngle),
+            stem_v=round(50 + int(pow((ttfont["OS/2"].usWeightClass / 65), 2))),
+            up=round(ttfont["post"].underlinePosition * scale),
+            ut=round(ttfont["post"].underlineThickness * scale),
+            glyphs=glyphs,
+        )
+    finally:
+        ttfont.close()
+
+
+class FontCache:
+    """
+    Preprocessed font metrics, kept in memory and on disk.
+
+    Parsing a Noto TTF and measuring every glyph takes a noticeable fraction
+    of a second, and every ArabicPDF needs four of them. The results are
+    stored as one JSON file per font under cache_dir, so worker processes
+    and later runs load them instead of parsing again. A cache file is
+    rebuilt whenever its font file's size or modification time changes.
+    """
+
+    def __init__(self, cache_dir: str = config.FONT_CACHE_DIR):
+        """
+        Initialize the cache, creating cache_dir if needed.
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._metrics: Dict[str, FontMetrics] = {}
+
+    def _path(self, font_path: str) -> str:
+        key = hashlib.sha256(os.path.abspath(font_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def metrics(self, font_path: str) -> FontMetrics:
+        """Return the metrics of a font file, parsing it only if no valid cached copy exists."""
+        fingerprint = font_fingerprint(font_path)
+        cached = self._metrics.get(font_path)
+        if cached is not None and cached.fingerprint == fingerprint:
+            return cached
+
+        cached = self._read(self._path(font_path))
+        if cached is None or cached.fingerprint != fingerprint:
+            logger.info(f"Building font cache for {font_path}.")
+            cached = parse_font(font_path)
+            self._write(self._path(font_path), cached)
+        self._metrics[font_path] = cached
+        return cached
+
+    def _read(self, path: str) -> Optional[FontMetrics]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data['glyphs'] = [tuple(glyph) for glyph in data['glyphs']]
+            return FontMetrics(**data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Discarding unreadable font cache {path}: {e}")
+            return None
+
+    def _write(self, path: str, metrics: FontMetrics) -> None:
+        # Written under a per-process name and renamed, so processes building
+        # the same cache at once never see a partial file.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(metrics), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class CachedTTFFont(TTFFont):
+    """
+    A TTFFont built from cached FontMetrics instead of parsing the font.
+
+    The font file itself is still opened lazily, since fpdf subsets it when
+    the document is written.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, pdf: fpdf.FPDF, font_path: str, fontkey: str, style: str, metrics: FontMetrics):
+        # Mirrors TTFFont.__init__, with the parsing replaced by cached values.
+        self.i = len(pdf.fonts) + 1
+        self.type = "TTF"
+        self.ttffile = font_path
+        self.fontkey = fontkey
+        self.ttfont = ttLib.TTFont(font_path, recalcTimestamp=False, fontNumber=0, lazy=True)
+        self.scale = metrics.scale
+        self.desc = PDFFontDescriptor(
+            ascent=metrics.ascent,
+            descent=metrics.descent,
+            cap_height=metrics.cap_height,
+            flags=FontDescriptorFlags(metrics.flags),
+            font_b_box=metrics.font_b_box,
+            italic_angle=metrics.italic_angle,
+            stem_v=metrics.stem_v,
+            missing_width=metrics.default_width,
+        )
+        default_width = metrics.default_width
+        self.cw = defaultdict(lambda: default_width)
+        self.cmap = {}
+        self.glyph_ids = {}
+        for char, glyph, width, glyph_id in metrics.glyphs:
+            self.cmap[char] = glyph
+            self.cw[char] = width
+            self.glyph_ids[char] = glyph_id
+        self.missing_glyphs = []
+
+        sbarr = "\x00 \r\n"
+        if pdf.str_alias_nb_pages:
+            sbarr += "0123456789"
+            sbarr += pdf.str_alias_nb_pages
+
+        self.name = metrics.name
+        self.up = metrics.up
+        self.ut = metrics.ut
+        self.emphasis = TextEmphasis.coerce(style)
+        self.subset = SubsetMap(self, [ord(char) for char in sbarr])
+
+
+font_cache: Optional[FontCache] = None
+
+
+def get_font_cache() -> FontCache:
+    """Return the process-wide font cache, creating it on first use."""
+    global font_cache
+    if font_cache is None:
+        font_cache = FontCache()
+    return font_cache
+
+
+def set_font_cache(cache: FontCache) -> None:
+    """Use cache for font metrics instead of the default one under config.FONT_CACHE_DIR."""
+    global font_cache
+    font_cache = cache
+
+
+def add_cached_font(pdf: fpdf.FPDF, family: str, style: str, font_path: str, cache: FontCache) -> None:
+    """
+    Register a font with pdf like FPDF.add_font, using cached metrics.
+
+    Falls back to FPDF.add_font on fpdf2 versions CachedTTFFont wasn't written against.
+    """
+    style = "".join(sorted(style.upper()))
+    fontkey = f"{family.lower()}{style}"
+    if fontkey in pdf.fonts:
+        return
+    if fpdf.__version__ not in CACHED_FONT_FPDF_VERSIONS:
+        logger.debug(f"Font cache not supported with fpdf2 {fpdf.__version__}, parsing {font_path}.")
+        pdf.add_font(family, style, font_path)
+        return
+    pdf.fonts[fontkey] = CachedTTFFont(pdf, font_path, fontkey, style, cache.metrics(font_path))
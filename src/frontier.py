@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Set
+from urllib.parse import urlparse
+
+from src import config
+from src.utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+
+def load_seeds_file(path: str) -> List[str]:
+    """
+    Read seed URLs from a file, one per line.
+
+    Blank lines and lines starting with '#' are ignored.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+
+class CrawlFrontier:
+    """
+    Shared state for a crawl over one or more seed URLs.
+
+    Holds the seeds and a single visited index of normalized URLs, so a page
+    reachable from several seeds (or under several spellings of its URL) is
+    only crawled once.
+    """
+
+    def __init__(self, seeds: Iterable[str] = ()):
+        """
+        Initialize the frontier, dropping seeds that normalize to the same URL.
+        """
+        self._visited: Set[str] = set()
+        unique_seeds = {}
+        for seed in seeds:
+            unique_seeds.setdefault(normalize_url(seed), seed)
+        self.seeds: List[str] = list(unique_seeds.values())
+
+    def claim(self, url: str) -> bool:
+        """
+        Mark a URL as visited.
+
+        Returns:
+            bool: True if the URL was new, False if it had already been claimed.
+        """
+        key = normalize_url(url)
+        if key in self._visited:
+            return False
+        self._visited.add(key)
+        return True
+
+    def is_visited(self, url: str) -> bool:
+        """Return True if the URL (in any equivalent spelling) has been claimed."""
+        return normalize_url(url) in self._visited
+
+    def __len__(self) -> int:
+        return len(self._visited)
+
+
+class HostLimiter:
+    """
+    Per-host politeness limits for outgoing requests.
+
+    Each host gets its own concurrency limit, and consecutive requests to
+    the same host start at least delay seconds apart.
+    """
+
+    def __init__(self, concurrency: int = config.PER_HOST_CONCURRENCY, delay: float = config.PER_HOST_DELAY):
+        """
+        Initialize the limiter with the per-host concurrency and delay.
+        """
+        if concurrency < 1:
+            raise ValueError("Per-host concurrency must be at least 1.")
+        self.concurrency = concurrency
+        self.delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold a request slot for the URL's host for the duration of the block."""
+        host = urlparse(url).netloc.lower()
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+        async with semaphore:
+            if self.delay > 0:
+                now = asyncio.get_running_loop().time()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.delay
+                if start > now:
+                    await asyncio.sleep(start - now)
+            yield
@@ -0,0 +1,149 @@
+import re
+from typing import List
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+
+# Elements that never hold readable page content
+SKIPPED_TAGS = ['script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'object', 'head', 'form', 'button', 'select']
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+# Elements converted to blocks of their own; anything else is inline text
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'header', 'footer', 'nav', 'aside', 'figure', 'figcaption',
+    'ul', 'ol', 'li', 'pre', 'blockquote', 'table', 'hr', 'dl', 'dt', 'dd', 'address', 'details', 'summary',
+    'body', 'html',
+} | set(HEADING_TAGS)
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def _clean(text: str) -> str:
+    """Collapse whitespace within each line of text."""
+    lines = (WHITESPACE.sub(' ', line).strip() for line in text.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+class _Converter:
+    """Walks a parsed page and collects its markdown blocks."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def inline(self, node) -> str:
+        if isinstance(node, Comment):
+            return ''
+        if isinstance(node, NavigableString):
+            return WHITESPACE.sub(' ', str(node))
+        if not isinstance(node, Tag):
+            return ''
+        if node.name == 'br':
+            return '\n'
+        if node.name == 'img':
+            alt = WHITESPACE.sub(' ', node.get('alt', '')).strip()
+            src = node.get('src')
+            return f"![{alt}]({urljoin(self.base_url, src)})" if src else alt
+        text = ''.join(self.inline(child) for child in node.children)
+        if node.name == 'a':
+            href = node.get('href')
+            text = WHITESPACE.sub(' ', text).strip()
+            if not href or href.startswith(('javascript:', '#')):
+                return text
+            return f"[{text}]({urljoin(self.base_url, href)})" if text else ''
+        if not text.strip():
+            return text
+        if node.name in ('strong', 'b'):
+            return f"**{text.strip()}**"
+        if node.name in ('em', 'i'):
+            return f"*{text.strip()}*"
+        if node.name == 'code':
+            return f"`{text.strip()}`"
+        return text
+
+    def blocks(self, node: Tag) -> List[str]:
+        """Convert node's children to markdown blocks."""
+        blocks: List[str] = []
+        pending: List[str] = []
+
+        def flush():
+            text = _clean(''.join(pending))
+            if text:
+                blocks.append(text)
+            pending.clear()
+
+        for child in node.children:
+            if isinstance(child, Tag) and child.name in BLOCK_TAGS:
+                flush()
+                blocks.extend(self.block(child))
+            else:
+                pending.append(self.inline(child))
+        flush()
+        return blocks
+
+    def block(self, node: Tag) -> List[str]:
+        if node.name in HEADING_TAGS:
+            text = _clean(self.inline(node)).replace('\n', ' ')
+            return [f"{'#' * HEADING_TAGS[node.name]} {text}"] if text else []
+        if node.name in ('ul', 'ol'):
+            return [self.list_items(node)] if node.find('li') else []
+        if node.name == 'pre':
+            text = node.get_text().strip('\n')
+            return [f"```\n{text}\n```"] if text.strip() else []
+        if node.name == 'blockquote':
+            return ['\n'.join(f"> {line}" for line in block.split('\n')) for block in self.blocks(node)]
+        if node.name == 'table':
+            return [self.table(node)] if node.find('tr') else []
+        if node.name == 'hr':
+            return ['---']
+        return self.blocks(node)
+
+    def list_items(self, node: Tag, depth: int = 0) -> str:
+        lines = []
+        for number, item in enumerate(node.find_all('li', recursive=False), 1):
+            marker = f"{number}." if node.name == 'ol' else '-'
+            nested = item.find_all(['ul', 'ol'], recursive=False)
+            for child in nested:
+                child.extract()
+            text = ' '.join(_clean(block).replace('\n', ' ') for block in self.blocks(item))
+            if text:
+                lines.append(f"{'  ' * depth}{marker} {text}")
+            lines.extend(self.list_items(child, depth + 1) for child in nested if child.find('li'))
+        return '\n'.join(line for line in lines if line)
+
+    def table(self, node: Tag) -> str:
+        rows = []
+        for row in node.find_all('tr'):
+            cells = [_clean(self.inline(cell)).replace('\n', ' ').replace('|', '\\|') for cell in row.find_all(['th', 'td'])]
+            if cells:
+                rows.append(f"| {' | '.join(cells)} |")
+        if len(rows) > 1:
+            columns = rows[0].count(' | ') + 1
+            rows.insert(1, f"|{'---|' * columns}")
+        return '\n'.join(rows)
+
+
+def html_to_markdown(html: str, url: str) -> str:
+    """
+    Convert an HTML page to markdown in the shape the Jina reader returns.
+
+    The result starts with the same "Title:", "URL Source:" and "Markdown
+    Content:" header lines, followed by the page body: headings, paragraphs,
+    lists, tables, quotes and code blocks, with links and images resolved
+    against url. Scripts, styles, forms and embedded objects are dropped;
+    navigation and footers are kept, as the reader keeps them, for the
+    markdown preprocessor to remove.
+
+    Args:
+        html (str): The page HTML.
+        url (str): The page URL, used to resolve relative links.
+
+    Returns:
+        str: The page as markdown.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    title = WHITESPACE.sub(' ', soup.title.get_text()).strip() if soup.title else ''
+    base = soup.find('base', href=True)
+    base_url = urljoin(url, base['href']) if base else url
+    for tag in soup.find_all(SKIPPED_TAGS):
+        tag.decompose()
+    blocks = _Converter(base_url).blocks(soup.body or soup)
+    return '\n\n'.join([f"Title: {title}", f"URL Source: {url}", "Markdown Content:"] + blocks)
@@ -0,0 +1,124 @@
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import config
+from src.utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ListingRecord:
+    """A listing page that was fetched and had its links extracted."""
+    seed: str
+    page_num: int
+    url: str
+    articles: List[str]
+    next_page: Optional[str]
+
+
+@dataclass
+class ResumeState:
+    """The completed work recorded in a crawl journal."""
+    articles: Dict[str, Tuple[Tuple[Any, ...], Dict[str, str]]] = field(default_factory=dict)
+    listings: List[ListingRecord] = field(default_factory=list)
+    # Normalized seed URL -> (next listing page to fetch or None when done, its page number)
+    cursors: Dict[str, Tuple[Optional[str], int]] = field(default_factory=dict)
+
+    def listings_for(self, seed: str) -> List[ListingRecord]:
+        """Return the journaled listing pages of a seed, in page order."""
+        key = normalize_url(seed)
+        return sorted((r for r in self.listings if normalize_url(r.seed) == key), key=lambda r: r.page_num)
+
+    def cursor_for(self, seed: str) -> Tuple[Optional[str], int]:
+        """Return where a seed's pagination walk should continue."""
+        return self.cursors.get(normalize_url(seed), (seed, 1))
+
+
+class CrawlJournal:
+    """
+    An append-only JSONL journal of crawl progress.
+
+    Every completed article, every processed listing page and each seed's
+    pagination cursor is written (and flushed to disk) as soon as it's done,
+    so an interrupted crawl can be resumed without repeating finished work.
+    """
+
+    def __init__(self, path: str = config.JOURNAL_PATH, resume: bool = False, fsync: bool = config.JOURNAL_FSYNC):
+        """
+        Open the journal at path.
+
+        Args:
+            path (str): Journal file location.
+            resume (bool): Keep the existing journal and append to it. When
+                False, any existing journal is truncated.
+            fsync (bool): Force each record to disk before continuing.
+        """
+        self.path = path
+        self.fsync = fsync
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.state = self.load(path) if resume else ResumeState()
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    @staticmethod
+    def load(path: str) -> ResumeState:
+        """
+        Read a journal into a ResumeState.
+
+        A truncated last line, left by a crash mid-write, is ignored.
+        """
+        state = ResumeState()
+        if not os.path.exists(path):
+            return state
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    kind = record['type']
+                    if kind == 'article':
+                        state.articles[record['url']] = (tuple(record['order']), record['article'])
+                    elif kind == 'listing':
+                        state.listings.append(ListingRecord(
+                            record['seed'], record['page_num'], record['url'], record['articles'], record['next_page']
+                        ))
+                    elif kind == 'cursor':
+                        state.cursors[normalize_url(record['seed'])] = (record['page_url'], record['page_num'])
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Skipping unreadable journal line {line_num} in {path}: {e}")
+        logger.info(
+            f"Loaded journal {path}: {len(state.articles)} articles, {len(state.listings)} listing pages."
+        )
+        return state
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def record_article(self, url: str, order: Tuple[Any, ...], article: Dict[str, str]) -> None:
+        """Record a completed article, unless it was restored from this journal."""
+        if url in self.state.articles:
+            return
+        self._append({'type': 'article', 'url': url, 'order': list(order), 'article': article})
+
+    def record_listing(self, seed: str, page_num: int, url: str, articles: List[str], next_page: Optional[str]) -> None:
+        """Record a processed listing page and the links found on it."""
+        self._append({
+            'type': 'listing', 'seed': seed, 'page_num': page_num, 'url': url,
+            'articles': articles, 'next_page': next_page,
+        })
+
+    def record_cursor(self, seed: str, page_url: Optional[str], page_num: int) -> None:
+        """Record the next listing page to fetch for a seed (None once pagination ends)."""
+        self._append({'type': 'cursor', 'seed': seed, 'page_url': page_url, 'page_num': page_num})
+
+    def close(self) -> None:
+        """Close the journal file."""
+        self._file.close()
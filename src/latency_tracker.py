@@ -0,0 +1,61 @@
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from src import config
+from src.metrics import percentile
+
+
+class LatencyTracker:
+    """
+    Tracks recent request latencies per host to derive timeouts and hedge delays.
+
+    Until a host has min_samples successful requests, the timeout is
+    max_timeout and requests aren't hedged. After that the timeout is
+    timeout_multiplier times the host's p99 latency, kept between
+    min_timeout and max_timeout, and a slow request is hedged once it
+    runs past the host's hedge_percentile latency.
+    """
+
+    def __init__(
+        self,
+        window: int = config.FETCH_LATENCY_WINDOW,
+        min_samples: int = config.FETCH_LATENCY_MIN_SAMPLES,
+        min_timeout: float = config.FETCH_TIMEOUT_MIN,
+        max_timeout: float = config.FETCH_TIMEOUT_MAX,
+        timeout_multiplier: float = config.FETCH_TIMEOUT_P99_MULTIPLIER,
+        hedge_percentile: float = config.FETCH_HEDGE_PERCENTILE,
+    ):
+        """
+        Initialize the tracker, keeping the last window latencies of each host.
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.hedge_percentile = hedge_percentile
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, host: str, seconds: float) -> None:
+        """Record the latency of a successful request to host."""
+        self._samples.setdefault(host, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, host: str, fraction: float) -> Optional[float]:
+        """Return the host's latency percentile, or None without enough samples."""
+        samples = self._samples.get(host)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        return percentile(list(samples), fraction)
+
+    def timeout_for(self, host: str) -> float:
+        """Return the total timeout in seconds for the next request to host."""
+        p99 = self.percentile(host, 0.99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self, host: str) -> Optional[float]:
+        """Return how long to wait before hedging a request to host, or None to not hedge."""
+        if not self.hedge_percentile:
+            return None
+        return self.percentile(host, self.hedge_percentile)
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urljoin, urlparse
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+# Images (including images wrapped in links) are replaced by their alt text
+# before links are parsed, so "[![alt](img)](url)" becomes "[alt](url)".
+IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+LINK_PATTERN = re.compile(r'\[([^\]]*)\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+
+NEXT_TEXT_PATTERN = re.compile(
+    r'^\W*(next( page)?|older( posts)?|more|التالي|الصفحة التالية|التالى)\W*$|^\s*(»|›|>|→|>>)\s*$',
+    re.IGNORECASE,
+)
+NAVIGATION_TEXT_PATTERN = re.compile(
+    r'^\W*(home|about( us)?|contact( us)?|log ?in|sign ?(in|up)|register|privacy( policy)?|terms.*|'
+    r'cookies?.*|search|menu|skip to .*|back|previous|prev|الرئيسية|من نحن|اتصل بنا|السابق)\W*$',
+    re.IGNORECASE,
+)
+PAGE_QUERY_KEYS = ('page', 'p', 'paged', 'pg')
+PAGE_PATH_PATTERN = re.compile(r'/page/(\d+)/?$')
+
+
+class MarkdownLink(NamedTuple):
+    """A link found in page markdown, resolved against the page URL."""
+    text: str
+    url: str
+
+
+class ListingExtraction(NamedTuple):
+    """Article and next-page links found locally, with a confidence for each."""
+    articles: List[str]
+    next_page: Optional[str]
+    article_confidence: float
+    next_page_confidence: float
+
+
+def parse_markdown_links(markdown_content: str, page_url: str) -> List[MarkdownLink]:
+    """
+    Parse the [text](url) links in markdown content.
+
+    Links are resolved with urljoin, fragments are dropped and non-HTTP links
+    (mailto:, javascript:, in-page anchors) are skipped.
+    """
+    markdown_content = IMAGE_PATTERN.sub(lambda m: m.group(1), markdown_content)
+    links = []
+    for match in LINK_PATTERN.finditer(markdown_content):
+        text, href = match.group(1).strip(), match.group(2)
+        url = urljoin(page_url, href).split('#', 1)[0]
+        if urlparse(url).scheme in ('http', 'https'):
+            links.append(MarkdownLink(text, url))
+    return links
+
+
+def url_template(url: str) -> str:
+    """
+    Reduce a URL to a host-independent template of its path and query shape.
+
+    Numbers become "{n}" and slug-like segments become "{slug}", so that
+    "/en/lessons/turkey-celebrates-123" and "/en/lessons/a-new-school-7" share
+    the template "/en/lessons/{slug}".
+    """
+    parsed = urlparse(url)
+    segments = []
+    for segment in parsed.path.split('/'):
+        if not segment:
+            continue
+        if segment.isdigit():
+            segments.append('{n}')
+        elif ('-' in segment or '_' in segment) and len(segment) > 12 or len(segment) > 40:
+            segments.append('{slug}')
+        else:
+            segments.append(re.sub(r'\d+', '{n}', segment))
+    template = '/' + '/'.join(segments)
+    query_keys = sorted(key for key, _ in parse_qsl(parsed.query, keep_blank_values=True))
+    if query_keys:
+        template += '?' + '&'.join(f"{key}={{n}}" if key in PAGE_QUERY_KEYS else key for key in query_keys)
+    return template
+
+
+def page_number(url: str) -> Optional[int]:
+    """Return the pagination number encoded in a URL, if any."""
+    parsed = urlparse(url)
+    for key, value in parse_qsl(parsed.query):
+        if key in PAGE_QUERY_KEYS and value.isdigit():
+            return int(value)
+    match = PAGE_PATH_PATTERN.search(parsed.path)
+    return int(match.group(1)) if match else None
+
+
+class LinkExtractor:
+    """
+    A local, deterministic extractor for listing-page links.
+
+    Article links are chosen by URL template: templates learned for the host
+    from earlier runs when available, otherwise the dominant template among
+    the page's links. The next page is scored on its anchor text and on
+    whether its URL increments the current page number. Results come with a
+    confidence so callers can fall back to Gemini when it is low.
+    """
+
+    def __init__(self, patterns_path: Optional[str] = config.LINK_PATTERNS_PATH):
+        """
+        Initialize the extractor, loading learned host patterns from patterns_path.
+
+        Pass None to keep learned patterns in memory only.
+        """
+        self.patterns_path = patterns_path
+        self.host_patterns: Dict[str, Dict[str, Dict[str, int]]] = {}
+        if patterns_path and os.path.exists(patterns_path):
+            try:
+                with open(patterns_path, 'r', encoding='utf-8') as f:
+                    self.host_patterns = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable link patterns file {patterns_path}: {e}")
+
+    def _patterns(self, url: str, kind: str) -> Dict[str, int]:
+        # Templates seen only once may be a stray link in an LLM answer.
+        host = urlparse(url).netloc.lower()
+        counts = self.host_patterns.get(host, {}).get(kind, {})
+        return {template: count for template, count in counts.items() if count >= config.LINK_PATTERN_MIN_COUNT}
+
+    def extract(self, markdown_content: str, page_url: str) -> ListingExtraction:
+        """Extract article and next-page links from a listing page's markdown."""
+        host = urlparse(page_url).netloc.lower()
+        links = [
+            link for link in parse_markdown_links(markdown_content, page_url)
+            if urlparse(link.url).netloc.lower() == host and link.url.rstrip('/') != page_url.rstrip('/')
+        ]
+
+        next_page, next_page_confidence = self._score_next_page(links, page_url)
+        candidates = [
+            link for link in links
+            if link.url != next_page
+            and not NAVIGATION_TEXT_PATTERN.match(link.text)
+            and not NEXT_TEXT_PATTERN.match(link.text)
+            and page_number(link.url) is None
+        ]
+        articles, article_confidence = self._score_articles(candidates, page_url)
+        return ListingExtraction(articles, next_page, article_confidence, next_page_confidence)
+
+    def _score_articles(self, candidates: List[MarkdownLink], page_url: str) -> Tuple[List[str], float]:
+        learned = self._patterns(page_url, 'article_templates')
+        templates = {link.url: url_template(link.url) for link in candidates}
+
+        if learned:
+            articles = [link.url for link in candidates if templates[link.url] in learned]
+            # A host we know that suddenly shows no matching links has probably
+            # changed its layout, so let the caller double-check.
+            return list(dict.fromkeys(articles)), 0.9 if articles else 0.3
+
+        template_counts = Counter(templates[link.url] for link in {link.url: link for link in candidates}.values())
+        if not template_counts:
+            return [], 0.3
+        dominant, count = template_counts.most_common(1)[0]
+        group = [link for link in candidates if templates[link.url] == dominant]
+        titled = sum(1 for link in group if len(link.text) >= 20 or len(link.text.split()) >= 3)
+        confidence = 0.2
+        if count >= 3:
+            confidence += 0.3
+        if titled >= len(group) / 2:
+            confidence += 0.2
+        return list(dict.fromkeys(link.url for link in group)), confidence
+
+    def _score_next_page(self, links: List[MarkdownLink], page_url: str) -> Tuple[Optional[str], float]:
+        learned = self._patterns(page_url, 'next_templates')
+        current = page_number(page_url)
+        best_url, best_score = None, 0.0
+        for link in links:
+            score = 0.0
+            if NEXT_TEXT_PATTERN.match(link.text):
+                score += 0.6
+            number = page_number(link.url)
+            if number is not None and (number == current + 1 if current is not None else number in (1, 2)):
+                score += 0.5
+            if learned and url_template(link.url) in learned:
+                score += 0.3
+            if score > best_score:
+                best_url, best_score = link.url, score
+        if best_url is None:
+            # No candidate at all is only trustworthy for hosts known to paginate.
+            return None, 0.8 if learned else 0.4
+        return best_url, min(best_score, 1.0)
+
+    def learn(self, page_url: str, articles: List[str], next_page: Optional[str]) -> None:
+        """
+        Record the URL templates of links confirmed for a listing page.
+
+        Called with Gemini's answers when local extraction wasn't confident,
+        so later pages from the same host can be handled locally.
+        """
+        host = urlparse(page_url).netloc.lower()
+        patterns = self.host_patterns.setdefault(host, {'article_templates': {}, 'next_templates': {}})
+        for url in articles:
+            if urlparse(url).netloc.lower() == host:
+                template = url_template(url)
+                patterns['article_templates'][template] = patterns['article_templates'].get(template, 0) + 1
+        if next_page:
+            template = url_template(next_page)
+            patterns['next_templates'][template] = patterns['next_templates'].get(template, 0) + 1
+        self._save()
+
+    def _save(self) -> None:
+        if not self.patterns_path:
+            return
+        if os.path.dirname(self.patterns_path):
+            os.makedirs(os.path.dirname(self.patterns_path), exist_ok=True)
+        tmp_path = f"{self.patterns_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.host_patterns, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.patterns_path)
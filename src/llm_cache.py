@@ -0,0 +1,94 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict
+
+from src import config
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Returned by LLMCache.get on a miss, since None is a valid cached result.
+MISSING = object()
+
+
+class LLMCache:
+    """
+    A persistent cache of parsed Gemini responses backed by SQLite.
+
+    Keys combine the model, the prompt template version and a hash of the
+    prompt input, so changing any of them invalidates the cached result.
+    The least recently used entries are evicted beyond max_entries.
+    """
+
+    def __init__(self, path: str = config.LLM_CACHE_PATH, max_entries: int = config.LLM_CACHE_MAX_ENTRIES):
+        """
+        Open (or create) the cache database at path.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(kind: str, model: str, prompt_version: int, content: str, *extra: str) -> str:
+        """Build a cache key for one kind of Gemini call over content."""
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return "|".join([kind, model, f"v{prompt_version}", digest, *extra])
+
+    def get(self, key: str) -> Any:
+        """
+        Return the cached result for key, or MISSING.
+        """
+        row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            metrics.incr("llm_cache_misses", kind=key.split("|", 1)[0])
+            return MISSING
+        self.hits += 1
+        metrics.incr("llm_cache_hits", kind=key.split("|", 1)[0])
+        self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a parsed result, evicting the least recently used entries if needed."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, last_used) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), time.time()),
+        )
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this session."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
@@ -0,0 +1,215 @@
+import asyncio
+import itertools
+import logging
+import random
+import re
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+from src import config
+from src.metrics import metrics
+from src.utils import RETRYABLE_STATUS_CODES
+
+logger = logging.getLogger(__name__)
+
+# Lower values run first: listing pages unblock pagination and more articles,
+# so they go ahead of article translation.
+PRIORITY_LISTING = 0
+PRIORITY_ARTICLE = 10
+
+GenerateFn = Callable[[str], Awaitable[Any]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens in text (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at rate_per_minute.
+
+    The balance may go negative when a request turns out to cost more than
+    estimated, which delays the following requests until it is paid back.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        # Created on the running loop by acquire(), since a bucket may outlive
+        # the event loop it was first used on.
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until amount tokens are available, then take them."""
+        amount = min(amount, self.capacity)
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def consume(self, amount: float) -> None:
+        """Take amount tokens without waiting, possibly going negative."""
+        self._refill()
+        self.tokens -= amount
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Return the server-requested retry delay for an API error, if it has one.
+
+    Checks the Retry-After response header and the RetryInfo "retryDelay"
+    detail that Gemini includes in 429 responses.
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    retry_after = headers.get('retry-after') or headers.get('Retry-After')
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    match = re.search(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s", str(getattr(error, 'details', '') or error))
+    return float(match.group(1)) if match else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Return True for rate limits, server errors, timeouts and dropped connections."""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return getattr(error, 'code', None) in RETRYABLE_STATUS_CODES
+
+
+class LLMScheduler:
+    """
+    Schedules Gemini calls within the API's rate limits.
+
+    Requests wait in a priority queue and are served by up to max_concurrency
+    workers. Each call first takes from a requests-per-minute and a
+    tokens-per-minute bucket. Rate-limited and transient failures are retried
+    with exponential backoff and jitter, honoring any retry delay the server
+    asks for.
+    """
+
+    def __init__(
+        self,
+        generate: GenerateFn,
+        requests_per_minute: float = config.GEMINI_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = config.GEMINI_TOKENS_PER_MINUTE,
+        max_concurrency: int = config.GEMINI_MAX_CONCURRENCY,
+        max_retries: int = config.GEMINI_MAX_RETRIES,
+        base_delay: float = config.GEMINI_RETRY_BASE_DELAY,
+        max_delay: float = config.GEMINI_RETRY_MAX_DELAY,
+    ):
+        """
+        Initialize the scheduler around a coroutine that sends one prompt.
+        """
+        self.generate = generate
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self._order = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    async def submit(self, prompt: str, priority: int = PRIORITY_ARTICLE, kind: str = "generate") -> Any:
+        """
+        Queue a prompt and wait for its response.
+
+        kind names the type of call in the recorded metrics.
+
+        Raises:
+            Exception: The last error if the call failed after all retries.
+        """
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((priority, next(self._order), prompt, kind, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop the workers."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, prompt, kind, future = await self._queue.get()
+            try:
+                if not future.cancelled():
+                    response = await self._call_with_retries(prompt, kind)
+                    if not future.cancelled():
+                        future.set_result(response)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def _call_with_retries(self, prompt: str, kind: str = "generate") -> Any:
+        estimated_tokens = estimate_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            with metrics.span("gemini_rate_limit_wait", kind=kind):
+                await self.request_bucket.acquire()
+                await self.token_bucket.acquire(estimated_tokens)
+            try:
+                with metrics.span("gemini_call", kind=kind):
+                    response = await self.generate(prompt)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    metrics.incr("gemini_errors", kind=kind)
+                    raise
+                delay = self._backoff_delay(attempt, retry_after_seconds(e))
+                self.retries += 1
+                metrics.incr("gemini_retries", kind=kind)
+                logger.warning(f"Gemini call failed ({e}); retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries}).")
+                await asyncio.sleep(delay)
+                continue
+            usage = getattr(response, 'usage_metadata', None)
+            prompt_tokens = getattr(usage, 'prompt_token_count', None)
+            response_tokens = getattr(usage, 'candidates_token_count', None)
+            metrics.incr("gemini_prompt_tokens", prompt_tokens if isinstance(prompt_tokens, int) else estimated_tokens, kind=kind)
+            if isinstance(response_tokens, int):
+                metrics.incr("gemini_response_tokens", response_tokens, kind=kind)
+            # Gemini's tokens-per-minute limit counts input tokens, so the
+            # bucket is charged the prompt estimate up front and corrected
+            # against the reported prompt size, not the total with the response.
+            if isinstance(prompt_tokens, int) and prompt_tokens > estimated_tokens:
+                self.token_bucket.consume(prompt_tokens - estimated_tokens)
+            return response
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        delay = random.uniform(delay / 2, delay)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
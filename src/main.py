@@ -1,74 +1,389 @@
 import asyncio
+import datetime
 import os
 import argparse
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 import sys
-from tqdm.asyncio import tqdm # Import tqdm.asyncio for async progress bars
 
 # Add the project root to sys.path to allow imports from sibling directories like 'tests'
 # This line is crucial for absolute imports to work when main.py is run directly.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.scraper import scrape_all_articles # Changed to absolute import
-from src.pdf_generator import generate_pdf # Changed to absolute import
+# Only lightweight modules are imported here. The scraper (Gemini SDK, aiohttp)
+# and the PDF stack (fpdf, reshaping) are imported by the commands that use
+# them, so `render` never loads the crawl dependencies and vice versa.
+from src.metrics import metrics
 from src import config # This remains correct
 
-async def main() -> None:
+SUBCOMMANDS = ("crawl", "render", "bench")
+
+def _add_pdf_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--output", type=str, default=config.PDF_PATH, help=f"PDF file to write; with --stream, the base name of the volumes (default: {config.PDF_PATH}).")
+    parser.add_argument("--render-workers", type=int, default=config.RENDER_WORKERS, help=f"Processes used to render the PDF in parallel shards (default: {config.RENDER_WORKERS}).")
+    parser.add_argument("--bookmarks", action="store_true", help="Add a PDF bookmark for each article.")
+    parser.add_argument("--pdf-cache", action="store_true", help="Render each article into a cached fragment and reuse unchanged ones on later runs. Faster re-renders, but a much larger PDF, since every fragment embeds its own font subsets.")
+
+def _add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--cache-dir", type=str, default=config.CACHE_DIR, help=f"Base directory shared by the on-disk caches: fetched pages in pages/, Gemini responses and the others (default: {config.CACHE_DIR}).")
+    parser.add_argument("--profile", action="store_true", help="Record per-stage timings and counters and write them to profile.json and profile.prom.")
+    parser.add_argument("--profile-dir", type=str, default=config.OUTPUT_DIR, help=f"Directory for the --profile reports (default: {config.OUTPUT_DIR}).")
+
+def build_parser() -> argparse.ArgumentParser:
     """
-    Scrape all articles from a list of URLs and generate a PDF with the content.
+    Build the command-line parser with its crawl, render and bench subcommands.
     """
-    # Parse command-line arguments
     parser = argparse.ArgumentParser(description="Scrape Arabic articles and generate a PDF.")
-    parser.add_argument("url", type=str, nargs='?', default=None, help="The starting URL to scrape (e.g., 'https://learning.aljazeera.net/en/lessons/level/elementary')")
-    parser.add_argument("--dummy-data", action="store_true", help="Use dummy data for PDF generation instead of scraping.")
-    args = parser.parse_args()
-
-    all_articles: Dict[str, Dict[str, str]] = {}
-    all_next_page_links: List[str] = []
-
-    if args.dummy_data:
-        print("Using dummy data for PDF generation.")
-        from tests.data.dummy_articles import DUMMY_ARTICLES
-        all_articles = DUMMY_ARTICLES
-        # Dummy data doesn't involve next page links, so this list remains empty
-    else:
-        if not args.url:
-            print("Error: URL is required unless --dummy-data is used.")
-            parser.print_help()
-            return
-
-        urls = [args.url]
-
-        # Create tasks for scraping
-        # Use tqdm.asyncio.gather for a progress bar over multiple URLs if needed
-        tasks = [scrape_all_articles(url) for url in urls]
-        list_of_results_and_links: List[Tuple[Dict[str, Dict[str, str]], List[str]]] = await tqdm.gather(*tasks, desc="Scraping URLs")
-
-        # Combine results and collect all next page links
-        for articles_dict, next_page_links in list_of_results_and_links:
-            all_articles.update(articles_dict)
-            all_next_page_links.extend(next_page_links)
-
-    # Check if we have any articles before generating PDF
-    if not all_articles:
-        print("Error: No articles were found to generate the PDF.")
+    subparsers = parser.add_subparsers(dest="command", metavar="{crawl,render,bench}")
+
+    crawl_parser = subparsers.add_parser("crawl", help="Scrape articles from one or more URLs and generate the PDF (the default command).")
+    crawl_parser.add_argument("url", type=str, nargs='*', default=[], help="One or more starting URLs to scrape (e.g., 'https://learning.aljazeera.net/en/lessons/level/elementary')")
+    crawl_parser.add_argument("--seeds-file", type=str, default=None, help="File with additional starting URLs, one per line.")
+    crawl_parser.add_argument("--dummy-data", action="store_true", help="Use dummy data for PDF generation instead of scraping.")
+    crawl_parser.add_argument("--fetch-concurrency", type=int, default=config.FETCH_CONCURRENCY, help=f"Maximum number of article pages fetched concurrently (default: {config.FETCH_CONCURRENCY}).")
+    crawl_parser.add_argument("--llm-concurrency", type=int, default=config.LLM_CONCURRENCY, help=f"Maximum number of concurrent Gemini article calls (default: {config.LLM_CONCURRENCY}).")
+    crawl_parser.add_argument("--prefetch-depth", type=int, default=config.LISTING_PREFETCH_DEPTH, help=f"Number of listing pages fetched ahead of the page being processed (default: {config.LISTING_PREFETCH_DEPTH}).")
+    crawl_parser.add_argument("--no-cache", action="store_true", help="Fetch every page from the network without reading or writing the page cache.")
+    crawl_parser.add_argument("--no-llm-cache", action="store_true", help="Call Gemini for every page without reading or writing cached responses.")
+    crawl_parser.add_argument("--no-local-links", action="store_true", help="Always ask Gemini for listing-page links instead of trying the local extractor first.")
+    crawl_parser.add_argument("--no-preprocess", action="store_true", help="Send page markdown to Gemini as fetched, without stripping boilerplate and link noise.")
+    crawl_parser.add_argument("--no-dedup", action="store_true", help="Translate every article, even near-duplicates of articles already translated.")
+    crawl_parser.add_argument("--dedup-threshold", type=float, default=config.NEAR_DUPLICATE_THRESHOLD, help=f"Estimated similarity at which an article reuses the translation of an earlier one (default: {config.NEAR_DUPLICATE_THRESHOLD}).")
+    crawl_parser.add_argument("--token-budget", type=int, default=config.MARKDOWN_TOKEN_BUDGET, help=f"Maximum estimated tokens of listing page markdown per Gemini call (default: {config.MARKDOWN_TOKEN_BUDGET}).")
+    crawl_parser.add_argument("--listing-mode", choices=["combined", "separate"], default=config.LISTING_LLM_MODE, help=f"Ask Gemini for a listing page's article links and next page in one call or two separate calls (default: {config.LISTING_LLM_MODE}).")
+    crawl_parser.add_argument("--llm-rpm", type=float, default=config.GEMINI_REQUESTS_PER_MINUTE, help=f"Gemini requests-per-minute limit (default: {config.GEMINI_REQUESTS_PER_MINUTE}).")
+    crawl_parser.add_argument("--llm-tpm", type=float, default=config.GEMINI_TOKENS_PER_MINUTE, help=f"Gemini tokens-per-minute limit (default: {config.GEMINI_TOKENS_PER_MINUTE}).")
+    crawl_parser.add_argument("--per-host-concurrency", type=int, default=config.PER_HOST_CONCURRENCY, help=f"Maximum concurrent requests per host (default: {config.PER_HOST_CONCURRENCY}).")
+    crawl_parser.add_argument("--per-host-delay", type=float, default=config.PER_HOST_DELAY, help=f"Minimum seconds between requests to the same host (default: {config.PER_HOST_DELAY}).")
+    crawl_parser.add_argument("--direct-host", action="append", default=list(config.DIRECT_FETCH_HOSTS), help="Fetch pages on this host (and its subdomains) directly and convert them to markdown locally instead of via Jina AI. Can be repeated.")
+    crawl_parser.add_argument("--journal", type=str, default=config.JOURNAL_PATH, help=f"File recording crawl progress as it completes (default: {config.JOURNAL_PATH}).")
+    crawl_parser.add_argument("--resume", action="store_true", help="Resume an interrupted crawl from the journal instead of starting over.")
+    crawl_parser.add_argument("--corpus", type=str, default=config.CORPUS_PATH, help=f"Article store each translated article is written to, for later `render` runs (default: {config.CORPUS_PATH}).")
+    crawl_parser.add_argument("--no-corpus", action="store_true", help="Don't write articles to the corpus store.")
+    crawl_parser.add_argument("--stream", action="store_true", help="Render articles into PDF volumes as they are scraped instead of one PDF at the end.")
+    crawl_parser.add_argument("--volume-articles", type=int, default=config.PDF_VOLUME_ARTICLES, help=f"Articles per PDF volume with --stream (default: {config.PDF_VOLUME_ARTICLES}).")
+    crawl_parser.add_argument("--volume-mb", type=float, default=config.PDF_VOLUME_BYTES / (1024 * 1024), help=f"Approximate size in MB per PDF volume with --stream (default: {config.PDF_VOLUME_BYTES // (1024 * 1024)}).")
+    _add_pdf_arguments(crawl_parser)
+    _add_common_arguments(crawl_parser)
+
+    render_parser = subparsers.add_parser("render", help="Generate the PDF from the corpus store, a crawl journal or dummy data, without scraping.")
+    render_parser.add_argument("--corpus", type=str, default=config.CORPUS_PATH, help=f"Article store to render from (default: {config.CORPUS_PATH}).")
+    render_parser.add_argument("--level", type=str, default=None, help="Only render articles found under this level, e.g. 'elementary'.")
+    render_parser.add_argument("--since", type=datetime.date.fromisoformat, default=None, help="Only render articles crawled on or after this date (YYYY-MM-DD).")
+    render_parser.add_argument("--until", type=datetime.date.fromisoformat, default=None, help="Only render articles crawled on or before this date (YYYY-MM-DD).")
+    render_parser.add_argument("--keyword", type=str, default=None, help="Only render articles whose Arabic or English title or content contains all of these words.")
+    render_parser.add_argument("--journal", type=str, default=None, help="Render the articles recorded in this crawl journal instead of the corpus.")
+    render_parser.add_argument("--dummy-data", action="store_true", help="Render the dummy articles instead of the corpus.")
+    _add_pdf_arguments(render_parser)
+    _add_common_arguments(render_parser)
+
+    # Parsed by benchmarks/bench_crawl.py itself; listed here for --help.
+    subparsers.add_parser("bench", help="Benchmark the crawl against fake Jina and Gemini services (see `bench --help`).", add_help=False)
+    return parser
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> Tuple[argparse.Namespace, argparse.ArgumentParser]:
+    """
+    Parse and validate command-line arguments.
+
+    Without a subcommand, crawl is assumed, so `main.py <url>` keeps working.
+    """
+    parser = build_parser()
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] == "bench":
+        return argparse.Namespace(command="bench", bench_args=argv[1:]), parser
+    if not argv or argv[0] not in SUBCOMMANDS + ("-h", "--help"):
+        argv.insert(0, "crawl")
+    args = parser.parse_args(argv)
+
+    if args.render_workers < 1:
+        parser.error("--render-workers must be at least 1.")
+    if args.command != "crawl":
+        filters = (args.level, args.since, args.until, args.keyword)
+        if (args.journal or args.dummy_data) and any(value is not None for value in filters):
+            parser.error("--level, --since, --until and --keyword only apply when rendering from the corpus.")
+        if not (args.journal or args.dummy_data) and not os.path.exists(args.corpus):
+            parser.error(f"Corpus {args.corpus} does not exist; run crawl first or pass --corpus.")
+        return args, parser
+    if args.fetch_concurrency < 1 or args.llm_concurrency < 1:
+        parser.error("--fetch-concurrency and --llm-concurrency must be at least 1.")
+    if args.prefetch_depth < 0:
+        parser.error("--prefetch-depth must not be negative.")
+    if args.llm_rpm <= 0 or args.llm_tpm <= 0:
+        parser.error("--llm-rpm and --llm-tpm must be positive.")
+    if args.per_host_concurrency < 1 or args.per_host_delay < 0:
+        parser.error("--per-host-concurrency must be at least 1 and --per-host-delay must not be negative.")
+    if args.volume_articles < 1 or args.volume_mb <= 0:
+        parser.error("--volume-articles must be at least 1 and --volume-mb must be positive.")
+    if args.stream and (args.render_workers > 1 or args.bookmarks or args.pdf_cache):
+        parser.error("--render-workers, --bookmarks and --pdf-cache don't apply with --stream.")
+    if args.token_budget < 1:
+        parser.error("--token-budget must be at least 1.")
+    if not 0 < args.dedup_threshold <= 1:
+        parser.error("--dedup-threshold must be greater than 0 and at most 1.")
+    return args, parser
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Run the subcommand given on the command line (crawl by default).
+    """
+    args, parser = parse_args(argv)
+    if args.command == "bench":
+        from benchmarks.bench_crawl import main as bench_main
+        bench_main(args.bench_args)
         return
 
-    # Generate PDF
+    if args.profile:
+        metrics.enable()
+    try:
+        asyncio.run(run(args, parser))
+    finally:
+        if args.profile:
+            metrics.write_json(os.path.join(args.profile_dir, 'profile.json'))
+            metrics.write_prometheus(os.path.join(args.profile_dir, 'profile.prom'))
+
+def setup_pdf_stack(cache_dir: str):
+    """
+    Install the persistent font and shaping caches used by the PDF renderer.
+
+    Returns the TextShaper, to be saved once rendering is done.
+    """
+    from src.font_cache import FontCache, set_font_cache
+    from src.text_shaping import TextShaper, set_text_shaper
+
+    set_font_cache(FontCache(os.path.join(cache_dir, 'fonts')))
+    text_shaper = TextShaper(path=os.path.join(cache_dir, 'shaped_text.json'))
+    set_text_shaper(text_shaper)
+    return text_shaper
+
+def load_journal_articles(path: str) -> Dict[str, Dict[str, str]]:
+    """
+    Return the articles recorded in a crawl journal, in crawl order.
+    """
+    from src.journal import CrawlJournal
+
+    recorded = CrawlJournal.load(path).articles
+    return {url: article for url, (_, article) in sorted(recorded.items(), key=lambda item: item[1][0])}
+
+async def run(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    """
+    Scrape (or load dummy, journaled or stored) articles as configured by args and generate the PDF output.
+    """
     os.makedirs(config.OUTPUT_DIR, exist_ok=True) # Use OUTPUT_DIR from config
-    pdf_path = os.path.join(config.OUTPUT_DIR, 'arabic_lessons.pdf')
+    pdf_path = args.output
+    if os.path.dirname(pdf_path):
+        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+    crawling = args.command == "crawl" and not args.dummy_data
+    stream = args.command == "crawl" and args.stream
+
+    if crawling:
+        from src.scraper import get_gemini_client
+
+        # Every article goes through Gemini, so fail before fetching anything.
+        try:
+            get_gemini_client()
+        except ValueError as e:
+            parser.error(str(e))
+
+    # With --stream, articles are handed to the PDF renderer through this queue
+    # as soon as they're ready; None marks the end of the stream. It is
+    # bounded, so a crawl that outpaces the renderer waits for it.
+    stream_queue: asyncio.Queue = asyncio.Queue(maxsize=config.PDF_STREAM_QUEUE_SIZE)
+    render_task = None
+    text_shaper = None
+    if stream:
+        from src.pdf_generator import fonts_available, generate_pdf_stream
+
+        # Streamed articles aren't kept, so fail before crawling rather than after.
+        if not fonts_available():
+            parser.error("--stream needs the PDF fonts installed.")
+        text_shaper = setup_pdf_stack(args.cache_dir)
+
+        async def streamed_articles():
+            while True:
+                item = await stream_queue.get()
+                if item is None:
+                    return
+                yield item
+
+        render_task = asyncio.create_task(generate_pdf_stream(
+            streamed_articles(),
+            pdf_path,
+            volume_articles=args.volume_articles,
+            volume_bytes=int(args.volume_mb * 1024 * 1024),
+        ))
+
+    def renderer_error() -> BaseException:
+        # The renderer only returns once it has been handed None, so anything
+        # else that ends it early is an error.
+        return render_task.exception() or RuntimeError("The PDF renderer stopped before the end of the stream.")
+
+    async def hand_to_renderer(item) -> None:
+        # Raise the renderer's error rather than queue articles nobody will read.
+        if render_task.done():
+            raise renderer_error()
+        put = asyncio.ensure_future(stream_queue.put(item))
+        await asyncio.wait({put, render_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            raise renderer_error()
+
+    async def unless_renderer_fails(coro):
+        # The pipeline logs and carries on past a failed delivery, so a crawl
+        # feeding a failed renderer is cancelled here instead.
+        if render_task is None:
+            return await coro
+        task = asyncio.ensure_future(coro)
+        await asyncio.wait({task, render_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            raise renderer_error()
+        return task.result()
+
+    # The corpus receives crawled articles, or is the source rendered from.
+    corpus = None
+    if (crawling and not args.no_corpus) or (args.command == "render" and not args.dummy_data and not args.journal):
+        from src.corpus_store import CorpusStore
+        corpus = CorpusStore(args.corpus)
+    # Created for a crawl, and stopped once it's done.
+    llm_scheduler = None
+
+    try:
+        all_articles: Dict[str, Dict[str, str]] = {}
+        all_next_page_links: List[str] = []
+
+        if args.dummy_data:
+            print("Using dummy data for PDF generation.")
+            from src.dummy_articles import DUMMY_ARTICLES
+            all_articles = DUMMY_ARTICLES
+            # Dummy data doesn't involve next page links, so this list remains empty
+            if stream:
+                for url, article in all_articles.items():
+                    await hand_to_renderer((url, article))
+        elif args.command == "render" and args.journal:
+            print(f"Rendering articles from {args.journal}.")
+            all_articles = load_journal_articles(args.journal)
+        elif args.command == "render":
+            # Read lazily: articles are loaded one at a time while the PDF is laid out.
+            all_articles = corpus.select(level=args.level, since=args.since, until=args.until, keyword=args.keyword)
+            print(f"Rendering {len(all_articles)} articles from {args.corpus}.")
+        else:
+            from src.fetch_cache import FetchCache
+            from src.frontier import load_seeds_file
+            from src.journal import CrawlJournal
+            from src.link_extractor import LinkExtractor
+            from src.llm_cache import LLMCache
+            from src.markdown_preprocessor import MarkdownPreprocessor
+            from src.near_duplicates import NearDuplicateIndex
+            from src.scraper import create_llm_scheduler, crawl
+
+            urls = list(args.url)
+            if args.seeds_file:
+                urls.extend(load_seeds_file(args.seeds_file))
+            if not urls:
+                print("Error: URL is required unless --dummy-data is used.")
+                parser.print_help()
+                return
+
+            cache = None if args.no_cache else FetchCache(os.path.join(args.cache_dir, 'pages'))
+            llm_cache = None if args.no_llm_cache else LLMCache(os.path.join(args.cache_dir, 'llm_responses.sqlite3'))
+            llm_scheduler = create_llm_scheduler(requests_per_minute=args.llm_rpm, tokens_per_minute=args.llm_tpm)
+            link_extractor = None
+            if not args.no_local_links:
+                link_extractor = LinkExtractor(os.path.join(args.cache_dir, 'link_patterns.json'))
+            preprocessor = None
+            if not args.no_preprocess:
+                preprocessor = MarkdownPreprocessor(os.path.join(args.cache_dir, 'boilerplate.json'), token_budget=args.token_budget)
+            duplicates = None
+            if not args.no_dedup:
+                duplicates = NearDuplicateIndex(os.path.join(args.cache_dir, 'near_duplicates.sqlite3'), threshold=args.dedup_threshold)
+
+            journal = CrawlJournal(args.journal, resume=args.resume)
+            try:
+                all_articles, all_next_page_links = await unless_renderer_fails(crawl(
+                    urls,
+                    fetch_concurrency=args.fetch_concurrency,
+                    llm_concurrency=args.llm_concurrency,
+                    prefetch_depth=args.prefetch_depth,
+                    cache=cache,
+                    per_host_concurrency=args.per_host_concurrency,
+                    per_host_delay=args.per_host_delay,
+                    direct_hosts=args.direct_host,
+                    journal=journal,
+                    on_article=(lambda url, order, article: hand_to_renderer((url, article))) if stream else None,
+                    keep_results=not stream,
+                    duplicates=duplicates,
+                    corpus=corpus,
+                    llm_scheduler=llm_scheduler,
+                    llm_cache=llm_cache,
+                    link_extractor=link_extractor,
+                    listing_mode=args.listing_mode,
+                    preprocessor=preprocessor,
+                ))
+            finally:
+                journal.close()
+                if preprocessor:
+                    preprocessor.save()
+
+            if preprocessor:
+                stats = preprocessor.stats
+                print(f"Markdown preprocessing: {stats.tokens_saved} of {stats.tokens_before} estimated tokens saved over {stats.pages} pages ({stats.boilerplate_blocks} boilerplate blocks removed, {stats.truncated_pages} pages truncated).")
+
+            if duplicates is not None:
+                print(f"Near-duplicate detection: {duplicates.reused} translations reused, {len(duplicates)} articles indexed.")
+                duplicates.close()
+
+            if llm_cache:
+                stats = llm_cache.stats()
+                print(f"Gemini response cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries.")
+                llm_cache.close()
+
+        if stream:
+            await hand_to_renderer(None)
+            volume_paths = await render_task
+            text_shaper.save()
+            if not volume_paths:
+                print("Error: No articles were found to generate the PDF.")
+                return
+            for path in volume_paths:
+                print(f"- {path}")
+        else:
+            # Check if we have any articles before generating PDF
+            if not all_articles:
+                print("Error: No articles were found to generate the PDF.")
+                return
+
+            # Generate PDF
+            from src.pdf_cache import FragmentCache
+            from src.pdf_generator import generate_pdf
 
-    print(f"Generating PDF with {len(all_articles)} articles...")
-    generate_pdf(all_articles, pdf_path)
-    print(f"PDF generated successfully at: {pdf_path}")
+            print(f"Generating PDF with {len(all_articles)} articles...")
+            text_shaper = setup_pdf_stack(args.cache_dir)
+            fragment_cache = FragmentCache(os.path.join(args.cache_dir, 'pdf_fragments')) if args.pdf_cache else None
+            generate_pdf(all_articles, pdf_path, workers=args.render_workers, bookmarks=args.bookmarks, fragment_cache=fragment_cache)
+            text_shaper.save()
+            print(f"PDF generated successfully at: {pdf_path}")
 
-    # Print the next page links (only if not using dummy data)
-    if not args.dummy_data and all_next_page_links:
-        print("\nDiscovered Next Page Links:")
-        for link in sorted(list(set(all_next_page_links))): # Print unique links
-            print(f"- {link}")
-    elif not args.dummy_data:
-        print("\nNo additional next page links were discovered.")
+        # Print the next page links (only when articles were scraped)
+        if crawling and all_next_page_links:
+            print("\nDiscovered Next Page Links:")
+            for link in sorted(list(set(all_next_page_links))): # Print unique links
+                print(f"- {link}")
+        elif crawling:
+            print("\nNo additional next page links were discovered.")
+    finally:
+        if render_task is not None and not render_task.done():
+            render_task.cancel()
+            try:
+                await render_task
+            except asyncio.CancelledError:
+                pass
+        if corpus is not None:
+            corpus.close()
+        if llm_scheduler is not None:
+            await llm_scheduler.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
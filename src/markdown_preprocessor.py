@@ -0,0 +1,261 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src import config
+from src.link_extractor import IMAGE_PATTERN, LINK_PATTERN
+from src.llm_scheduler import estimate_tokens
+from src.metrics import metrics
+from src.utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SEPARATOR = re.compile(r'\n\s*\n')
+# "[![alt](img)](url)" is reduced to "[alt](url)"; bare images to their alt text.
+LINKED_IMAGE_PATTERN = re.compile(r'\[!\[([^\]]*)\]\([^)]*\)\]')
+EMPTY_LINK_PATTERN = re.compile(r'\[\s*\]\([^)]*\)')
+# Headers Jina adds above the page content; kept even if repeated.
+JINA_HEADER_PATTERN = re.compile(r'^(Title|URL Source|Published Time|Markdown Content):', re.MULTILINE)
+# Short text blocks such as recurring lesson headings are never treated as boilerplate.
+MIN_BOILERPLATE_CHARS = 30
+# Bump whenever process() trims a page differently, so cached Gemini results
+# for pages that went through it are not reused.
+PREPROCESS_VERSION = 2
+
+
+@dataclass
+class PreprocessStats:
+    """Running totals of what preprocessing removed."""
+    pages: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    boilerplate_blocks: int = 0
+    truncated_pages: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def _block_key(block: str) -> str:
+    return hashlib.sha1(' '.join(block.split()).encode('utf-8')).hexdigest()[:16]
+
+
+def _page_key(page_url: str) -> str:
+    return hashlib.sha1(normalize_url(page_url).encode('utf-8')).hexdigest()[:12]
+
+
+def collapse_link_noise(markdown_content: str, keep_links: bool) -> str:
+    """
+    Reduce images to their alt text and, unless keep_links is set, links to their text.
+
+    Links with no text are dropped in either case.
+    """
+    markdown_content = LINKED_IMAGE_PATTERN.sub(lambda m: f"[{m.group(1).strip()}]", markdown_content)
+    markdown_content = IMAGE_PATTERN.sub(lambda m: m.group(1).strip(), markdown_content)
+    markdown_content = EMPTY_LINK_PATTERN.sub('', markdown_content)
+    if not keep_links:
+        markdown_content = LINK_PATTERN.sub(lambda m: m.group(1).strip(), markdown_content)
+    return markdown_content
+
+
+def split_into_chunks(markdown_content: str, max_tokens: int) -> List[str]:
+    """
+    Split markdown into chunks of at most about max_tokens estimated tokens.
+
+    Chunks are made of whole paragraphs (blocks separated by blank lines)
+    where possible. A paragraph longer than max_tokens is split between its
+    lines, and a single overlong line at a sentence boundary or, failing
+    that, at max_tokens worth of characters.
+    """
+    max_chars = max_tokens * 4
+    pieces = []
+    for block in BLOCK_SEPARATOR.split(markdown_content):
+        block = block.strip()
+        if not block:
+            continue
+        if estimate_tokens(block) <= max_tokens:
+            pieces.append(block)
+            continue
+        for line in block.split('\n'):
+            while len(line) > max_chars:
+                cut = max(line.rfind(mark, 0, max_chars) for mark in ('. ', '؟ ', '! '))
+                cut = cut + 1 if cut > 0 else max_chars
+                pieces.append(line[:cut].strip())
+                line = line[cut:]
+            if line.strip():
+                pieces.append(line.strip())
+
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+class MarkdownPreprocessor:
+    """
+    Trims fetched page markdown before it's sent to Gemini.
+
+    Pages are split into blocks at blank lines. A block that has appeared
+    on at least min_pages different pages of the same host (navigation,
+    footers, cookie banners) is learned as boilerplate and removed. Image
+    links are reduced to their alt text and link targets are dropped from
+    article pages. Listing pages beyond token_budget are cut at a block
+    boundary; articles are not, since long ones are translated in chunks.
+    Learned boilerplate can be saved to a JSON file.
+    """
+
+    def __init__(
+        self,
+        boilerplate_path: Optional[str] = config.BOILERPLATE_PATH,
+        min_pages: int = config.BOILERPLATE_MIN_PAGES,
+        token_budget: int = config.MARKDOWN_TOKEN_BUDGET,
+        max_blocks_per_host: int = config.BOILERPLATE_MAX_BLOCKS_PER_HOST,
+    ):
+        """
+        Initialize the preprocessor, loading learned boilerplate from boilerplate_path if it exists.
+
+        Pass boilerplate_path=None to learn boilerplate in memory only.
+        """
+        self.boilerplate_path = boilerplate_path
+        self.min_pages = min_pages
+        self.token_budget = token_budget
+        self.max_blocks_per_host = max_blocks_per_host
+        self.stats = PreprocessStats()
+        # host -> block key -> the (up to min_pages) distinct pages it appeared on.
+        # Pages rather than a count, so fetching the same page again, in this
+        # run or a later one, never makes its content look like boilerplate.
+        self.block_pages: Dict[str, Dict[str, List[str]]] = {}
+        if boilerplate_path and os.path.exists(boilerplate_path):
+            try:
+                with open(boilerplate_path, 'r', encoding='utf-8') as f:
+                    self.block_pages = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable boilerplate file {boilerplate_path}: {e}")
+
+    def _observe(self, host: str, page_url: str, blocks: List[str]) -> None:
+        page_key = _page_key(page_url)
+        host_blocks = self.block_pages.setdefault(host, {})
+        for key in {_block_key(block) for block in blocks}:
+            pages = host_blocks.setdefault(key, [])
+            if len(pages) < self.min_pages and page_key not in pages:
+                pages.append(page_key)
+        if len(host_blocks) > self.max_blocks_per_host:
+            # Forget the blocks seen on the fewest pages; boilerplate keeps recurring.
+            by_pages = sorted(host_blocks, key=lambda key: len(host_blocks[key]))
+            for key in by_pages[:len(host_blocks) - self.max_blocks_per_host]:
+                del host_blocks[key]
+
+    def is_boilerplate(self, host: str, block: str) -> bool:
+        """Return True if block has been seen on enough pages of host to be boilerplate."""
+        if JINA_HEADER_PATTERN.match(block):
+            return False
+        if len(block) < MIN_BOILERPLATE_CHARS and not LINK_PATTERN.search(block):
+            return False
+        return len(self.block_pages.get(host, {}).get(_block_key(block), ())) >= self.min_pages
+
+    def process(self, markdown_content: str, page_url: str, keep_links: bool = False) -> str:
+        """
+        Trim a page's markdown.
+
+        Args:
+            markdown_content (str): The page as fetched.
+            page_url (str): The page URL, whose host boilerplate is learned under.
+            keep_links (bool): Keep link targets and apply the token budget,
+                for listing pages whose links are what Gemini is asked for.
+
+        Returns:
+            str: The trimmed markdown.
+        """
+        host = urlparse(page_url).netloc.lower()
+        blocks = [block.strip() for block in BLOCK_SEPARATOR.split(markdown_content) if block.strip()]
+        self._observe(host, page_url, blocks)
+
+        kept = []
+        removed = 0
+        for block in blocks:
+            if self.is_boilerplate(host, block):
+                removed += 1
+                continue
+            block = collapse_link_noise(block, keep_links).strip()
+            if block:
+                kept.append(block)
+
+        truncated = False
+        if keep_links:
+            kept, truncated = self._fit_budget(kept)
+        result = '\n\n'.join(kept)
+
+        before, after = estimate_tokens(markdown_content), estimate_tokens(result)
+        self.stats.pages += 1
+        self.stats.tokens_before += before
+        self.stats.tokens_after += after
+        self.stats.boilerplate_blocks += removed
+        self.stats.truncated_pages += truncated
+        metrics.incr("preprocess_tokens_before", before)
+        metrics.incr("preprocess_tokens_saved", before - after)
+        logger.info(
+            f"Preprocessed {page_url}: {before} -> {after} tokens ({before - after} saved, "
+            f"{removed} boilerplate blocks removed{', truncated' if truncated else ''})."
+        )
+        return result
+
+    def cache_key(self, markdown_content: str) -> str:
+        """
+        Return what Gemini results for a page processed from markdown_content are cached under.
+
+        Unlike the processed markdown, it doesn't change as boilerplate is
+        learned, so a page fetched again still hits the cache.
+        """
+        digest = hashlib.sha256(markdown_content.encode('utf-8')).hexdigest()
+        return f"preprocessed-v{PREPROCESS_VERSION}:{self.token_budget}:{digest}"
+
+    def _fit_budget(self, blocks: List[str]) -> Tuple[List[str], bool]:
+        total = sum(estimate_tokens(block) for block in blocks)
+        if total <= self.token_budget:
+            return blocks, False
+        # The links matter most, and the next-page link is usually near the
+        # end, so drop text-only blocks before cutting.
+        with_links = [block for block in blocks if LINK_PATTERN.search(block)]
+        if sum(estimate_tokens(block) for block in with_links) <= self.token_budget:
+            link_blocks = set(with_links)
+            surplus = total - self.token_budget
+            kept = []
+            for block in reversed(blocks):
+                if surplus > 0 and block not in link_blocks:
+                    surplus -= estimate_tokens(block)
+                    continue
+                kept.append(block)
+            return kept[::-1], True
+        blocks = with_links
+        kept, used = [], 0
+        for block in blocks:
+            cost = estimate_tokens(block)
+            if used + cost > self.token_budget:
+                break
+            kept.append(block)
+            used += cost
+        return kept, True
+
+    def save(self) -> None:
+        """Write the learned boilerplate to boilerplate_path, if set."""
+        if not self.boilerplate_path:
+            return
+        if os.path.dirname(self.boilerplate_path):
+            os.makedirs(os.path.dirname(self.boilerplate_path), exist_ok=True)
+        tmp_path = f"{self.boilerplate_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.block_pages, f)
+        os.replace(tmp_path, self.boilerplate_path)
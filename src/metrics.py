@@ -0,0 +1,191 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Prefix for every metric name in the Prometheus textfile
+PROMETHEUS_PREFIX = "arabic_scraper_"
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _series_key(name: str, labels: Dict[str, Any]) -> SeriesKey:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of samples (0 for no samples)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    # The smallest sample with at least fraction of the samples at or below it.
+    # The epsilon keeps float error, as in 0.07 * 100, from adding a rank.
+    rank = math.ceil(fraction * len(ordered) - 1e-9)
+    return ordered[min(len(ordered) - 1, max(0, rank - 1))]
+
+
+class Metrics:
+    """
+    Spans, counters and latency histograms for the stages of a run.
+
+    Recording is a no-op until enable() is called, so the instrumentation
+    can stay in place without costing anything on normal runs. Spans time
+    a block of code into a histogram named "<name>_seconds"; counters add
+    up values such as bytes fetched, tokens or cache hits. Both take
+    labels, e.g. metrics.span("gemini_call", kind="listing").
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._counters: Dict[SeriesKey, float] = {}
+        self._samples: Dict[SeriesKey, List[float]] = {}
+        self._started = time.time()
+
+    def enable(self) -> None:
+        """Start recording, discarding anything recorded so far."""
+        self.reset()
+        self.enabled = True
+
+    def reset(self) -> None:
+        """Clear all recorded values."""
+        with self._lock:
+            self._counters.clear()
+            self._samples.clear()
+            self._started = time.time()
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add value to a counter."""
+        if not self.enabled:
+            return
+        key = _series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record one observation in a histogram."""
+        if not self.enabled:
+            return
+        key = _series_key(name, labels)
+        with self._lock:
+            self._samples.setdefault(key, []).append(value)
+
+    @contextmanager
+    def span(self, name: str, **labels: Any) -> Iterator[None]:
+        """Time the enclosed block into the "<name>_seconds" histogram."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """Return the current value of a counter."""
+        return self._counters.get(_series_key(name, labels), 0)
+
+    def samples(self, name: str) -> List[float]:
+        """Return the observations recorded in a histogram, across all of its labels."""
+        with self._lock:
+            return [value for (series, _), values in self._samples.items() if series == name for value in values]
+
+    def report(self) -> Dict[str, Any]:
+        """Summarize everything recorded as a JSON-serializable dict."""
+        with self._lock:
+            counters = dict(self._counters)
+            samples = {key: list(values) for key, values in self._samples.items()}
+        wall_seconds = time.time() - self._started
+        articles = sum(value for (name, _), value in counters.items() if name == 'articles')
+        return {
+            'wall_seconds': wall_seconds,
+            'articles_per_second': articles / wall_seconds if wall_seconds > 0 else 0.0,
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+            'histograms': [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': len(values),
+                    'sum': sum(values),
+                    'p50': percentile(values, 0.50),
+                    'p95': percentile(values, 0.95),
+                    'p99': percentile(values, 0.99),
+                    'max': max(values),
+                }
+                for (name, labels), values in sorted(samples.items())
+            ],
+        }
+
+    def write_json(self, path: str) -> None:
+        """Write report() to path as JSON."""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        logger.info(f"Wrote profile report to {path}")
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Write the metrics in the Prometheus text exposition format.
+
+        Meant for node_exporter's textfile collector: counters become
+        "_total" counters and histograms use LATENCY_BUCKETS.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            samples = {key: sorted(values) for key, values in self._samples.items()}
+
+        def format_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+        lines = []
+        typed = set()
+        for (name, labels), value in sorted(counters.items()):
+            metric = f"{PROMETHEUS_PREFIX}{name}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{format_labels(labels)} {value}")
+        for (name, labels), values in sorted(samples.items()):
+            metric = f"{PROMETHEUS_PREFIX}{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            for bound in LATENCY_BUCKETS:
+                count = bisect_right(values, bound)
+                lines.append(f"{metric}_bucket{format_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{metric}_bucket{format_labels(labels, [('le', '+Inf')])} {len(values)}")
+            lines.append(f"{metric}_sum{format_labels(labels)} {sum(values)}")
+            lines.append(f"{metric}_count{format_labels(labels)} {len(values)}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}run_wall_seconds gauge")
+        lines.append(f"{PROMETHEUS_PREFIX}run_wall_seconds {time.time() - self._started}")
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # The textfile collector may read at any moment, so write atomically.
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+        logger.info(f"Wrote Prometheus metrics to {path}")
+
+
+# The process-wide metrics, enabled by main.py's --profile flag
+metrics = Metrics()
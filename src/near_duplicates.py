@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import struct
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from src import config
+from src.link_extractor import IMAGE_PATTERN, LINK_PATTERN
+from src.markdown_preprocessor import BLOCK_SEPARATOR, JINA_HEADER_PATTERN
+from src.metrics import metrics
+
+Signature = Tuple[int, ...]
+
+# Mersenne prime used by the MinHash permutations (a * x + b) mod _PRIME.
+_PRIME = (1 << 61) - 1
+_URL_RE = re.compile(r'\w+://\S+')
+_WORD_RE = re.compile(r'\w+')
+
+
+def article_body(markdown: str) -> str:
+    """
+    Return the part of an article's markdown that identifies it.
+
+    Jina's header lines and blocks made up only of links or images, such as
+    navigation menus and footers, are dropped: they are shared by unrelated
+    articles on the same site.
+    """
+    body = []
+    for block in BLOCK_SEPARATOR.split(markdown):
+        lines = [line for line in block.splitlines() if not JINA_HEADER_PATTERN.match(line)]
+        block = '\n'.join(lines)
+        if _WORD_RE.search(LINK_PATTERN.sub(' ', IMAGE_PATTERN.sub(' ', block))):
+            body.append(block)
+    return '\n\n'.join(body)
+
+
+class NearDuplicateIndex:
+    """
+    A MinHash index of article markdown for spotting near-duplicate articles.
+
+    Each article is reduced to a signature of num_perm minimum hashes over
+    the word shingles of its body, where matching positions estimate the
+    Jaccard similarity of two articles. Articles with fewer than
+    min_shingles distinct shingles get no signature, since a few shared
+    phrases would be enough to match them. Signatures are bucketed into bands
+    (locality-sensitive hashing), so a lookup only compares articles sharing
+    at least one band. Indexed articles, their translations and the URLs
+    found to be aliases of them are kept in SQLite across runs.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = config.NEAR_DUPLICATE_INDEX_PATH,
+        threshold: float = config.NEAR_DUPLICATE_THRESHOLD,
+        shingle_words: int = config.NEAR_DUPLICATE_SHINGLE_WORDS,
+        num_perm: int = config.NEAR_DUPLICATE_PERMUTATIONS,
+        bands: int = config.NEAR_DUPLICATE_BANDS,
+        min_shingles: int = config.NEAR_DUPLICATE_MIN_SHINGLES,
+    ):
+        """
+        Open (or create) the index database at path, or keep it in memory if path is None.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1].")
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.path = path
+        self.threshold = threshold
+        self.shingle_words = shingle_words
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.min_shingles = min_shingles
+        self.reused = 0
+        # Fixed seed: signatures are persisted, so the permutations must not change between runs.
+        rng = random.Random(num_perm)
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(num_perm)]
+        self._signatures: Dict[str, Signature] = {}
+        self._buckets: Dict[Tuple[int, Signature], Set[str]] = defaultdict(set)
+
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path or ':memory:')
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            "url TEXT PRIMARY KEY, signature BLOB NOT NULL, article TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS aliases (url TEXT PRIMARY KEY, original TEXT NOT NULL)")
+        self._conn.commit()
+        for url, blob in self._conn.execute("SELECT url, signature FROM articles"):
+            signature = self._unpack(blob)
+            if len(signature) == num_perm:
+                self._index(url, signature)
+
+    def signature(self, markdown: str) -> Optional[Signature]:
+        """
+        Return the MinHash signature of an article's markdown.
+
+        Returns None if its body is too short to compare reliably.
+        """
+        words = _WORD_RE.findall(_URL_RE.sub(' ', article_body(markdown)).lower())
+        size = self.shingle_words
+        hashes = {
+            int.from_bytes(hashlib.blake2b(' '.join(words[i:i + size]).encode('utf-8'), digest_size=8).digest(), 'big')
+            for i in range(len(words) - size + 1)
+        }
+        if not hashes or len(hashes) < self.min_shingles:
+            return None
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self._permutations)
+
+    def similarity(self, first: Signature, second: Signature) -> float:
+        """Estimate the Jaccard similarity of two articles from their signatures."""
+        return sum(x == y for x, y in zip(first, second)) / self.num_perm
+
+    def find(self, signature: Signature, exclude: Optional[str] = None) -> Optional[str]:
+        """
+        Return the URL of the most similar indexed article at or above the threshold, or None.
+
+        exclude is never returned, so an article doesn't match its own earlier version.
+        """
+        candidates = set()
+        for band in range(self.bands):
+            candidates |= self._buckets.get(self._band(signature, band), set())
+        candidates.discard(exclude)
+        best_url, best_similarity = None, self.threshold
+        for url in candidates:
+            similarity = self.similarity(signature, self._signatures[url])
+            if similarity >= best_similarity:
+                best_url, best_similarity = url, similarity
+        return best_url
+
+    def add(self, url: str, signature: Signature) -> None:
+        """
+        Index an article whose translation isn't known yet.
+
+        It is only persisted once its translation is stored with
+        set_article(), and can be dropped again with discard().
+        """
+        self._index(url, signature)
+
+    def set_article(self, url: str, article: Dict[str, str]) -> None:
+        """Persist the translation of an indexed article, reused by its near-duplicates."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO articles (url, signature, article) VALUES (?, ?, ?)",
+            (url, self._pack(self._signatures[url]), json.dumps(article, ensure_ascii=False)),
+        )
+        self._conn.commit()
+
+    def discard(self, url: str) -> None:
+        """Remove an article from the index, e.g. after its translation failed."""
+        self._unindex(url)
+        self._conn.execute("DELETE FROM articles WHERE url = ?", (url,))
+        self._conn.commit()
+
+    def article(self, url: str) -> Optional[Dict[str, str]]:
+        """Return the stored translation of an indexed article, or None if there isn't one yet."""
+        row = self._conn.execute("SELECT article FROM articles WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add_alias(self, url: str, original: str) -> None:
+        """Record url as a near-duplicate of original, whose translation it reused."""
+        self.reused += 1
+        metrics.incr("near_duplicates")
+        self._conn.execute("INSERT OR REPLACE INTO aliases (url, original) VALUES (?, ?)", (url, original))
+        self._conn.commit()
+
+    def aliases(self, original: str) -> List[str]:
+        """Return the URLs recorded as near-duplicates of original."""
+        rows = self._conn.execute("SELECT url FROM aliases WHERE original = ? ORDER BY url", (original,))
+        return [url for url, in rows]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def _index(self, url: str, signature: Signature) -> None:
+        self._unindex(url)
+        self._signatures[url] = signature
+        for band in range(self.bands):
+            self._buckets[self._band(signature, band)].add(url)
+
+    def _unindex(self, url: str) -> None:
+        signature = self._signatures.pop(url, None)
+        if signature is None:
+            return
+        for band in range(self.bands):
+            key = self._band(signature, band)
+            self._buckets[key].discard(url)
+            if not self._buckets[key]:
+                del self._buckets[key]
+
+    def _band(self, signature: Signature, band: int) -> Tuple[int, Signature]:
+        return band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _pack(self, signature: Signature) -> bytes:
+        return struct.pack(f'>{len(signature)}Q', *signature)
+
+    @staticmethod
+    def _unpack(blob: bytes) -> Signature:
+        return struct.unpack(f'>{len(blob) // 8}Q', blob)
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from src import config
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_FIELDS = ('title', 'title_english', 'content', 'content_english')
+
+
+class FragmentCache:
+    """
+    A persistent on-disk cache of articles rendered as standalone PDF fragments.
+
+    Each fragment is named by a hash of the article's four fields together
+    with a fingerprint of the layout and fonts it was rendered with, so an
+    article is only laid out again when its text or the rendering changes.
+    The least recently used fragments are evicted once the cache grows
+    beyond max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = config.PDF_FRAGMENT_CACHE_DIR, max_bytes: int = config.PDF_FRAGMENT_CACHE_MAX_BYTES):
+        """
+        Initialize the cache, creating cache_dir if needed.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._sizes: Dict[str, int] = {
+            entry.path: entry.stat().st_size
+            for entry in os.scandir(cache_dir)
+            if entry.is_file() and entry.name.endswith('.pdf')
+        }
+
+    @property
+    def total_bytes(self) -> int:
+        """The combined size of all fragments on disk."""
+        return sum(self._sizes.values())
+
+    @staticmethod
+    def make_key(article: Dict[str, str], layout: str) -> str:
+        """
+        Build the cache key for an article rendered with the given layout fingerprint.
+        """
+        payload = json.dumps([layout] + [article.get(name, '') for name in ARTICLE_FIELDS], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        """Return where the fragment for key is (or will be) stored."""
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a fragment, marking it as recently used.
+
+        Returns:
+            Optional[str]: The fragment's path, or None if it isn't cached.
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            metrics.incr("pdf_fragment_cache_misses")
+            self._sizes.pop(path, None)
+            return None
+        self.hits += 1
+        metrics.incr("pdf_fragment_cache_hits")
+        return path
+
+    def put(self, key: str, rendered_path: str) -> str:
+        """
+        Move a freshly rendered fragment into the cache.
+
+        Returns:
+            str: The fragment's path in the cache.
+        """
+        path = self.path_for(key)
+        os.replace(rendered_path, path)
+        self._sizes[path] = os.path.getsize(path)
+        return path
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used fragments until the cache is within max_bytes.
+
+        Called once a document has been assembled, so fragments of the
+        document being built are never removed from under it.
+        """
+        if self.total_bytes <= self.max_bytes:
+            return
+        by_last_use = sorted(self._sizes, key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+        for path in by_last_use:
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._sizes.pop(path, None)
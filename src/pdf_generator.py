@@ -1,42 +1,57 @@
 from fpdf import FPDF
+import asyncio
 import os
-import arabic_reshaper
-import bidi.algorithm
+import tempfile
 import logging # Import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from src import config
+from src.font_cache import FontCache, add_cached_font, get_font_cache, set_font_cache
+from src.metrics import metrics
+from src.pdf_cache import FragmentCache
+from src.text_shaping import TextShaper, get_text_shaper, set_text_shaper
 
 logger = logging.getLogger(__name__)
 if not logger.handlers:
     logging.basicConfig(level=logging.INFO)
 
+# Bump whenever render_article's output changes, so cached fragments are re-rendered.
+LAYOUT_VERSION = 1
+
+FONT_FILES = ('NotoSansArabic-Regular.ttf', 'NotoSansArabic-Bold.ttf', 'NotoSans-Regular.ttf', 'NotoSans-Bold.ttf')
+
 class ArabicPDF(FPDF):
     def __init__(self):
         super().__init__()
+        # Fonts are registered from preprocessed metrics, so only the first
+        # document in a process (or the first run after a font changes) pays
+        # for parsing the TTF files.
+        cache = get_font_cache()
+
         # Register Noto Sans Arabic fonts for comprehensive Arabic support
-        noto_regular_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fonts', 'NotoSansArabic-Regular.ttf')
-        noto_bold_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fonts', 'NotoSansArabic-Bold.ttf')
+        noto_regular_path = os.path.join(config.FONTS_DIR, 'NotoSansArabic-Regular.ttf')
+        noto_bold_path = os.path.join(config.FONTS_DIR, 'NotoSansArabic-Bold.ttf')
 
-        self.add_font('NotoSansArabic', '', noto_regular_path, uni=True)
-        self.add_font('NotoSansArabic', 'B', noto_bold_path, uni=True)
+        add_cached_font(self, 'NotoSansArabic', '', noto_regular_path, cache)
+        add_cached_font(self, 'NotoSansArabic', 'B', noto_bold_path, cache)
 
         # Register Noto Sans (Latin) fonts for comprehensive English/Latin support
-        noto_latin_regular_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fonts', 'NotoSans-Regular.ttf')
-        noto_latin_bold_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fonts', 'NotoSans-Bold.ttf')
+        noto_latin_regular_path = os.path.join(config.FONTS_DIR, 'NotoSans-Regular.ttf')
+        noto_latin_bold_path = os.path.join(config.FONTS_DIR, 'NotoSans-Bold.ttf')
 
-        self.add_font('NotoSans', '', noto_latin_regular_path, uni=True)
-        self.add_font('NotoSans', 'B', noto_latin_bold_path, uni=True)
+        add_cached_font(self, 'NotoSans', '', noto_latin_regular_path, cache)
+        add_cached_font(self, 'NotoSans', 'B', noto_latin_bold_path, cache)
 
 
-def generate_pdf(articles, output_path):
+def fonts_available() -> bool:
     """
-    Generate a PDF file containing the scraped articles.
+    Check that the Noto Sans Arabic and Noto Sans (Latin) fonts are installed.
 
-    Args:
-        articles (dict): Dictionary of articles with their titles, content,
-                         and English translations.
-        output_path (str): Path where the PDF should be saved
+    Prints download instructions for whichever family is missing.
     """
     # Ensure fonts directory exists (already handled by the font download commands)
-    fonts_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fonts')
+    fonts_dir = config.FONTS_DIR
     os.makedirs(fonts_dir, exist_ok=True)
 
     # Check if Noto Sans Arabic fonts exist
@@ -44,58 +59,334 @@ def generate_pdf(articles, output_path):
        not os.path.exists(os.path.join(fonts_dir, 'NotoSansArabic-Bold.ttf')):
         print("Noto Sans Arabic fonts not found. Please download them using the provided curl commands.")
         print(f"Fonts directory: {fonts_dir}")
-        return
+        return False
 
     # Check if Noto Sans (Latin) fonts exist
     if not os.path.exists(os.path.join(fonts_dir, 'NotoSans-Regular.ttf')) or \
        not os.path.exists(os.path.join(fonts_dir, 'NotoSans-Bold.ttf')):
         print("Noto Sans (Latin) fonts not found. Please download them using the provided curl commands.")
         print(f"Fonts directory: {fonts_dir}")
-        return
+        return False
 
+    return True
+
+
+def new_pdf() -> ArabicPDF:
+    """Create an ArabicPDF with the page layout used for all lesson documents."""
     # Create PDF with adjusted margins
     pdf = ArabicPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.set_margins(20, 20, 20)  # Left, Top, Right margins
+    return pdf
+
+
+def layout_fingerprint(bookmarks: bool = False) -> str:
+    """
+    Describe everything besides the article text that affects a rendered article.
+
+    Covers the layout version, bookmark setting and the size and modification
+    time of each font file.
+    """
+    parts = [f"layout={LAYOUT_VERSION}", f"bookmarks={bookmarks}"]
+    for name in FONT_FILES:
+        stat = os.stat(os.path.join(config.FONTS_DIR, name))
+        parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return ';'.join(parts)
+
+
+def render_article(pdf: ArabicPDF, article: Dict[str, str], bookmark: bool = False) -> None:
+    """Render one article onto new pages of pdf, optionally adding a bookmark for it."""
+    with metrics.span("pdf_layout"):
+        _layout_article(pdf, article, bookmark)
+
+
+def _layout_article(pdf: ArabicPDF, article: Dict[str, str], bookmark: bool) -> None:
     page_width = pdf.w - 40  # Total usable width (page width minus margins)
+    pdf.add_page()
+    if bookmark:
+        pdf.start_section(article['title_english'], strict=False)
+
+    # Reshape and reorder Arabic text for proper display
+    shaper = get_text_shaper()
+    with metrics.span("shape"):
+        bidi_title = shaper.shape(article['title'])
+        bidi_content = shaper.shape(article['content'])
+
+    # Arabic title - Centered
+    pdf.set_font('NotoSansArabic', 'B', 24)
+    pdf.set_text_color(0, 0, 0)
+    pdf.multi_cell(page_width, 15, bidi_title, align='C')
+
+    # English title - Centered, reduced font size, increased height
+    pdf.set_font('NotoSans', 'B', 16) # Changed to NotoSans Bold
+    pdf.set_x(pdf.l_margin) # Explicitly set X to the left margin before rendering the English title
+    pdf.multi_cell(page_width, 15, article['title_english'], align='C')
 
-    for url, article in articles.items():
-        pdf.add_page()
+    # Add some space
+    pdf.ln(5)
 
-        # Reshape and reorder Arabic text for proper display
-        reshaped_title = arabic_reshaper.reshape(article['title'])
-        bidi_title = bidi.algorithm.get_display(reshaped_title)
+    # Arabic content
+    pdf.set_font('NotoSansArabic', '', 16)
+    pdf.multi_cell(page_width, 10, bidi_content, align='R')
 
-        reshaped_content = arabic_reshaper.reshape(article['content'])
-        bidi_content = bidi.algorithm.get_display(reshaped_content)
+    # Add space between Arabic and English content
+    pdf.ln(10)
 
-        # Arabic title - Centered
-        pdf.set_font('NotoSansArabic', 'B', 24)
-        pdf.set_text_color(0, 0, 0)
-        pdf.multi_cell(page_width, 15, bidi_title, align='C')
+    # English content
+    pdf.set_font('NotoSans', '', 14) # Changed to NotoSans Regular
+    pdf.multi_cell(page_width, 8, article['content_english'], align='L')
+
+    # Add space between articles
+    pdf.ln(15)
+
+
+def generate_pdf(articles, output_path, workers=1, bookmarks=False, fragment_cache=None):
+    """
+    Generate a PDF file containing the scraped articles.
 
-        # English title - Centered, reduced font size, increased height
-        pdf.set_font('NotoSans', 'B', 16) # Changed to NotoSans Bold
-        pdf.set_x(pdf.l_margin) # Explicitly set X to the left margin before rendering the English title
-        pdf.multi_cell(page_width, 15, article['title_english'], align='C')
+    Args:
+        articles (dict): Dictionary of articles with their titles, content,
+                         and English translations. Any mapping works, such as
+                         a lazy CorpusSelection; except for workers > 1
+                         without a fragment_cache, articles are read one at
+                         a time rather than all loaded up front.
+        output_path (str): Path where the PDF should be saved
+        workers (int): Number of processes to render with. With more than one,
+                       articles are split into shards rendered in parallel and
+                       merged in their original order.
+        bookmarks (bool): Add a bookmark (outline entry) for each article.
+        fragment_cache (FragmentCache): When given, each article is rendered
+                       into its own cached fragment. Only new or changed
+                       articles are laid out; the rest are reused.
+    """
+    if not fonts_available():
+        return
 
-        # Add some space
-        pdf.ln(5)
+    if fragment_cache is not None and articles:
+        _generate_pdf_cached(articles.values(), output_path, workers, bookmarks, fragment_cache)
+    elif workers > 1 and len(articles) > 1:
+        _generate_pdf_parallel(list(articles.values()), output_path, workers, bookmarks)
+    else:
+        pdf = new_pdf()
+        for url, article in articles.items():
+            render_article(pdf, article, bookmark=bookmarks)
+        # Save the PDF
+        with metrics.span("pdf_write"):
+            pdf.output(output_path)
+    print(f"PDF generated successfully at: {output_path}")
 
-        # Arabic content
-        pdf.set_font('NotoSansArabic', '', 16)
-        pdf.multi_cell(page_width, 10, bidi_content, align='R')
 
-        # Add space between Arabic and English content
-        pdf.ln(10)
+def split_into_shards(articles: List[Dict[str, str]], shard_count: int) -> List[List[Dict[str, str]]]:
+    """
+    Split articles into at most shard_count contiguous shards of similar text size.
 
-        # English content
-        pdf.set_font('NotoSans', '', 14) # Changed to NotoSans Regular
-        pdf.multi_cell(page_width, 8, article['content_english'], align='L')
+    Shards stay contiguous so that concatenating them preserves article order.
+    """
+    sizes = [sum(len(article.get(key, '')) for key in ('title', 'content', 'title_english', 'content_english')) or 1
+             for article in articles]
+    target = sum(sizes) / max(1, min(shard_count, len(articles)))
+    shards, current, current_size = [], [], 0
+    for article, size in zip(articles, sizes):
+        remaining_shards = shard_count - len(shards) - 1
+        if current and current_size + size / 2 > target and remaining_shards > 0:
+            shards.append(current)
+            current, current_size = [], 0
+        current.append(article)
+        current_size += size
+    if current:
+        shards.append(current)
+    return shards
 
-        # Add space between articles
-        pdf.ln(15)
 
-    # Save the PDF
+def render_shard(articles: List[Dict[str, str]], output_path: str, bookmarks: bool = False) -> int:
+    """
+    Render a shard of articles into its own PDF fragment.
+
+    Runs in a worker process. Returns the number of pages rendered.
+    """
+    pdf = new_pdf()
+    for article in articles:
+        render_article(pdf, article, bookmark=bookmarks)
     pdf.output(output_path)
-    print(f"PDF generated successfully at: {output_path}")
\ No newline at end of file
+    return pdf.page
+
+
+def merge_fragments(fragment_paths: List[str], output_path: str) -> int:
+    """
+    Concatenate PDF fragments into one document, keeping their bookmarks.
+
+    Returns the total number of pages.
+    """
+    # pypdf is only needed for merging, so single-document renders don't load it.
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for path in fragment_paths:
+        writer.append(path, import_outline=True)
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+    return len(writer.pages)
+
+
+def _init_render_worker(font_cache_dir: str, shaper_max_entries: int, shaper_path: Optional[str]) -> None:
+    # Worker processes don't inherit the parent's caches under the spawn and
+    # forkserver start methods, so each installs its own from the same files.
+    set_font_cache(FontCache(font_cache_dir))
+    set_text_shaper(TextShaper(max_entries=shaper_max_entries, path=shaper_path))
+
+
+def _render_executor(max_workers: int) -> ProcessPoolExecutor:
+    """Return a process pool whose workers use the same font and shaping caches as this process."""
+    shaper = get_text_shaper()
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_render_worker,
+        initargs=(get_font_cache().cache_dir, shaper.max_entries, shaper.path),
+    )
+
+
+def _generate_pdf_parallel(articles: List[Dict[str, str]], output_path: str, workers: int, bookmarks: bool) -> None:
+    shards = split_into_shards(articles, workers)
+    with tempfile.TemporaryDirectory(prefix='pdf_shards_') as tmp_dir:
+        fragment_paths = [os.path.join(tmp_dir, f"shard_{i:04d}.pdf") for i in range(len(shards))]
+        with _render_executor(min(workers, len(shards))) as executor:
+            page_counts = list(executor.map(render_shard, shards, fragment_paths, [bookmarks] * len(shards)))
+        with metrics.span("pdf_merge"):
+            total_pages = merge_fragments(fragment_paths, output_path)
+    logger.info(f"Rendered {len(articles)} articles in {len(shards)} shards, {total_pages} pages.")
+    if total_pages != sum(page_counts):
+        logger.warning(f"Merged PDF has {total_pages} pages, expected {sum(page_counts)}.")
+
+
+def _generate_pdf_cached(
+    articles: Iterable[Dict[str, str]], output_path: str, workers: int, bookmarks: bool, cache: FragmentCache
+) -> None:
+    # Articles are read in one pass; only those without a cached fragment are kept.
+    layout = layout_fingerprint(bookmarks)
+    keys: List[str] = []
+    fragment_paths: Dict[str, str] = {}
+    missing: Dict[str, Dict[str, str]] = {}
+    for article in articles:
+        key = cache.make_key(article, layout)
+        keys.append(key)
+        if key in fragment_paths or key in missing:
+            continue
+        path = cache.get(key)
+        if path:
+            fragment_paths[key] = path
+        else:
+            missing[key] = article
+
+    if missing:
+        render_paths = [f"{cache.path_for(key)}.tmp" for key in missing]
+        shards = [[article] for article in missing.values()]
+        if workers > 1 and len(missing) > 1:
+            with _render_executor(min(workers, len(missing))) as executor:
+                list(executor.map(render_shard, shards, render_paths, [bookmarks] * len(shards),
+                                  chunksize=max(1, len(shards) // (workers * 4))))
+        else:
+            for shard, render_path in zip(shards, render_paths):
+                render_shard(shard, render_path, bookmarks)
+        for key, render_path in zip(missing, render_paths):
+            fragment_paths[key] = cache.put(key, render_path)
+
+    with metrics.span("pdf_merge"):
+        total_pages = merge_fragments([fragment_paths[key] for key in keys], output_path)
+    cache.evict()
+    logger.info(
+        f"Assembled {len(keys)} articles ({total_pages} pages): "
+        f"{len(fragment_paths) - len(missing)} reused from the fragment cache, {len(missing)} rendered."
+    )
+
+
+class StreamingPDFWriter:
+    """
+    Renders articles into a series of PDF volumes as they arrive.
+
+    Each article is laid out as soon as it's added. Once a volume holds
+    volume_articles articles or roughly volume_bytes of page content, it is
+    written to disk and a new volume is started, so memory use stays bounded
+    and finished volumes are available while the crawl is still running.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        volume_articles: int = config.PDF_VOLUME_ARTICLES,
+        volume_bytes: int = config.PDF_VOLUME_BYTES,
+    ):
+        """
+        Initialize the writer. Volumes are named after output_path, e.g.
+        "arabic_lessons.pdf" becomes "arabic_lessons_vol001.pdf", ...
+        """
+        if volume_articles < 1 or volume_bytes < 1:
+            raise ValueError("Volume limits must be at least 1.")
+        self.output_path = output_path
+        self.volume_articles = volume_articles
+        self.volume_bytes = volume_bytes
+        self.volume_paths: List[str] = []
+        self.articles_written = 0
+        self._pdf: Optional[ArabicPDF] = None
+        self._volume_count = 0
+
+    def _volume_path(self, number: int) -> str:
+        base, ext = os.path.splitext(self.output_path)
+        return f"{base}_vol{number:03d}{ext or '.pdf'}"
+
+    def _content_bytes(self) -> int:
+        return sum(len(page.contents) for page in self._pdf.pages.values())
+
+    def add(self, article: Dict[str, str]) -> None:
+        """Render an article, flushing the current volume if it's full."""
+        if self._pdf is None:
+            self._pdf = new_pdf()
+        render_article(self._pdf, article)
+        self._volume_count += 1
+        self.articles_written += 1
+        if self._volume_count >= self.volume_articles or self._content_bytes() >= self.volume_bytes:
+            self.flush()
+
+    def flush(self) -> Optional[str]:
+        """Write the current volume to disk, if it has any articles."""
+        if self._pdf is None or self._volume_count == 0:
+            return None
+        path = self._volume_path(len(self.volume_paths) + 1)
+        with metrics.span("pdf_write"):
+            self._pdf.output(path)
+        logger.info(f"Wrote PDF volume {path} ({self._volume_count} articles).")
+        self.volume_paths.append(path)
+        self._pdf = None
+        self._volume_count = 0
+        return path
+
+    def close(self) -> List[str]:
+        """Flush the last volume and return the paths of all volumes written."""
+        self.flush()
+        return self.volume_paths
+
+
+async def generate_pdf_stream(
+    articles: AsyncIterator[Tuple[str, Dict[str, str]]],
+    output_path: str,
+    volume_articles: int = config.PDF_VOLUME_ARTICLES,
+    volume_bytes: int = config.PDF_VOLUME_BYTES,
+) -> List[str]:
+    """
+    Generate PDF volumes from an async stream of (url, article) pairs.
+
+    Articles are rendered in the order they arrive, in a worker thread so the
+    event loop (and the crawl feeding it) keeps running.
+
+    Returns:
+        List[str]: Paths of the volumes written.
+    """
+    if not fonts_available():
+        return []
+
+    writer = StreamingPDFWriter(output_path, volume_articles, volume_bytes)
+    loop = asyncio.get_running_loop()
+    async for url, article in articles:
+        await loop.run_in_executor(None, writer.add, article)
+    paths = await loop.run_in_executor(None, writer.close)
+    print(f"Generated {len(paths)} PDF volume(s) with {writer.articles_written} articles.")
+    return paths
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from tqdm.asyncio import tqdm
+
+from src import config
+from src.frontier import CrawlFrontier
+from src.metrics import metrics
+from src.near_duplicates import NearDuplicateIndex
+
+logger = logging.getLogger(__name__)
+
+FetchFn = Callable[[str], Awaitable[str]]
+ProcessFn = Callable[[str], Awaitable[Optional[Dict[str, str]]]]
+ArticleCallback = Callable[[str, Tuple[Any, ...], Dict[str, str]], Optional[Awaitable[None]]]
+
+
+class ArticlePipeline:
+    """
+    A bounded-concurrency producer/consumer pipeline for article processing.
+
+    Article URLs are fetched by one pool of workers and the resulting markdown
+    is handed to a second pool that runs the LLM step, so both stages overlap.
+    Results are returned in submission order (or by an explicit order key),
+    matching the sequential crawl. URLs are deduplicated through the crawl
+    frontier's visited index, and with a NearDuplicateIndex, articles whose
+    text nearly matches an already translated one reuse its translation
+    instead of going through the LLM step.
+    """
+
+    def __init__(
+        self,
+        fetch: FetchFn,
+        process: ProcessFn,
+        fetch_concurrency: int = config.FETCH_CONCURRENCY,
+        llm_concurrency: int = config.LLM_CONCURRENCY,
+        frontier: Optional[CrawlFrontier] = None,
+        on_article: Optional[ArticleCallback] = None,
+        keep_results: bool = True,
+        duplicates: Optional[NearDuplicateIndex] = None,
+    ):
+        """
+        Initialize the pipeline with the fetch and processing coroutines.
+
+        on_article, if given, is called with (url, order, article) as soon as
+        each article has been processed or restored. With keep_results set to
+        False, articles are only handed to on_article and not kept for
+        results(), so memory doesn't grow with the crawl. If on_article
+        returns an awaitable, the article isn't done until it completes, so a
+        slow consumer behind a bounded queue holds back the LLM workers and,
+        through them, the fetches. duplicates, if
+        given, is checked before each LLM call and records translated
+        articles and the near-duplicates that reused them.
+        """
+        if fetch_concurrency < 1 or llm_concurrency < 1:
+            raise ValueError("Concurrency limits must be at least 1.")
+        self.fetch = fetch
+        self.process = process
+        self.fetch_concurrency = fetch_concurrency
+        self.llm_concurrency = llm_concurrency
+        self.frontier = frontier if frontier is not None else CrawlFrontier()
+        self.on_article = on_article
+        self.keep_results = keep_results
+        self.duplicates = duplicates
+        # Set when the in-flight translation of the article at each URL finishes,
+        # so near-duplicates fetched meanwhile can wait for it instead of calling the LLM.
+        self._translating: Dict[str, asyncio.Event] = {}
+        self._fetch_queue: asyncio.Queue = asyncio.Queue()
+        # Bound the hand-off queue so fetched markdown doesn't pile up in memory
+        # when the LLM stage is the bottleneck.
+        self._llm_queue: asyncio.Queue = asyncio.Queue(maxsize=llm_concurrency * 2)
+        self._results: Dict[int, Tuple[Tuple[Any, ...], str, Dict[str, str]]] = {}
+        self._order: Dict[int, Tuple[Any, ...]] = {}
+        # When each in-flight article's fetch started, for the article latency metric
+        self._started: Dict[int, float] = {}
+        self._next_seq = 0
+        self._pending: Set[int] = set()
+        self._progress_changed = asyncio.Condition()
+        self._workers: List[asyncio.Task] = []
+        # Hand-offs of restored articles to an asynchronous on_article
+        self._deliveries: Set[asyncio.Future] = set()
+        self._progress: Optional[tqdm] = None
+
+    async def __aenter__(self):
+        """Starts the fetch and LLM worker pools."""
+        self._progress = tqdm(total=0, desc="Processing articles")
+        self._workers = [
+            asyncio.create_task(self._fetch_worker()) for _ in range(self.fetch_concurrency)
+        ] + [
+            asyncio.create_task(self._llm_worker()) for _ in range(self.llm_concurrency)
+        ]
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Cancels the workers and closes the progress bar."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._progress:
+            self._progress.close()
+
+    @property
+    def next_seq(self) -> int:
+        """The sequence number the next submitted article will receive."""
+        return self._next_seq
+
+    def submit(self, url: str, order: Optional[Tuple[Any, ...]] = None) -> bool:
+        """
+        Queue an article URL for processing.
+
+        Args:
+            url (str): The article URL.
+            order (tuple, optional): Sort key for the results. Defaults to
+                submission order.
+
+        Returns:
+            bool: False if the URL was already visited, True otherwise.
+        """
+        if not self.frontier.claim(url):
+            return False
+        self._order[self._next_seq] = order if order is not None else (self._next_seq,)
+        self._pending.add(self._next_seq)
+        self._fetch_queue.put_nowait((self._next_seq, url))
+        self._next_seq += 1
+        if self._progress is not None:
+            self._progress.total += 1
+            self._progress.refresh()
+        return True
+
+    def restore(self, url: str, article: Dict[str, str], order: Optional[Tuple[Any, ...]] = None) -> bool:
+        """
+        Add an article completed in an earlier run without processing it again.
+
+        Returns:
+            bool: False if the URL was already visited, True otherwise.
+        """
+        if not self.frontier.claim(url):
+            return False
+        seq = self._next_seq
+        self._next_seq += 1
+        self._order[seq] = order if order is not None else (seq,)
+        delivered = self._store(seq, url, article)
+        if delivered is not None:
+            delivery = asyncio.ensure_future(delivered)
+            self._deliveries.add(delivery)
+            delivery.add_done_callback(self._deliveries.discard)
+        return True
+
+    async def join(self) -> None:
+        """Wait until every submitted article has gone through both stages."""
+        await self._fetch_queue.join()
+        await self._llm_queue.join()
+        await asyncio.gather(*self._deliveries)
+
+    async def wait_until_done(self, upto_seq: int) -> None:
+        """Wait until every article submitted before sequence number upto_seq is done."""
+        async with self._progress_changed:
+            await self._progress_changed.wait_for(
+                lambda: not any(seq < upto_seq for seq in self._pending)
+            )
+
+    def results(self) -> Dict[str, Dict[str, str]]:
+        """Return the processed articles keyed by URL, in result order."""
+        ordered = sorted(self._results.items(), key=lambda item: (item[1][0], item[0]))
+        return {url: article for _, (_, url, article) in ordered}
+
+    async def _fetch_worker(self) -> None:
+        while True:
+            seq, url = await self._fetch_queue.get()
+            self._started[seq] = time.perf_counter()
+            try:
+                logger.info(f"Scraping article: {url}")
+                markdown = await self.fetch(url)
+            except Exception as e:
+                logger.error(f"Failed to scrape {url}: {e}")
+                await self._advance(seq)
+            else:
+                await self._llm_queue.put((seq, url, markdown))
+            finally:
+                self._fetch_queue.task_done()
+
+    async def _llm_worker(self) -> None:
+        while True:
+            seq, url, markdown = await self._llm_queue.get()
+            try:
+                filtered = await self._translate(url, markdown)
+                if filtered:
+                    delivered = self._store(seq, url, filtered)
+                    if delivered is not None:
+                        await delivered
+                else:
+                    logger.warning(f"Gemini API did not return valid data for {url}")
+            except Exception as e:
+                logger.error(f"Failed to scrape {url}: {e}")
+            finally:
+                await self._advance(seq)
+                self._llm_queue.task_done()
+
+    async def _translate(self, url: str, markdown: str) -> Optional[Dict[str, str]]:
+        if self.duplicates is None:
+            return await self.process(markdown)
+
+        signature = self.duplicates.signature(markdown)
+        if signature is None:
+            return await self.process(markdown)
+        original = self.duplicates.find(signature, exclude=url)
+        if original is not None:
+            if original in self._translating:
+                await self._translating[original].wait()
+            article = self.duplicates.article(original)
+            if article is not None:
+                logger.info(f"{url} is a near-duplicate of {original}, reusing its translation.")
+                self.duplicates.add_alias(url, original)
+                return article
+
+        self._translating[url] = asyncio.Event()
+        self.duplicates.add(url, signature)
+        try:
+            article = await self.process(markdown)
+        except BaseException:
+            self.duplicates.discard(url)
+            raise
+        else:
+            if article:
+                self.duplicates.set_article(url, article)
+            else:
+                self.duplicates.discard(url)
+            return article
+        finally:
+            self._translating.pop(url).set()
+
+    def _store(self, seq: int, url: str, article: Dict[str, str]) -> Optional[Awaitable[None]]:
+        order = self._order.pop(seq)
+        started = self._started.pop(seq, None)
+        if started is not None:
+            metrics.observe("article_seconds", time.perf_counter() - started)
+        if self.keep_results:
+            self._results[seq] = (order, url, article)
+        if self.on_article:
+            return self.on_article(url, order, article)
+        return None
+
+    async def _advance(self, seq: int) -> None:
+        if self._progress is not None:
+            self._progress.update(1)
+        self._order.pop(seq, None)
+        self._started.pop(seq, None)
+        async with self._progress_changed:
+            self._pending.discard(seq)
+            self._progress_changed.notify_all()
@@ -1,3 +1,11 @@
+# Prompt template versions. Bump a version whenever its template changes so
+# cached Gemini responses built from the old wording are no longer reused.
+EXTRACT_LINKS_PROMPT_VERSION = 1
+NEXT_PAGE_PROMPT_VERSION = 1
+FILTER_ARTICLE_PROMPT_VERSION = 1
+LISTING_PROMPT_VERSION = 1
+FILTER_ARTICLE_CHUNK_PROMPT_VERSION = 1
+
 def get_extract_links_prompt(markdown_content: str) -> str:
     """Returns the formatted prompt for extracting article links."""
     return (
@@ -20,6 +28,20 @@ def get_next_page_prompt(markdown_content: str) -> str:
         f"Markdown Content:\n{markdown_content}"
     )
 
+def get_listing_prompt(markdown_content: str) -> str:
+    """Returns the formatted prompt for extracting article links and the next page link in one call."""
+    return (
+        "Given the following markdown content of a listing web page, identify and extract all relevant article links, "
+        "and the URL for the 'next page' in its pagination sequence. "
+        "Article links typically lead to individual articles or lessons. "
+        "Return your answer as a JSON object with keys 'articles' (a JSON array of full URLs) and "
+        "'next_page' (the full URL as a string, or null if there is no next page). "
+        "If a link is relative, resolve it using the current page URL. "
+        "Example: {\"articles\": [\"https://example.com/article1\", \"https://example.com/article2\"], "
+        "\"next_page\": \"https://example.com/page/2\"}\n\n"
+        f"Markdown Content:\n{markdown_content}"
+    )
+
 def get_filter_article_prompt(markdown_content: str) -> str:
     """Returns the formatted prompt for filtering and translating article content."""
     return (
@@ -30,4 +52,23 @@ def get_filter_article_prompt(markdown_content: str) -> str:
         "**Ensure all Arabic text in 'title' and 'content' includes appropriate tashkeel (diacritics).** "
         "Return your answer as a JSON object with keys 'title', 'title_english', 'content', and 'content_english'.\n\n"
         f"Markdown Content:\n{markdown_content}"
-    )
\ No newline at end of file
+    )
+
+def get_filter_article_chunk_prompt(markdown_chunk: str, part: int, total_parts: int) -> str:
+    """Returns the formatted prompt for filtering and translating one part of a long article."""
+    if part == 1:
+        title_instructions = (
+            "This part holds the start of the page: also extract the article title and translate it to English. "
+            "Return your answer as a JSON object with keys 'title', 'title_english', 'content', and 'content_english'. "
+        )
+    else:
+        title_instructions = "Return your answer as a JSON object with keys 'content' and 'content_english'. "
+    return (
+        f"The following markdown is part {part} of {total_parts} of an article's web page. "
+        "Extract only the main article content in this part, leaving out navigation, advertisements and other page elements. "
+        "Also provide the English translation of that content. "
+        "**Ensure all Arabic text in 'title' and 'content' includes appropriate tashkeel (diacritics).** "
+        f"{title_instructions}"
+        "If this part contains no article content, use empty strings.\n\n"
+        f"Markdown Content:\n{markdown_chunk}"
+    )
@@ -1,52 +1,118 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import hashlib
 import json
 import logging
 import os
 import asyncio
-from google import genai
 from urllib.parse import urljoin
-from dotenv import load_dotenv
-from tqdm.asyncio import tqdm
 
 # Local module imports
 from src import config, prompts
+from src.corpus_store import CorpusStore
+from src.fetch_cache import FetchCache
+from src.frontier import CrawlFrontier, HostLimiter
+from src.journal import CrawlJournal, ResumeState
+from src.link_extractor import LinkExtractor
+from src.llm_cache import LLMCache, MISSING
+from src.llm_scheduler import LLMScheduler, PRIORITY_ARTICLE, PRIORITY_LISTING, estimate_tokens
+from src.markdown_preprocessor import MarkdownPreprocessor, split_into_chunks
+from src.metrics import metrics
+from src.near_duplicates import NearDuplicateIndex
+from src.pipeline import ArticleCallback, ArticlePipeline
 from src.scraper_client import ScraperClient
 from src.utils import extract_base_url
 
-# Load environment variables
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-# Setup logging and Gemini client
+# Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in environment variables.")
-geminiClient = genai.Client()
+# Gemini client, created on first use by get_gemini_client()
+gemini_client = None
+
+def get_gemini_client():
+    """
+    Return the shared Gemini client, creating it on the first call.
+
+    The SDK is only imported (and GEMINI_API_KEY only required) once a
+    Gemini call is actually made, so runs that never need it start faster.
+    """
+    global gemini_client
+    if gemini_client is None:
+        from dotenv import load_dotenv
+        from google import genai
+
+        load_dotenv()
+        if not os.getenv("GEMINI_API_KEY"):
+            raise ValueError("GEMINI_API_KEY not found in environment variables.")
+        gemini_client = genai.Client()
+    return gemini_client
+
+# Rate-limited scheduler for Gemini calls, created on first use by get_llm_scheduler()
+llm_scheduler: Optional[LLMScheduler] = None
+
+async def _generate_content(prompt: str):
+    return await get_gemini_client().aio.models.generate_content(
+        model=config.API_MODEL,
+        contents=prompt
+    )
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Return the shared Gemini scheduler with the default limits, used when no other is given."""
+    global llm_scheduler
+    if llm_scheduler is None:
+        llm_scheduler = LLMScheduler(_generate_content)
+    return llm_scheduler
+
+def create_llm_scheduler(**limits) -> LLMScheduler:
+    """Return a new Gemini scheduler using the given LLMScheduler limits; the caller closes it."""
+    return LLMScheduler(_generate_content, **limits)
+
+# "combined" asks Gemini for a listing page's links and next page in one call,
+# "separate" uses one call for each.
+LISTING_MODES = ("combined", "separate")
+
+def _digest(markdown_content: str) -> str:
+    return hashlib.blake2b(markdown_content.encode('utf-8'), digest_size=16).hexdigest()
+
+def _llm_cache_key(llm_cache: Optional[LLMCache], kind: str, prompt_version: int, markdown_content: str, *extra: str) -> Optional[str]:
+    if llm_cache is None:
+        return None
+    return LLMCache.make_key(kind, config.API_MODEL, prompt_version, markdown_content, *extra)
+
+async def extract_links_from_markdown_with_gemini(
+    markdown_content: str, current_page_url: str, scheduler: Optional[LLMScheduler] = None, llm_cache: Optional[LLMCache] = None,
+    cache_source: Optional[str] = None,
+) -> List[str]:
+    """
+    Use Gemini API to extract article links from markdown content.
+
+    Calls go through scheduler (default: the shared one) and results are
+    cached in llm_cache, if given, keyed on cache_source if given (see
+    MarkdownPreprocessor.cache_key) or else on markdown_content; the same
+    holds for the other Gemini helpers.
+    """
+    cache_key = _llm_cache_key(llm_cache, "links", prompts.EXTRACT_LINKS_PROMPT_VERSION, cache_source or markdown_content, current_page_url)
+    if cache_key:
+        cached = llm_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
 
-async def extract_links_from_markdown_with_gemini(markdown_content: str, current_page_url: str) -> List[str]:
-    """Use Gemini API to extract article links from markdown content."""
     prompt = prompts.get_extract_links_prompt(markdown_content)
-    loop = asyncio.get_running_loop()
     try:
-        response = await loop.run_in_executor(
-            None,
-            lambda: geminiClient.models.generate_content(
-                model=config.API_MODEL,
-                contents=prompt
-            )
-        )
+        response = await (scheduler or get_llm_scheduler()).submit(prompt, priority=PRIORITY_LISTING, kind="links")
         response_text = response.text.strip()
         if response_text.startswith("```") and response_text.endswith("```"):
             response_text = response_text.strip("`").strip()
         if response_text.startswith("json"):
             response_text = response_text[4:].strip()
 
-        links = json.loads(response_text)
+        with metrics.span("json_parse", kind="links"):
+            links = json.loads(response_text)
         if isinstance(links, list):
-            resolved_links = [urljoin(current_page_url, link) for link in links]
-            return list(set(resolved_links))
+            resolved_links = list(dict.fromkeys(urljoin(current_page_url, link) for link in links))
+            if cache_key:
+                llm_cache.put(cache_key, resolved_links)
+            return resolved_links
         else:
             logger.error(f"Gemini response for links is not a JSON array: {response_text}")
             return []
@@ -57,18 +123,20 @@ async def extract_links_from_markdown_with_gemini(markdown_content: str, current
         logger.error(f"Error calling Gemini API for link extraction: {e}")
         return []
 
-async def extract_next_page_link_from_markdown_with_gemini(markdown_content: str, current_page_url: str) -> Optional[str]:
+async def extract_next_page_link_from_markdown_with_gemini(
+    markdown_content: str, current_page_url: str, scheduler: Optional[LLMScheduler] = None, llm_cache: Optional[LLMCache] = None,
+    cache_source: Optional[str] = None,
+) -> Optional[str]:
     """Use Gemini API to extract the next page link from markdown content."""
+    cache_key = _llm_cache_key(llm_cache, "next_page", prompts.NEXT_PAGE_PROMPT_VERSION, cache_source or markdown_content, current_page_url)
+    if cache_key:
+        cached = llm_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+
     prompt = prompts.get_next_page_prompt(markdown_content)
-    loop = asyncio.get_running_loop()
     try:
-        response = await loop.run_in_executor(
-            None,
-            lambda: geminiClient.models.generate_content(
-                model=config.API_MODEL,
-                contents=prompt
-            )
-        )
+        response = await (scheduler or get_llm_scheduler()).submit(prompt, priority=PRIORITY_LISTING, kind="next_page")
         response_text = response.text.strip()
         if response_text.startswith("```") and response_text.endswith("```"):
             response_text = response_text.strip("`").strip()
@@ -77,33 +145,94 @@ async def extract_next_page_link_from_markdown_with_gemini(markdown_content: str
         if response_text.startswith('"') and response_text.endswith('"'):
             response_text = response_text.strip('"')
 
+        next_page = None
         if response_text and response_text.lower() != 'null':
-            return urljoin(current_page_url, response_text)
-        return None
+            next_page = urljoin(current_page_url, response_text)
+        if cache_key:
+            llm_cache.put(cache_key, next_page)
+        return next_page
     except Exception as e:
         logger.error(f"Error calling Gemini API for next page link: {e}")
         return None
 
-async def filter_article_with_gemini(markdown_content: str) -> Optional[Dict[str, str]]:
-    """Use Gemini API to filter and translate article content."""
+async def extract_listing_with_gemini(
+    markdown_content: str, current_page_url: str, scheduler: Optional[LLMScheduler] = None, llm_cache: Optional[LLMCache] = None,
+    cache_source: Optional[str] = None,
+) -> Optional[Tuple[List[str], Optional[str]]]:
+    """
+    Use a single Gemini call to extract both the article links and the next page link.
+
+    Returns None if the response can't be parsed, so callers can fall back to
+    the separate link and next-page calls.
+    """
+    cache_key = _llm_cache_key(llm_cache, "listing", prompts.LISTING_PROMPT_VERSION, cache_source or markdown_content, current_page_url)
+    if cache_key:
+        cached = llm_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached[0], cached[1]
+
+    prompt = prompts.get_listing_prompt(markdown_content)
+    try:
+        response = await (scheduler or get_llm_scheduler()).submit(prompt, priority=PRIORITY_LISTING, kind="listing")
+        response_text = response.text.strip()
+        if response_text.startswith("```") and response_text.endswith("```"):
+            response_text = response_text.strip("`").strip()
+        if response_text.startswith("json"):
+            response_text = response_text[4:].strip()
+
+        with metrics.span("json_parse", kind="listing"):
+            listing = json.loads(response_text)
+        if not isinstance(listing, dict) or not isinstance(listing.get("articles"), list):
+            logger.error(f"Gemini response for listing page does not have expected keys or format: {response_text}")
+            return None
+        article_links = list(dict.fromkeys(urljoin(current_page_url, link) for link in listing["articles"]))
+        next_page = listing.get("next_page")
+        next_page = urljoin(current_page_url, next_page) if isinstance(next_page, str) and next_page.strip() else None
+        if cache_key:
+            llm_cache.put(cache_key, [article_links, next_page])
+        return article_links, next_page
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse JSON from Gemini for listing page: {e}. Response: {response.text[:200]}...")
+        return None
+    except Exception as e:
+        logger.error(f"Error calling Gemini API for listing page: {e}")
+        return None
+
+async def filter_article_with_gemini(
+    markdown_content: str, scheduler: Optional[LLMScheduler] = None, llm_cache: Optional[LLMCache] = None,
+    cache_source: Optional[str] = None,
+) -> Optional[Dict[str, str]]:
+    """
+    Use Gemini API to filter and translate article content.
+
+    Articles longer than config.ARTICLE_CHUNK_MIN_TOKENS are split into
+    paragraph chunks that are translated concurrently.
+    """
+    if estimate_tokens(markdown_content) > config.ARTICLE_CHUNK_MIN_TOKENS:
+        chunks = split_into_chunks(markdown_content, config.ARTICLE_CHUNK_TOKENS)
+        if len(chunks) > 1:
+            return await _filter_article_in_chunks(chunks, scheduler, llm_cache, cache_source)
+
+    cache_key = _llm_cache_key(llm_cache, "filter_article", prompts.FILTER_ARTICLE_PROMPT_VERSION, cache_source or markdown_content)
+    if cache_key:
+        cached = llm_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+
     prompt = prompts.get_filter_article_prompt(markdown_content)
-    loop = asyncio.get_running_loop()
     try:
-        response = await loop.run_in_executor(
-            None,
-            lambda: geminiClient.models.generate_content(
-                model=config.API_MODEL,
-                contents=prompt
-            )
-        )
+        response = await (scheduler or get_llm_scheduler()).submit(prompt, priority=PRIORITY_ARTICLE, kind="filter_article")
         response_text = response.text.strip()
         if response_text.startswith("```") and response_text.endswith("```"):
             response_text = response_text.strip("`").strip()
         if response_text.startswith("json"):
             response_text = response_text[4:].strip()
 
-        filtered = json.loads(response_text)
+        with metrics.span("json_parse", kind="filter_article"):
+            filtered = json.loads(response_text)
         if isinstance(filtered, dict) and all(k in filtered for k in ["title", "content", "title_english", "content_english"]):
+            if cache_key:
+                llm_cache.put(cache_key, filtered)
             return filtered
         else:
             logger.error(f"Gemini response JSON does not have expected keys or format: {response_text}")
@@ -115,49 +244,388 @@ async def filter_article_with_gemini(markdown_content: str) -> Optional[Dict[str
         logger.error(f"Error calling Gemini API for article filtering: {e}")
         return None
 
-async def scrape_all_articles(url: str) -> Tuple[Dict[str, Dict[str, str]], List[str]]:
+async def _filter_article_chunk(
+    markdown_chunk: str, part: int, total_parts: int, scheduler: Optional[LLMScheduler], llm_cache: Optional[LLMCache],
+    cache_source: Optional[str],
+) -> Optional[Dict[str, str]]:
+    expected_keys = ["title", "title_english", "content", "content_english"] if part == 1 else ["content", "content_english"]
+    cache_key = _llm_cache_key(llm_cache, "filter_article_chunk", prompts.FILTER_ARTICLE_CHUNK_PROMPT_VERSION, cache_source or markdown_chunk, str(part), str(total_parts))
+    if cache_key:
+        cached = llm_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+
+    prompt = prompts.get_filter_article_chunk_prompt(markdown_chunk, part, total_parts)
+    try:
+        response = await (scheduler or get_llm_scheduler()).submit(prompt, priority=PRIORITY_ARTICLE, kind="filter_article_chunk")
+        response_text = response.text.strip()
+        if response_text.startswith("```") and response_text.endswith("```"):
+            response_text = response_text.strip("`").strip()
+        if response_text.startswith("json"):
+            response_text = response_text[4:].strip()
+
+        with metrics.span("json_parse", kind="filter_article_chunk"):
+            filtered = json.loads(response_text)
+        if isinstance(filtered, dict) and all(isinstance(filtered.get(k), str) for k in expected_keys):
+            filtered = {k: filtered[k] for k in expected_keys}
+            if cache_key:
+                llm_cache.put(cache_key, filtered)
+            return filtered
+        else:
+            logger.error(f"Gemini response JSON for article part {part}/{total_parts} does not have expected keys or format: {response_text}")
+            return None
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse JSON from Gemini for article part {part}/{total_parts}: {e}. Response: {response.text[:200]}...")
+        return None
+    except Exception as e:
+        logger.error(f"Error calling Gemini API for article part {part}/{total_parts}: {e}")
+        return None
+
+async def _filter_article_in_chunks(
+    chunks: List[str], scheduler: Optional[LLMScheduler], llm_cache: Optional[LLMCache], cache_source: Optional[str],
+) -> Optional[Dict[str, str]]:
+    """
+    Filter and translate a long article's chunks concurrently and reassemble them in order.
+
+    The first chunk also supplies the title. If any chunk fails, the article
+    is dropped rather than returned with a gap.
+    """
+    logger.info(f"Translating long article in {len(chunks)} chunks.")
+    parts = await asyncio.gather(*(
+        _filter_article_chunk(chunk, part, len(chunks), scheduler, llm_cache, cache_source) for part, chunk in enumerate(chunks, 1)
+    ))
+    if any(part is None for part in parts):
+        return None
+    return {
+        'title': parts[0]['title'],
+        'title_english': parts[0]['title_english'],
+        'content': '\n\n'.join(part['content'].strip() for part in parts if part['content'].strip()),
+        'content_english': '\n\n'.join(part['content_english'].strip() for part in parts if part['content_english'].strip()),
+    }
+
+async def extract_listing_links(
+    markdown_content: str,
+    current_page_url: str,
+    link_extractor: Optional[LinkExtractor] = None,
+    listing_mode: str = config.LISTING_LLM_MODE,
+    scheduler: Optional[LLMScheduler] = None,
+    llm_cache: Optional[LLMCache] = None,
+    cache_source: Optional[str] = None,
+) -> Tuple[List[str], Optional[str]]:
+    """
+    Extract the article links and the next page link from a listing page.
+
+    link_extractor, if given, is tried first. Gemini is only called for the
+    parts it isn't confident about, and its answers are fed back to the
+    extractor so the host's URL patterns are learned for later pages. When
+    both parts are needed, the "combined" listing mode asks for them in one
+    call, falling back to the two separate calls if that fails.
+    """
+    local = link_extractor.extract(markdown_content, current_page_url) if link_extractor else None
+    threshold = config.LINK_EXTRACTION_MIN_CONFIDENCE
+    need_links = local is None or local.article_confidence < threshold
+    need_next_page = local is None or local.next_page_confidence < threshold
+
+    combined = None
+    if need_links and need_next_page and listing_mode == "combined":
+        combined = await extract_listing_with_gemini(
+            markdown_content, current_page_url, scheduler=scheduler, llm_cache=llm_cache, cache_source=cache_source,
+        )
+        if combined is None:
+            logger.warning(f"Combined listing call failed for {current_page_url}, falling back to separate calls.")
+
+    if combined is not None:
+        article_links, next_page = combined
+    else:
+        async def local_links():
+            return local.articles
+
+        async def local_next_page():
+            return local.next_page
+
+        article_links, next_page = await asyncio.gather(
+            extract_links_from_markdown_with_gemini(
+                markdown_content, current_page_url, scheduler=scheduler, llm_cache=llm_cache, cache_source=cache_source,
+            )
+            if need_links else local_links(),
+            extract_next_page_link_from_markdown_with_gemini(
+                markdown_content, current_page_url, scheduler=scheduler, llm_cache=llm_cache, cache_source=cache_source,
+            )
+            if need_next_page else local_next_page(),
+        )
+    if local is None:
+        return article_links, next_page
+
+    logger.info(
+        f"Listing links for {current_page_url}: articles {'via Gemini' if need_links else 'extracted locally'}, "
+        f"next page {'via Gemini' if need_next_page else 'extracted locally'}."
+    )
+    if need_links or need_next_page:
+        link_extractor.learn(
+            current_page_url,
+            article_links if need_links else [],
+            next_page if need_next_page else None,
+        )
+    return article_links, next_page
+
+def _submit_article(pipeline: ArticlePipeline, resume_state: Optional[ResumeState], url: str, order: Tuple[int, int, int]) -> None:
+    if resume_state and url in resume_state.articles:
+        pipeline.restore(url, resume_state.articles[url][1], order)
+    else:
+        pipeline.submit(url, order=order)
+
+async def _walk_listing_pages(
+    fetch_listing: Callable[[str], Awaitable[str]],
+    extract_links: Callable[[str, str], Awaitable[Tuple[List[str], Optional[str]]]],
+    pipeline: ArticlePipeline,
+    url: str,
+    prefetch_depth: int,
+    seed_index: int = 0,
+    seed: Optional[str] = None,
+    page_num: int = 1,
+    journal: Optional[CrawlJournal] = None,
+) -> List[str]:
+    """
+    Follow pagination from url, submitting each listing page's articles to the pipeline.
+
+    Listing pages are fetched (and preprocessed) with fetch_listing, and
+    extract_links returns their article links and next page. Next-page discovery runs alongside link extraction as soon as a listing page
+    arrives, and up to prefetch_depth further listing pages are fetched while
+    earlier pages' articles are still being processed. The walk stops at a
+    listing page another seed has already visited. Each listing page and the
+    resulting pagination cursor are recorded in the journal, if given.
+    """
+    seed = seed or url
+    resume_state = journal.state if journal else None
+    all_next_page_links = []
+    page_slots = asyncio.Semaphore(prefetch_depth + 1)
+    release_tasks = []
+    page_url = url
+
+    async def release_when_done(upto_seq: int) -> None:
+        try:
+            await pipeline.wait_until_done(upto_seq)
+        finally:
+            page_slots.release()
+
+    while page_url:
+        if not pipeline.frontier.claim(page_url):
+            logger.info(f"Listing page already visited: {page_url}")
+            break
+        await page_slots.acquire()
+        logger.info(f"Scraping page: {page_url}")
+        try:
+            main_markdown = await fetch_listing(page_url)
+        except Exception as e:
+            logger.error(f"Could not fetch main page {page_url}: {e}")
+            page_slots.release()
+            break
+
+        article_links, next_page = await extract_links(main_markdown, page_url)
+        logger.info(f"Found {len(article_links)} articles on page {page_num}.")
+
+        for position, article_url in enumerate(article_links):
+            _submit_article(pipeline, resume_state, article_url, (seed_index, page_num, position))
+        release_tasks.append(asyncio.create_task(release_when_done(pipeline.next_seq)))
+
+        if next_page == page_url:
+            next_page = None
+        if journal:
+            journal.record_listing(seed, page_num, page_url, article_links, next_page)
+            journal.record_cursor(seed, next_page, page_num + 1)
+
+        if next_page:
+            all_next_page_links.append(next_page)
+            page_url = next_page
+            page_num += 1
+        else:
+            break
+
+    await asyncio.gather(*release_tasks)
+    return all_next_page_links
+
+def _replay_journal(
+    pipeline: ArticlePipeline,
+    resume_state: ResumeState,
+    seed: str,
+    seed_index: int,
+) -> Tuple[List[str], Optional[str], int]:
+    """
+    Rebuild a seed's progress from the journal.
+
+    Journaled listing pages are marked visited and their articles are
+    restored if finished or resubmitted otherwise. Returns the next page
+    links already discovered and the cursor (page URL and number) where the
+    pagination walk should continue.
+    """
+    next_page_links = []
+    for record in resume_state.listings_for(seed):
+        pipeline.frontier.claim(record.url)
+        for position, article_url in enumerate(record.articles):
+            _submit_article(pipeline, resume_state, article_url, (seed_index, record.page_num, position))
+        if record.next_page:
+            next_page_links.append(record.next_page)
+    page_url, page_num = resume_state.cursor_for(seed)
+    return next_page_links, page_url, page_num
+
+async def crawl(
+    seeds: List[str],
+    fetch_concurrency: int = config.FETCH_CONCURRENCY,
+    llm_concurrency: int = config.LLM_CONCURRENCY,
+    prefetch_depth: int = config.LISTING_PREFETCH_DEPTH,
+    cache: Optional[FetchCache] = None,
+    per_host_concurrency: int = config.PER_HOST_CONCURRENCY,
+    per_host_delay: float = config.PER_HOST_DELAY,
+    journal: Optional[CrawlJournal] = None,
+    on_article: Optional[ArticleCallback] = None,
+    keep_results: bool = True,
+    direct_hosts: Iterable[str] = config.DIRECT_FETCH_HOSTS,
+    duplicates: Optional[NearDuplicateIndex] = None,
+    corpus: Optional[CorpusStore] = None,
+    llm_scheduler: Optional[LLMScheduler] = None,
+    llm_cache: Optional[LLMCache] = None,
+    link_extractor: Optional[LinkExtractor] = None,
+    listing_mode: str = config.LISTING_LLM_MODE,
+    preprocessor: Optional[MarkdownPreprocessor] = None,
+) -> Tuple[Dict[str, Dict[str, str]], List[str]]:
+    """
+    Scrape all articles reachable from one or more seed URLs, following pagination.
+
+    All seeds share one HTTP session, one ArticlePipeline (bounded by
+    fetch_concurrency and llm_concurrency) and one CrawlFrontier, so pages
+    reachable from several seeds are only fetched and translated once.
+    Requests to each host are limited by per_host_concurrency and
+    per_host_delay. Pages on direct_hosts are fetched without the Jina
+    reader. Articles are returned in seed, page and link order.
+
+    Gemini calls go through llm_scheduler (default: a shared scheduler with
+    the default limits), and parsed results are cached in llm_cache, if
+    given. Listing pages try link_extractor before Gemini, and listing_mode
+    ("combined" or "separate") selects how they are sent to Gemini.
+    preprocessor, if given, trims page markdown before Gemini sees it.
+
+    With a duplicates index, an article whose text nearly matches one
+    already translated (in this or an earlier run) reuses that translation
+    instead of calling Gemini, and is recorded as its alias.
+
+    Progress is appended to journal as it completes. If the journal was
+    opened for resuming, work it records as done is skipped. Each article
+    is also written to corpus, if given, as soon as it's available.
+
+    on_article is called with (url, order, article) for each article as soon
+    as it's available, in completion order; if it returns an awaitable, the
+    crawl waits for it. Pass keep_results=False to only stream articles that
+    way and return an empty article dict.
+    """
+    if prefetch_depth < 0:
+        raise ValueError("prefetch_depth must not be negative.")
+    if listing_mode not in LISTING_MODES:
+        raise ValueError(f"Unknown listing mode: {listing_mode}")
+
+    frontier = CrawlFrontier(seeds)
+    host_limiter = HostLimiter(per_host_concurrency, per_host_delay)
+    resume_state = journal.state if journal else None
+
+    def article_done(url: str, order: Tuple[int, ...], article: Dict[str, str]) -> Optional[Awaitable[None]]:
+        metrics.incr("articles")
+        if journal:
+            journal.record_article(url, order, article)
+        if corpus is not None:
+            corpus.put(url, article, order=order, seed=frontier.seeds[order[0]])
+        if on_article:
+            return on_article(url, order, article)
+        return None
+
+    async with ScraperClient(
+        frontier.seeds[0] if frontier.seeds else "", cache=cache, host_limiter=host_limiter, direct_hosts=direct_hosts,
+    ) as scraper:
+        # Preprocessing the same page gives different markdown as boilerplate
+        # is learned, so Gemini results are cached under the page as fetched:
+        # the digest of each preprocessed page maps to its cache key source
+        # until the page reaches Gemini.
+        cache_sources: Dict[str, str] = {}
+
+        async def fetch_preprocessed(url: str, keep_links: bool) -> str:
+            markdown_content = await scraper.fetch_page(url)
+            if preprocessor is None:
+                return markdown_content
+            preprocessed = preprocessor.process(markdown_content, url, keep_links=keep_links)
+            if llm_cache is not None:
+                cache_sources[_digest(preprocessed)] = preprocessor.cache_key(markdown_content)
+            return preprocessed
+
+        async def fetch_article(url: str) -> str:
+            return await fetch_preprocessed(url, keep_links=False)
+
+        async def translate_article(markdown_content: str) -> Optional[Dict[str, str]]:
+            return await filter_article_with_gemini(
+                markdown_content, scheduler=llm_scheduler, llm_cache=llm_cache,
+                cache_source=cache_sources.pop(_digest(markdown_content), None),
+            )
+
+        async def fetch_listing(url: str) -> str:
+            return await fetch_preprocessed(url, keep_links=True)
+
+        async def extract_links(markdown_content: str, page_url: str) -> Tuple[List[str], Optional[str]]:
+            return await extract_listing_links(
+                markdown_content, page_url, link_extractor=link_extractor, listing_mode=listing_mode,
+                scheduler=llm_scheduler, llm_cache=llm_cache, cache_source=cache_sources.pop(_digest(markdown_content), None),
+            )
+
+        async with ArticlePipeline(
+            fetch_article,
+            translate_article,
+            fetch_concurrency=fetch_concurrency,
+            llm_concurrency=llm_concurrency,
+            frontier=frontier,
+            on_article=article_done,
+            keep_results=keep_results,
+            duplicates=duplicates,
+        ) as pipeline:
+            replayed_links = []
+            walks = []
+            for seed_index, seed in enumerate(frontier.seeds):
+                page_url, page_num = seed, 1
+                if resume_state:
+                    next_page_links, page_url, page_num = _replay_journal(pipeline, resume_state, seed, seed_index)
+                    replayed_links.append(next_page_links)
+                else:
+                    replayed_links.append([])
+                if page_url:
+                    walks.append(_walk_listing_pages(
+                        fetch_listing, extract_links, pipeline, page_url, prefetch_depth,
+                        seed_index=seed_index, seed=seed, page_num=page_num, journal=journal,
+                    ))
+                else:
+                    walks.append(asyncio.sleep(0, result=[]))
+            walked_links = await asyncio.gather(*walks)
+            await pipeline.join()
+
+        all_next_page_links = [
+            link
+            for replayed, walked in zip(replayed_links, walked_links)
+            for link in replayed + walked
+        ]
+        return pipeline.results(), all_next_page_links
+
+async def scrape_all_articles(
+    url: str,
+    fetch_concurrency: int = config.FETCH_CONCURRENCY,
+    llm_concurrency: int = config.LLM_CONCURRENCY,
+    prefetch_depth: int = config.LISTING_PREFETCH_DEPTH,
+    cache: Optional[FetchCache] = None,
+    **options,
+) -> Tuple[Dict[str, Dict[str, str]], List[str]]:
     """
     Scrape all articles from a starting URL, following pagination.
+
+    A single-seed crawl; see crawl() for the concurrency, caching and other options.
     """
-    async with ScraperClient(url) as scraper:
-        results = {}
-        page_url = url
-        visited_articles = set()
-        all_next_page_links = []
-        page_num = 1
-
-        while page_url:
-            logger.info(f"Scraping page: {page_url}")
-            try:
-                main_markdown = await scraper.fetch_page(page_url)
-            except Exception as e:
-                logger.error(f"Could not fetch main page {page_url}: {e}")
-                break
-
-            article_links = await extract_links_from_markdown_with_gemini(main_markdown, page_url)
-            logger.info(f"Found {len(article_links)} articles on page {page_num}.")
-
-            for article_url in tqdm(article_links, desc=f"Processing articles on page {page_num}"):
-                if article_url in visited_articles:
-                    continue
-                try:
-                    logger.info(f"Scraping article: {article_url}")
-                    article_markdown = await scraper.fetch_page(article_url)
-                    filtered = await filter_article_with_gemini(article_markdown)
-                    if filtered:
-                        results[article_url] = filtered
-                    else:
-                        logger.warning(f"Gemini API did not return valid data for {article_url}")
-                    visited_articles.add(article_url)
-                except Exception as e:
-                    logger.error(f"Failed to scrape {article_url}: {e}")
-
-            next_page = await extract_next_page_link_from_markdown_with_gemini(main_markdown, page_url)
-            if next_page and next_page != page_url:
-                all_next_page_links.append(next_page)
-                page_url = next_page
-                page_num += 1
-            else:
-                break
-
-        return results, all_next_page_links
\ No newline at end of file
+    return await crawl(
+        [url],
+        fetch_concurrency=fetch_concurrency,
+        llm_concurrency=llm_concurrency,
+        prefetch_depth=prefetch_depth,
+        cache=cache,
+        **options,
+    )
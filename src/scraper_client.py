@@ -1,51 +1,263 @@
 import aiohttp
 import asyncio
+import contextlib
 import logging
-from typing import Optional
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Mapping, NamedTuple, Optional
+from urllib.parse import urlparse
 from src import config
+from src.fetch_cache import FetchCache
+from src.frontier import HostLimiter
+from src.html_to_markdown import html_to_markdown
+from src.latency_tracker import LatencyTracker
+from src.metrics import metrics
+from src.utils import RETRYABLE_STATUS_CODES
 
 logger = logging.getLogger(__name__)
 
+
+class FetchResult(NamedTuple):
+    """The parts of a page response fetch_page needs after the connection is released."""
+    status: int
+    text: str
+    headers: Mapping[str, str]
+    content_type: str
+    url: str
+
+
+def is_retryable_fetch_error(error: BaseException) -> bool:
+    """Return True for timeouts, dropped connections, rate limits and server errors."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUS_CODES
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+
+
 class ScraperClient:
     """
     A class for scraping web content via Jina AI's reader endpoint.
     It manages an aiohttp session for making asynchronous HTTP requests.
+
+    Hosts listed in direct_hosts are fetched directly instead, and their
+    HTML is converted to markdown locally in a pool of worker processes.
+    Both backends share one pooled connector with keep-alive and a DNS
+    cache.
+
+    Timeouts adapt to each host's observed latency. Failed requests are
+    retried with exponential backoff, and a request still running past the
+    host's p95 latency is hedged with a duplicate; whichever answers first
+    is used.
     """
 
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        cache: Optional[FetchCache] = None,
+        host_limiter: Optional[HostLimiter] = None,
+        direct_hosts: Iterable[str] = config.DIRECT_FETCH_HOSTS,
+        convert_workers: int = config.HTML_CONVERT_WORKERS,
+        latency: Optional[LatencyTracker] = None,
+        max_retries: int = config.FETCH_MAX_RETRIES,
+        retry_base_delay: float = config.FETCH_RETRY_BASE_DELAY,
+        retry_max_delay: float = config.FETCH_RETRY_MAX_DELAY,
+    ):
         """
-        Initialize the scraper with a base URL.
+        Initialize the scraper with a base URL, an optional page cache,
+        optional per-host politeness limits for network requests, the
+        hosts to fetch without Jina, and the retry limits.
         """
         self.base_url = base_url
+        self.cache = cache
+        self.host_limiter = host_limiter
+        self.direct_hosts = {host.lower().strip('.') for host in direct_hosts}
+        self.convert_workers = convert_workers
+        self.latency = latency if latency is not None else LatencyTracker()
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
         self.session: Optional[aiohttp.ClientSession] = None
+        self._convert_pool: Optional[ProcessPoolExecutor] = None
+        self._entered = False
 
     async def __aenter__(self):
-        """Initializes the aiohttp session."""
-        self.session = aiohttp.ClientSession()
+        """
+        Enters the client. The aiohttp session is opened on the first network
+        request, so runs served entirely from the cache never create one.
+        """
+        self._entered = True
         return self
 
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=config.HTTP_CONNECTION_LIMIT,
+                keepalive_timeout=config.HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=config.HTTP_DNS_CACHE_TTL,
+            )
+            self.session = aiohttp.ClientSession(connector=connector, auto_decompress=True)
+        return self.session
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Closes the aiohttp session."""
+        """Closes the aiohttp session and the conversion workers."""
+        self._entered = False
         if self.session:
             await self.session.close()
+            self.session = None
+        if self._convert_pool:
+            self._convert_pool.shutdown(cancel_futures=True)
+            self._convert_pool = None
+
+    def backend_for(self, url: str) -> str:
+        """Return "direct" if url's host is fetched directly, "jina" otherwise."""
+        host = (urlparse(url).hostname or '').lower()
+        if any(host == direct or host.endswith(f".{direct}") for direct in self.direct_hosts):
+            return "direct"
+        return "jina"
+
+    async def _to_markdown(self, html: str, url: str) -> str:
+        # Parsing large pages is CPU-bound, so it runs outside the event loop.
+        if self.convert_workers < 1:
+            return html_to_markdown(html, url)
+        if self._convert_pool is None:
+            self._convert_pool = ProcessPoolExecutor(max_workers=self.convert_workers)
+        return await asyncio.get_running_loop().run_in_executor(self._convert_pool, html_to_markdown, html, url)
+
+    def _host_slot(self, url: str):
+        if self.host_limiter:
+            return self.host_limiter.slot(url)
+        return contextlib.nullcontext()
 
     async def fetch_page(self, url: str) -> str:
         """
-        Fetch the markdown content of a page via Jina AI.
+        Fetch the markdown content of a page via Jina AI, or directly for direct_hosts.
+
+        Fresh cached pages are returned without a request. Stale ones are
+        revalidated with their ETag/Last-Modified validators, and served as a
+        fallback if the request fails.
         """
-        if not self.session:
+        if not self._entered:
             raise RuntimeError("Session not initialized. Use async with.")
 
-        jina_url = f"{config.JINA_AI_PREFIX}{url}"
-        logger.info(f"Fetching via Jina AI: {jina_url}")
+        backend = self.backend_for(url)
+        entry = self.cache.get(url, backend) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            logger.info(f"Using cached page: {url}")
+            metrics.incr("page_cache_hits")
+            return entry.body
+        metrics.incr("page_cache_misses")
+
+        self._ensure_session()
+        headers = self.cache.conditional_headers(entry) if entry else {}
+        if backend == "direct":
+            request_url = url
+            headers.update({'User-Agent': config.USER_AGENT, 'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8'})
+            logger.info(f"Fetching directly: {url}")
+        else:
+            request_url = f"{config.JINA_AI_PREFIX}{url}"
+            logger.info(f"Fetching via Jina AI: {request_url}")
 
         try:
-            async with self.session.get(jina_url, timeout=90) as response:
-                response.raise_for_status()
-                return await response.text()
+            result = await self._get_with_retries(url, request_url, headers, backend)
+            if entry and result.status == 304:
+                logger.info(f"Cached page still valid: {url}")
+                metrics.incr("page_cache_revalidated")
+                return self.cache.refresh(entry).body
+            text = result.text
+            metrics.incr("fetch_bytes", len(text.encode('utf-8')), backend=backend)
+            if backend == "direct" and 'html' in result.content_type:
+                with metrics.span("html_convert"):
+                    text = await self._to_markdown(text, result.url)
+            if self.cache:
+                self.cache.put(url, text, result.headers.get('ETag'), result.headers.get('Last-Modified'), backend=backend)
+            return text
+        # Checked first: aiohttp's timeout errors are also ClientErrors.
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout fetching {request_url}")
+            metrics.incr("fetch_errors", reason="timeout")
+            if entry:
+                logger.warning(f"Serving stale cached page for {url}")
+                return entry.body
+            raise
         except aiohttp.ClientError as e:
-            logger.error(f"Network error fetching {jina_url}: {e}")
+            logger.error(f"Network error fetching {request_url}: {e}")
+            metrics.incr("fetch_errors", reason="network")
+            if entry:
+                logger.warning(f"Serving stale cached page for {url}")
+                return entry.body
             raise
-        except asyncio.TimeoutError:
-            logger.error(f"Timeout fetching {jina_url}")
-            raise
\ No newline at end of file
+
+    async def _get(self, request_url: str, headers: dict, host: str, backend: str, timeout: float) -> FetchResult:
+        started = time.perf_counter()
+        with metrics.span("fetch", backend=backend):
+            async with self.session.get(request_url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response.raise_for_status()
+                text = await response.text()
+        self.latency.record(host, time.perf_counter() - started)
+        return FetchResult(response.status, text, response.headers, response.content_type, str(response.url))
+
+    async def _hedged_get(self, url: str, request_url: str, headers: dict, backend: str) -> FetchResult:
+        """
+        Send one request, plus a duplicate if it runs past the host's hedge delay.
+
+        The hedge delay counts from when the first request gets its host
+        slot, so time spent queued behind the politeness limits never
+        triggers a hedge. The duplicate waits for a slot of its own.
+        """
+        host = urlparse(url).netloc.lower()
+        timeout = self.latency.timeout_for(host)
+
+        async def hedge() -> FetchResult:
+            async with self._host_slot(url):
+                return await self._get(request_url, headers, host, backend, timeout)
+
+        async with self._host_slot(url):
+            primary = asyncio.create_task(self._get(request_url, headers, host, backend, timeout))
+            tasks = {primary}
+            try:
+                hedge_after = self.latency.hedge_delay(host)
+                if hedge_after is not None:
+                    await asyncio.wait(tasks, timeout=hedge_after)
+                    if not primary.done():
+                        logger.info(f"Hedging request for {url} after {hedge_after:.2f}s.")
+                        metrics.incr("fetch_hedged", backend=backend)
+                        tasks.add(asyncio.create_task(hedge()))
+                error = None
+                while tasks:
+                    done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            if task is not primary:
+                                metrics.incr("fetch_hedge_wins", backend=backend)
+                            return task.result()
+                        error = task.exception()
+                raise error
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def _get_with_retries(self, url: str, request_url: str, headers: dict, backend: str) -> FetchResult:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._hedged_get(url, request_url, headers, backend)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries or not is_retryable_fetch_error(e):
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                metrics.incr("fetch_retries", backend=backend)
+                logger.warning(
+                    f"Fetching {url} failed ({str(e) or type(e).__name__}); retrying in {delay:.1f}s "
+                    f"(attempt {attempt + 1}/{self.max_retries})."
+                )
+                await asyncio.sleep(delay)
+
+    def _backoff_delay(self, attempt: int, error: BaseException) -> float:
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt)
+        delay = random.uniform(delay / 2, delay)
+        retry_after = getattr(error, 'headers', None) and error.headers.get('Retry-After')
+        if retry_after:
+            try:
+                delay = max(delay, min(self.retry_max_delay, float(retry_after)))
+            except ValueError:
+                pass
+        return delay
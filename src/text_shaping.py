@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from functools import cached_property
+from typing import Optional
+
+import bidi.algorithm
+from arabic_reshaper import ArabicReshaper
+
+from src import config
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class _ArabicReshaper(ArabicReshaper):
+    """
+    ArabicReshaper with its ligature regex built once.
+
+    The upstream property means to memoize the regex but checks for the
+    attribute under its unmangled name, so it rebuilds the pattern from the
+    configuration on every reshape() call. That fixed cost dominates when
+    shaping short lines.
+    """
+
+    @cached_property
+    def _ligatures_re(self):
+        return ArabicReshaper._ligatures_re.fget(self)
+
+
+_reshaper = _ArabicReshaper()
+
+
+def base_direction(text: str) -> str:
+    """Return the bidi paragraph direction of text, 'R' or 'L', from its first strong character."""
+    return 'R' if bidi.algorithm.get_base_level(text) else 'L'
+
+
+def shape_line(text: str, base_dir: Optional[str] = None) -> str:
+    """
+    Reshape and bidi-reorder one line of Arabic text for display.
+
+    base_dir ('R' or 'L') overrides the direction detected from the line itself.
+    """
+    return bidi.algorithm.get_display(_reshaper.reshape(text), base_dir=base_dir)
+
+
+class TextShaper:
+    """
+    Shapes Arabic text line by line through a bounded LRU cache.
+
+    shape() takes one base direction for a whole text from its first strong
+    character, as python-bidi does, and shapes every line in that direction.
+    Each line is otherwise resolved on its own, so unlike get_display() on
+    the whole text, neutrals and numbers at the edge of a line no longer take
+    their direction from the neighbouring line: in an English-first text,
+    the line "- بند" keeps its dash on the left. Headings, boilerplate lines
+    and repeated vocabulary entries that recur across articles are then
+    shaped only once. The cache can be saved
+    to and loaded from a JSON file to reuse it across runs.
+    """
+
+    def __init__(self, max_entries: int = config.SHAPING_CACHE_MAX_ENTRIES, path: Optional[str] = None):
+        """
+        Initialize the shaper, loading the cache file at path if it exists.
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    @staticmethod
+    def _key(line: str) -> str:
+        return hashlib.blake2b(line.encode('utf-8'), digest_size=16).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def shape_line(self, line: str, base_dir: Optional[str] = None) -> str:
+        """
+        Shape one line, reusing a cached result when there is one.
+
+        base_dir defaults to the direction of the line itself.
+        """
+        if not line.strip():
+            return line
+        base_dir = base_dir or base_direction(line)
+        key = self._key(f"{base_dir}:{line}")
+        shaped = self._cache.get(key)
+        if shaped is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            metrics.incr("shaping_cache_hits")
+            return shaped
+        self.misses += 1
+        metrics.incr("shaping_cache_misses")
+        shaped = shape_line(line, base_dir)
+        self._cache[key] = shaped
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return shaped
+
+    def shape(self, text: str) -> str:
+        """Shape multi-line text, one line at a time, in the direction of the whole text."""
+        base_dir = base_direction(text)
+        return '\n'.join(self.shape_line(line, base_dir) for line in text.split('\n'))
+
+    def load(self, path: str) -> None:
+        """Add the entries saved in path to the cache."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable shaping cache {path}: {e}")
+            return
+        for key, shaped in entries[-self.max_entries:]:
+            self._cache[key] = shaped
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the cache, least recently used entries first, to path (default: self.path)."""
+        path = path or self.path
+        if not path:
+            return
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(list(self._cache.items()), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+text_shaper = TextShaper()
+
+
+def get_text_shaper() -> TextShaper:
+    """Return the shaper used when rendering PDFs."""
+    return text_shaper
+
+
+def set_text_shaper(shaper: TextShaper) -> None:
+    """Use shaper when rendering PDFs, e.g. one backed by a cache file."""
+    global text_shaper
+    text_shaper = shaper
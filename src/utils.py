@@ -1,4 +1,4 @@
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 def extract_base_url(full_url: str) -> str:
     """
@@ -11,4 +11,37 @@ def extract_base_url(full_url: str) -> str:
         str: The base URL (scheme + netloc).
     """
     parsed_url = urlparse(full_url)
-    return f"{parsed_url.scheme}://{parsed_url.netloc}"
\ No newline at end of file
+    return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+# HTTP statuses worth retrying: rate limits and transient server errors.
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Query parameters that only track where a visitor came from and never
+# change the page content.
+TRACKING_QUERY_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', 'igshid'}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so equivalent spellings map to the same key.
+
+    Lowercases the scheme and host, drops default ports, the fragment and
+    tracking parameters (utm_* and the like), and sorts the remaining query
+    parameters.
+
+    Args:
+        url (str): The URL to normalize.
+
+    Returns:
+        str: The normalized URL.
+    """
+    parsed_url = urlparse(url.strip())
+    scheme = parsed_url.scheme.lower()
+    netloc = parsed_url.netloc.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parsed_url.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_QUERY_PARAMS
+    ))
+    return urlunparse((scheme, netloc, parsed_url.path or '/', parsed_url.params, query, ''))
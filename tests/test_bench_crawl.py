@@ -0,0 +1,62 @@
+import unittest
+import asyncio
+import random
+
+from benchmarks.bench_crawl import BenchSettings, parse_concurrency, run_crawl
+from benchmarks.fake_services import FakeJinaReader, LatencyDistribution, build_sites
+
+
+class TestFakeServices(unittest.TestCase):
+    def test_latency_distributions(self):
+        rng = random.Random(0)
+        self.assertEqual(LatencyDistribution.parse("0.25").sample(rng), 0.25)
+        uniform = LatencyDistribution.parse("uniform:0.1:0.2")
+        self.assertTrue(all(0.1 <= uniform.sample(rng) <= 0.2 for _ in range(100)))
+        self.assertGreater(LatencyDistribution.parse("lognormal:0.5:0.3").sample(rng), 0)
+        for spec in ("fast", "uniform:0.1", "lognormal:a:b"):
+            with self.assertRaises(ValueError):
+                LatencyDistribution.parse(spec)
+
+    def test_parse_concurrency(self):
+        self.assertEqual(parse_concurrency("4x2,16X8"), [(4, 2), (16, 8)])
+        with self.assertRaises(ValueError):
+            parse_concurrency("4x0")
+
+    def test_synthetic_site_pages(self):
+        site = build_sites(1, pages=2, articles_per_page=3, paragraphs=4)[0]
+        first = site.render(site.seed_url)
+        self.assertIn(site.article_url(1, 2), first)
+        self.assertIn(site.listing_url(2), first)
+        self.assertNotIn(site.listing_url(3), site.render(site.listing_url(2)))
+        self.assertEqual(site.render(site.article_url(2, 0)).count("الْفِقْرَةُ"), 4)
+        self.assertIsNone(site.render(site.article_url(3, 0)))
+
+
+class TestBenchCrawl(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_crawls_all_synthetic_articles_through_retries(self):
+        settings = BenchSettings(
+            sites=2, pages=2, articles_per_page=3, paragraphs=3,
+            jina_latency="0", gemini_latency="0", gemini_rate_limit_rate=0.3,
+            gemini_retry_base_delay=0.01, fetch_concurrency=4, llm_concurrency=2, render_pdf=False,
+        )
+
+        async def run():
+            async with FakeJinaReader(build_sites(settings.sites, settings.pages, settings.articles_per_page, settings.paragraphs)) as reader:
+                return await run_crawl(settings, reader.prefix)
+
+        result = self.loop.run_until_complete(run())
+        self.assertEqual(result['expected_articles'], 12)
+        self.assertEqual(result['articles'], 12)
+        self.assertGreater(result['gemini_retries'], 0)
+        self.assertGreater(result['article_p99'], 0)
+        self.assertIsNone(result['pdf_seconds'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import datetime
+import os
+import tempfile
+
+from src.corpus_store import CorpusStore, level_from_url, normalize_search_text
+
+
+def make_article(title, content, content_english="Content"):
+    return {"title": title, "title_english": f"{title} (English)", "content": content, "content_english": content_english}
+
+
+class TestCorpusStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'corpus.sqlite3')
+        self.corpus = CorpusStore(self.path)
+        elementary = "https://example.com/en/lessons/level/elementary"
+        advanced = "https://example.com/en/lessons/level/advanced"
+        self.corpus.put("https://example.com/b", make_article("السوق", "ذَهَبْتُ إِلَى السُّوقِ"), order=(0, 1, 1), seed=elementary,
+                        crawled_on=datetime.date(2024, 5, 1))
+        self.corpus.put("https://example.com/a", make_article("الكتاب", "قَرَأْتُ كِتَابًا", "I read a book"), order=(0, 1, 0), seed=elementary,
+                        crawled_on=datetime.date(2024, 5, 2))
+        self.corpus.put("https://example.com/c", make_article("أحمد", "أَحْمَدُ طَالِبٌ", "Ahmad is a student"), order=(1, 10, 0), seed=advanced,
+                        crawled_on=datetime.date(2024, 6, 1))
+
+    def tearDown(self):
+        self.corpus.close()
+        self.tmp_dir.cleanup()
+
+    def test_selection_is_in_crawl_order(self):
+        selection = self.corpus.select()
+        self.assertEqual(len(selection), 3)
+        self.assertEqual(list(selection), ["https://example.com/a", "https://example.com/b", "https://example.com/c"])
+        self.assertEqual(selection["https://example.com/b"]["title"], "السوق")
+        self.assertEqual([article["title"] for article in selection.values()], ["الكتاب", "السوق", "أحمد"])
+
+    def test_filters(self):
+        self.assertEqual(self.corpus.levels(), ["advanced", "elementary"])
+        self.assertEqual(list(self.corpus.select(level="Advanced")), ["https://example.com/c"])
+        self.assertEqual(list(self.corpus.select(since=datetime.date(2024, 5, 2), until=datetime.date(2024, 5, 31))), ["https://example.com/a"])
+        elementary = self.corpus.select(level="elementary")
+        self.assertNotIn("https://example.com/c", elementary)
+        with self.assertRaises(KeyError):
+            elementary["https://example.com/c"]
+
+    def test_keyword_search_ignores_tashkeel(self):
+        self.assertEqual(list(self.corpus.select(keyword="كتابا")), ["https://example.com/a"])
+        self.assertEqual(list(self.corpus.select(keyword="احمد")), ["https://example.com/c"])
+        self.assertEqual(list(self.corpus.select(keyword="book")), ["https://example.com/a"])
+        self.assertEqual(list(self.corpus.select(keyword="read student")), [])
+        self.assertEqual(list(self.corpus.select(keyword='"student', level="advanced")), ["https://example.com/c"])
+
+    def test_replaced_articles_are_reindexed(self):
+        self.corpus.put("https://example.com/a", make_article("الكتاب", "قَرَأْتُ مَجَلَّةً", "I read a magazine"), order=(0, 1, 0))
+        self.assertEqual(list(self.corpus.select(keyword="book")), [])
+        self.assertEqual(list(self.corpus.select(keyword="magazine")), ["https://example.com/a"])
+        self.assertEqual(len(self.corpus), 3)
+
+    def test_later_crawls_sort_after_earlier_ones(self):
+        self.corpus.close()
+        self.corpus = CorpusStore(self.path)
+        self.corpus.put("https://example.com/d", make_article("البيت", "هَذَا بَيْتِي"), order=(0, 1, 0))
+        self.assertEqual(list(self.corpus.select())[-1], "https://example.com/d")
+
+    def test_corpus_persists(self):
+        self.corpus.close()
+        self.corpus = CorpusStore(self.path)
+        self.assertEqual(len(self.corpus.select(level="elementary")), 2)
+
+    def test_helpers(self):
+        self.assertEqual(level_from_url("https://learning.aljazeera.net/en/lessons/level/Elementary?page=2"), "elementary")
+        self.assertIsNone(level_from_url("https://example.com/lesson/1"))
+        self.assertEqual(normalize_search_text("إِلَى الْكِتَابِ"), "الى الكتاب")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import time
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from src.fetch_cache import FetchCache
+from src.scraper_client import ScraperClient
+from src.utils import normalize_url
+
+
+def mock_session_returning(status, text="", headers=None):
+    """Build a mocked aiohttp session whose get() yields a single response."""
+    response = MagicMock()
+    response.status = status
+    response.headers = headers or {}
+    response.raise_for_status = MagicMock()
+    response.text = AsyncMock(return_value=text)
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=None)
+    session = AsyncMock()
+    session.get = MagicMock(return_value=context)
+    return session
+
+
+class TestFetchCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        self.tmp.cleanup()
+
+    def test_normalized_urls_share_an_entry(self):
+        cache = FetchCache(self.tmp.name)
+        cache.put("HTTPS://Example.com:443/lesson?b=2&a=1#top", "body")
+        entry = cache.get("https://example.com/lesson?a=1&b=2")
+        self.assertEqual(entry.body, "body")
+        self.assertEqual(normalize_url("http://example.com"), "http://example.com/")
+
+    def test_entries_expire_after_ttl(self):
+        cache = FetchCache(self.tmp.name, ttl=60)
+        entry = cache.put("https://example.com/a", "body", etag='"v1"')
+        self.assertTrue(cache.is_fresh(entry))
+        entry.fetched_at = time.time() - 120
+        self.assertFalse(cache.is_fresh(entry))
+        self.assertEqual(cache.conditional_headers(entry), {'If-None-Match': '"v1"'})
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = FetchCache(self.tmp.name, max_bytes=10**6)
+        for i, name in enumerate("abc"):
+            cache.put(f"https://example.com/{name}", "x" * 100)
+            os.utime(cache._path(f"https://example.com/{name}"), (1000 + i, 1000 + i))
+        cache.get("https://example.com/a")  # a becomes most recently used
+        cache.max_bytes = cache.total_bytes - 1
+        cache.put("https://example.com/d", "x" * 100)
+        self.assertIsNone(cache.get("https://example.com/b"))
+        self.assertIsNotNone(cache.get("https://example.com/a"))
+        self.assertIsNotNone(cache.get("https://example.com/d"))
+
+    @patch('src.scraper_client.aiohttp.ClientSession')
+    def test_fresh_entry_skips_the_network(self, MockSession):
+        MockSession.return_value = mock_session_returning(200, "network")
+        cache = FetchCache(self.tmp.name)
+        cache.put("https://example.com/a", "cached", backend="jina")
+
+        async def run():
+            async with ScraperClient("https://example.com", cache=cache) as scraper:
+                return await scraper.fetch_page("https://example.com/a")
+
+        self.assertEqual(self.loop.run_until_complete(run()), "cached")
+        MockSession.return_value.get.assert_not_called()
+
+    @patch('src.scraper_client.aiohttp.ClientSession')
+    def test_stale_entry_is_revalidated(self, MockSession):
+        session = mock_session_returning(304)
+        MockSession.return_value = session
+        cache = FetchCache(self.tmp.name, ttl=60)
+        entry = cache.put("https://example.com/a", "cached", last_modified="Mon, 01 Jan 2024 00:00:00 GMT", backend="jina")
+        entry.fetched_at = 0
+        cache._write(entry)
+
+        async def run():
+            async with ScraperClient("https://example.com", cache=cache) as scraper:
+                return await scraper.fetch_page("https://example.com/a")
+
+        self.assertEqual(self.loop.run_until_complete(run()), "cached")
+        sent_headers = session.get.call_args.kwargs['headers']
+        self.assertEqual(sent_headers, {'If-Modified-Since': "Mon, 01 Jan 2024 00:00:00 GMT"})
+        self.assertTrue(cache.is_fresh(cache.get("https://example.com/a", "jina")))
+
+    @patch('src.scraper_client.aiohttp.ClientSession')
+    def test_new_pages_are_stored_with_validators(self, MockSession):
+        MockSession.return_value = mock_session_returning(200, "fresh", {'ETag': '"abc"'})
+        cache = FetchCache(self.tmp.name)
+
+        async def run():
+            async with ScraperClient("https://example.com", cache=cache) as scraper:
+                return await scraper.fetch_page("https://example.com/new")
+
+        self.assertEqual(self.loop.run_until_complete(run()), "fresh")
+        entry = cache.get("https://example.com/new", "jina")
+        self.assertEqual((entry.body, entry.etag), ("fresh", '"abc"'))
+
+    @patch('src.scraper_client.aiohttp.ClientSession')
+    def test_backends_have_separate_entries(self, MockSession):
+        MockSession.return_value = mock_session_returning(200, "direct markdown")
+        cache = FetchCache(self.tmp.name)
+        cache.put("https://example.com/a", "jina markdown", backend="jina")
+
+        async def run():
+            async with ScraperClient("https://example.com", cache=cache, direct_hosts=["example.com"]) as scraper:
+                return await scraper.fetch_page("https://example.com/a")
+
+        self.assertEqual(self.loop.run_until_complete(run()), "direct markdown")
+        self.assertEqual(cache.get("https://example.com/a", "jina").body, "jina markdown")
+        self.assertEqual(cache.get("https://example.com/a", "direct").body, "direct markdown")
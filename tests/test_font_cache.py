@@ -0,0 +1,62 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+import fpdf
+
+from src import config
+from src.font_cache import CachedTTFFont, FontCache, add_cached_font
+
+FONT_PATH = os.path.join(config.FONTS_DIR, 'NotoSans-Regular.ttf')
+
+
+@unittest.skipUnless(os.path.exists(FONT_PATH), "Noto fonts are not installed in the fonts directory")
+class TestFontCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.font_path = os.path.join(self.tmp.name, 'font.ttf')
+        shutil.copy(FONT_PATH, self.font_path)
+        self.cache = FontCache(os.path.join(self.tmp.name, 'cache'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cached_font_matches_parsed_font(self):
+        parsed = fpdf.FPDF()
+        parsed.add_font('Test', '', self.font_path)
+        cached = fpdf.FPDF()
+        add_cached_font(cached, 'Test', '', self.font_path, self.cache)
+
+        expected, actual = parsed.fonts['test'], cached.fonts['test']
+        self.assertIsInstance(actual, CachedTTFFont)
+        self.assertEqual(dict(actual.cw), dict(expected.cw))
+        self.assertEqual(actual.glyph_ids, expected.glyph_ids)
+        for name in ('ascent', 'descent', 'cap_height', 'flags', 'font_b_box', 'italic_angle', 'stem_v', 'missing_width'):
+            self.assertEqual(getattr(actual.desc, name), getattr(expected.desc, name), name)
+        self.assertEqual((actual.name, actual.up, actual.ut), (expected.name, expected.up, expected.ut))
+
+    def test_unsupported_fpdf_version_parses_the_font(self):
+        pdf = fpdf.FPDF()
+        with patch.object(fpdf, '__version__', '99.0.0'):
+            add_cached_font(pdf, 'Test', '', self.font_path, self.cache)
+        self.assertNotIsInstance(pdf.fonts['test'], CachedTTFFont)
+        self.assertEqual(os.listdir(self.cache.cache_dir), [])
+
+    def test_metrics_are_shared_through_disk(self):
+        metrics = self.cache.metrics(self.font_path)
+        other_process_cache = FontCache(self.cache.cache_dir)
+        self.assertEqual(other_process_cache._read(other_process_cache._path(self.font_path)), metrics)
+
+    def test_rebuilt_when_font_file_changes(self):
+        metrics = self.cache.metrics(self.font_path)
+        stat = os.stat(self.font_path)
+        os.utime(self.font_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        rebuilt = FontCache(self.cache.cache_dir).metrics(self.font_path)
+        self.assertNotEqual(rebuilt.fingerprint, metrics.fingerprint)
+        self.assertEqual(rebuilt.glyphs, metrics.glyphs)
+
+
+if __name__ == '__main__':
+    unittest.main()
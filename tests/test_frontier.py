@@ -0,0 +1,69 @@
+import unittest
+import asyncio
+import os
+import tempfile
+
+from src.frontier import CrawlFrontier, HostLimiter, load_seeds_file
+
+
+class TestCrawlFrontier(unittest.TestCase):
+    def test_claim_uses_normalized_urls(self):
+        frontier = CrawlFrontier()
+        self.assertTrue(frontier.claim("https://Example.com/lesson?b=2&a=1&utm_source=feed"))
+        self.assertFalse(frontier.claim("https://example.com/lesson?a=1&b=2#comments"))
+        self.assertTrue(frontier.is_visited("https://example.com:443/lesson?a=1&b=2&fbclid=xyz"))
+        self.assertTrue(frontier.claim("https://example.com/lesson?a=1&b=3"))
+        self.assertEqual(len(frontier), 2)
+
+    def test_duplicate_seeds_are_dropped(self):
+        frontier = CrawlFrontier(["https://example.com/level/1", "https://example.com/level/2", "https://EXAMPLE.com/level/1#top"])
+        self.assertEqual(frontier.seeds, ["https://example.com/level/1", "https://example.com/level/2"])
+
+    def test_load_seeds_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "seeds.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# levels\nhttps://example.com/level/1\n\n  https://example.com/level/2  \n")
+            self.assertEqual(load_seeds_file(path), ["https://example.com/level/1", "https://example.com/level/2"])
+
+
+class TestHostLimiter(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_concurrency_is_limited_per_host(self):
+        limiter = HostLimiter(concurrency=2, delay=0)
+        active = {}
+        peak = {}
+
+        async def request(url):
+            host = url.split("/")[2]
+            async with limiter.slot(url):
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+                await asyncio.sleep(0.01)
+                active[host] -= 1
+
+        async def run():
+            await asyncio.gather(*[request(f"https://{host}/{i}") for host in ("a.com", "b.com") for i in range(5)])
+
+        self.loop.run_until_complete(run())
+        self.assertEqual(peak, {"a.com": 2, "b.com": 2})
+
+    def test_requests_to_a_host_are_spaced_by_delay(self):
+        limiter = HostLimiter(concurrency=5, delay=0.05)
+        starts = []
+
+        async def request(i):
+            async with limiter.slot(f"https://a.com/{i}"):
+                starts.append(asyncio.get_running_loop().time())
+
+        async def run():
+            await asyncio.gather(*[request(i) for i in range(3)])
+
+        self.loop.run_until_complete(run())
+        gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+        self.assertTrue(all(gap >= 0.045 for gap in gaps), gaps)
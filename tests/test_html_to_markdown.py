@@ -0,0 +1,87 @@
+import unittest
+import asyncio
+
+from aiohttp import web
+
+from src.html_to_markdown import html_to_markdown
+from src.scraper_client import ScraperClient
+
+LESSON_HTML = """
+<html>
+<head><title>Lesson  1</title><style>p { color: red }</style><script>var tracking = 1;</script></head>
+<body>
+  <nav><a href="/">Home</a> <a href="/levels">Levels</a></nav>
+  <main>
+    <h1>الدَّرْسُ <b>الْأَوَّلُ</b></h1>
+    <p>First <strong>paragraph</strong><br>second line</p>
+    <ul><li>one</li><li>two<ul><li>nested</li></ul></li></ul>
+    <table><tr><th>word</th><th>meaning</th></tr><tr><td>كِتَابٌ</td><td>book</td></tr></table>
+    <p><a href="lesson/2"><img src="thumb.png" alt="Lesson 2"></a> <a href="javascript:void(0)">Share</a></p>
+    <a href="?page=2">Next page</a>
+  </main>
+  <form><input name="q"><button>Search</button></form>
+</body>
+</html>
+"""
+
+
+class TestHtmlToMarkdown(unittest.TestCase):
+    def test_converts_page_like_the_reader(self):
+        markdown = html_to_markdown(LESSON_HTML, "https://example.com/lessons/")
+        blocks = markdown.split('\n\n')
+        self.assertEqual(blocks[:3], ["Title: Lesson 1", "URL Source: https://example.com/lessons/", "Markdown Content:"])
+        self.assertIn("[Home](https://example.com/) [Levels](https://example.com/levels)", blocks)
+        self.assertIn("# الدَّرْسُ **الْأَوَّلُ**", blocks)
+        self.assertIn("First **paragraph**\nsecond line", blocks)
+        self.assertIn("- one\n- two\n  - nested", blocks)
+        self.assertIn("| word | meaning |\n|---|---|\n| كِتَابٌ | book |", blocks)
+        self.assertIn("[![Lesson 2](https://example.com/lessons/thumb.png)](https://example.com/lessons/lesson/2) Share", blocks)
+        self.assertIn("[Next page](https://example.com/lessons/?page=2)", blocks)
+        for dropped in ("tracking", "color", "Search"):
+            self.assertNotIn(dropped, markdown)
+
+
+class TestDirectFetch(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_backend_is_selected_per_host(self):
+        scraper = ScraperClient("https://example.com", direct_hosts=["example.com"])
+        self.assertEqual(scraper.backend_for("https://example.com/a"), "direct")
+        self.assertEqual(scraper.backend_for("https://www.Example.com/a"), "direct")
+        self.assertEqual(scraper.backend_for("https://notexample.com/a"), "jina")
+
+    def test_direct_fetch_converts_compressed_html(self):
+        requests = []
+
+        async def handle(request):
+            requests.append(request.headers)
+            response = web.Response(text=LESSON_HTML, content_type='text/html')
+            response.enable_compression()
+            return response
+
+        async def run():
+            app = web.Application()
+            app.router.add_get('/lessons/', handle)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            host, port = runner.addresses[0][:2]
+            try:
+                async with ScraperClient("", direct_hosts=[host], convert_workers=0) as scraper:
+                    return await scraper.fetch_page(f"http://{host}:{port}/lessons/"), port
+            finally:
+                await runner.cleanup()
+
+        markdown, port = self.loop.run_until_complete(run())
+        self.assertIn("# الدَّرْسُ **الْأَوَّلُ**", markdown)
+        self.assertIn(f"[Next page](http://127.0.0.1:{port}/lessons/?page=2)", markdown)
+        self.assertIn("gzip", requests[0]['Accept-Encoding'])
+
+
+if __name__ == '__main__':
+    unittest.main()
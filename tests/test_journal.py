@@ -0,0 +1,49 @@
+import unittest
+import os
+import tempfile
+
+from src.journal import CrawlJournal
+
+
+class TestCrawlJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "journal.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_records_are_loaded_on_resume(self):
+        journal = CrawlJournal(self.path, fsync=False)
+        journal.record_listing("https://example.com/level", 1, "https://example.com/level", ["https://example.com/a"], "https://example.com/level?page=2")
+        journal.record_cursor("https://example.com/level", "https://example.com/level?page=2", 2)
+        journal.record_article("https://example.com/a", (0, 1, 0), {"title": "عنوان", "title_english": "Title"})
+        journal.close()
+
+        resumed = CrawlJournal(self.path, resume=True, fsync=False)
+        resumed.close()
+        state = resumed.state
+        self.assertEqual(state.articles["https://example.com/a"], ((0, 1, 0), {"title": "عنوان", "title_english": "Title"}))
+        self.assertEqual([record.url for record in state.listings_for("https://EXAMPLE.com/level#top")], ["https://example.com/level"])
+        self.assertEqual(state.cursor_for("https://example.com/level"), ("https://example.com/level?page=2", 2))
+        self.assertEqual(state.cursor_for("https://example.com/other"), ("https://example.com/other", 1))
+
+    def test_truncated_last_line_is_ignored(self):
+        journal = CrawlJournal(self.path, fsync=False)
+        journal.record_article("https://example.com/a", (0,), {"title": "a"})
+        journal.close()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"type": "article", "url": "https://exam')
+
+        state = CrawlJournal.load(self.path)
+        self.assertEqual(list(state.articles), ["https://example.com/a"])
+
+    def test_starting_over_truncates_the_journal(self):
+        journal = CrawlJournal(self.path, fsync=False)
+        journal.record_article("https://example.com/a", (0,), {"title": "a"})
+        journal.close()
+
+        fresh = CrawlJournal(self.path, fsync=False)
+        fresh.close()
+        self.assertEqual(fresh.state.articles, {})
+        self.assertEqual(CrawlJournal.load(self.path).articles, {})
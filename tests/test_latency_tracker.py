@@ -0,0 +1,36 @@
+import unittest
+
+from src.latency_tracker import LatencyTracker
+
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_timeouts_adapt_after_enough_samples(self):
+        tracker = LatencyTracker(min_samples=10, min_timeout=1.0, max_timeout=90.0, timeout_multiplier=3.0)
+        for _ in range(9):
+            tracker.record("example.com", 2.0)
+        self.assertEqual(tracker.timeout_for("example.com"), 90.0)
+        self.assertIsNone(tracker.hedge_delay("example.com"))
+
+        tracker.record("example.com", 4.0)
+        self.assertEqual(tracker.timeout_for("example.com"), 12.0)
+        self.assertEqual(tracker.hedge_delay("example.com"), 4.0)
+        self.assertEqual(tracker.timeout_for("other.com"), 90.0)
+
+    def test_timeouts_stay_within_bounds(self):
+        tracker = LatencyTracker(min_samples=1, min_timeout=5.0, max_timeout=60.0)
+        tracker.record("fast.com", 0.1)
+        tracker.record("slow.com", 100.0)
+        self.assertEqual(tracker.timeout_for("fast.com"), 5.0)
+        self.assertEqual(tracker.timeout_for("slow.com"), 60.0)
+
+    def test_only_recent_samples_count(self):
+        tracker = LatencyTracker(window=5, min_samples=1)
+        for _ in range(5):
+            tracker.record("example.com", 10.0)
+        for _ in range(5):
+            tracker.record("example.com", 1.0)
+        self.assertEqual(tracker.percentile("example.com", 0.99), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import tempfile
+
+from src.link_extractor import LinkExtractor, parse_markdown_links, url_template, page_number
+
+# Same listing fixture as tests/test_scraper.py
+MOCK_MARKDOWN = """
+# Main Page
+
+[Article 1](https://example.com/article1)
+[Article 2](/article2)
+[Next Page](https://example.com/page/2)
+"""
+
+LESSONS_MARKDOWN = """
+[Skip to content](#main) [Home](https://learning.example.net/en) [About us](/en/about)
+
+[![Turkey celebrates](https://cdn.example.net/img/1.jpg)](/en/lessons/turkey-celebrates-the-conquest)
+[A new school opens in the village](/en/lessons/a-new-school-opens-in-the-village)
+[Scientists discover a new planet](https://learning.example.net/en/lessons/scientists-discover-a-new-planet "Read more")
+[Contact us](mailto:hello@example.net)
+
+[« Previous](/en/lessons/level/elementary?page=0) [2](/en/lessons/level/elementary?page=2) [Next ›](/en/lessons/level/elementary?page=2)
+"""
+
+
+class TestLinkExtractor(unittest.TestCase):
+    def test_parse_markdown_links_resolves_relative_urls(self):
+        links = parse_markdown_links(MOCK_MARKDOWN, "https://example.com/main")
+        self.assertEqual([link.url for link in links], [
+            "https://example.com/article1",
+            "https://example.com/article2",
+            "https://example.com/page/2",
+        ])
+        self.assertEqual(links[1].text, "Article 2")
+
+    def test_parse_markdown_links_unwraps_images_and_skips_non_http(self):
+        links = parse_markdown_links(LESSONS_MARKDOWN, "https://learning.example.net/en/lessons/level/elementary?page=1")
+        urls = [link.url for link in links]
+        self.assertIn("https://learning.example.net/en/lessons/turkey-celebrates-the-conquest", urls)
+        self.assertNotIn("https://cdn.example.net/img/1.jpg", urls)
+        self.assertFalse(any(url.startswith("mailto:") for url in urls))
+
+    def test_url_template_and_page_number(self):
+        self.assertEqual(url_template("https://x.net/en/lessons/a-new-school-opens"), "/en/lessons/{slug}")
+        self.assertEqual(url_template("https://x.net/article12"), "/article{n}")
+        self.assertEqual(url_template("https://x.net/list?page=3&sort=new"), "/list?page={n}&sort")
+        self.assertEqual(page_number("https://x.net/list?page=3"), 3)
+        self.assertEqual(page_number("https://x.net/blog/page/4/"), 4)
+        self.assertIsNone(page_number("https://x.net/article12"))
+
+    def test_unknown_host_has_low_article_confidence(self):
+        result = LinkExtractor(patterns_path=None).extract(MOCK_MARKDOWN, "https://example.com/main")
+        self.assertEqual(result.next_page, "https://example.com/page/2")
+        self.assertEqual(result.next_page_confidence, 1.0)
+        self.assertLess(result.article_confidence, 0.75)
+
+    def test_learned_patterns_make_extraction_confident(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "patterns.json")
+            extractor = LinkExtractor(path)
+            extractor.learn("https://example.com/main", ["https://example.com/article1", "https://example.com/article2"], None)
+
+            result = LinkExtractor(path).extract(MOCK_MARKDOWN, "https://example.com/main")
+
+        self.assertEqual(result.articles, ["https://example.com/article1", "https://example.com/article2"])
+        self.assertGreaterEqual(result.article_confidence, 0.75)
+
+    def test_lessons_listing(self):
+        page_url = "https://learning.example.net/en/lessons/level/elementary?page=1"
+        result = LinkExtractor(patterns_path=None).extract(LESSONS_MARKDOWN, page_url)
+        self.assertEqual(result.articles, [
+            "https://learning.example.net/en/lessons/turkey-celebrates-the-conquest",
+            "https://learning.example.net/en/lessons/a-new-school-opens-in-the-village",
+            "https://learning.example.net/en/lessons/scientists-discover-a-new-planet",
+        ])
+        self.assertEqual(result.next_page, "https://learning.example.net/en/lessons/level/elementary?page=2")
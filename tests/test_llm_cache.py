@@ -0,0 +1,44 @@
+import unittest
+import os
+import tempfile
+
+from src.llm_cache import LLMCache, MISSING
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "llm.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_persists_parsed_results(self):
+        cache = LLMCache(self.path)
+        key = LLMCache.make_key("filter_article", "model", 1, "# markdown")
+        self.assertIs(cache.get(key), MISSING)
+        cache.put(key, {"title": "عنوان", "content_english": "Content"})
+        cache.put(LLMCache.make_key("next_page", "model", 1, "# listing", "https://example.com"), None)
+        cache.close()
+
+        reopened = LLMCache(self.path)
+        self.assertEqual(reopened.get(key), {"title": "عنوان", "content_english": "Content"})
+        self.assertIsNone(reopened.get(LLMCache.make_key("next_page", "model", 1, "# listing", "https://example.com")))
+        self.assertEqual(reopened.stats(), {"hits": 2, "misses": 0, "hit_rate": 1.0, "entries": 2})
+
+    def test_key_changes_with_model_version_and_content(self):
+        base = LLMCache.make_key("links", "model", 1, "content")
+        self.assertNotEqual(base, LLMCache.make_key("links", "other-model", 1, "content"))
+        self.assertNotEqual(base, LLMCache.make_key("links", "model", 2, "content"))
+        self.assertNotEqual(base, LLMCache.make_key("links", "model", 1, "changed"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = LLMCache(self.path, max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.get("b"), MISSING)
+        self.assertEqual(cache.get("a"), 1)
+        cache.close()
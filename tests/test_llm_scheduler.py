@@ -0,0 +1,125 @@
+import unittest
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.llm_scheduler import (
+    LLMScheduler,
+    TokenBucket,
+    PRIORITY_ARTICLE,
+    PRIORITY_LISTING,
+    retry_after_seconds,
+)
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code, headers=None, details=None):
+        super().__init__(f"{code} error")
+        self.code = code
+        self.response = SimpleNamespace(headers=headers or {})
+        self.details = details
+
+
+class TestLLMScheduler(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_with(self, scheduler, coro):
+        async def run():
+            try:
+                return await coro
+            finally:
+                await scheduler.close()
+        return self.loop.run_until_complete(run())
+
+    def test_listing_calls_run_before_queued_articles(self):
+        order = []
+
+        async def generate(prompt):
+            order.append(prompt)
+            await asyncio.sleep(0)
+            return prompt
+
+        scheduler = LLMScheduler(generate, max_concurrency=1)
+
+        async def run():
+            blocker = asyncio.create_task(scheduler.submit("first", PRIORITY_ARTICLE))
+            await asyncio.sleep(0)
+            calls = [scheduler.submit(f"article{i}", PRIORITY_ARTICLE) for i in range(3)]
+            calls.append(scheduler.submit("listing", PRIORITY_LISTING))
+            return await asyncio.gather(blocker, *calls)
+
+        results = self.run_with(scheduler, run())
+        self.assertEqual(results, ["first", "article0", "article1", "article2", "listing"])
+        self.assertEqual(order, ["first", "listing", "article0", "article1", "article2"])
+
+    def test_rate_limited_calls_are_retried_honoring_retry_after(self):
+        attempts = []
+
+        async def generate(prompt):
+            attempts.append(prompt)
+            if len(attempts) < 3:
+                raise FakeAPIError(429, headers={'retry-after': '0.05'})
+            return "ok"
+
+        scheduler = LLMScheduler(generate, base_delay=0.001, max_delay=0.01)
+        with patch('src.llm_scheduler.asyncio.sleep', wraps=asyncio.sleep) as mock_sleep:
+            result = self.run_with(scheduler, scheduler.submit("prompt"))
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(scheduler.retries, 2)
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list if call.args[0] >= 0.05], [0.05, 0.05])
+
+    def test_non_retryable_errors_are_raised(self):
+        async def generate(prompt):
+            raise FakeAPIError(400)
+
+        scheduler = LLMScheduler(generate, base_delay=0.001)
+        with self.assertRaises(FakeAPIError):
+            self.run_with(scheduler, scheduler.submit("prompt"))
+        self.assertEqual(scheduler.retries, 0)
+
+    def test_gives_up_after_max_retries(self):
+        async def generate(prompt):
+            raise FakeAPIError(503)
+
+        scheduler = LLMScheduler(generate, max_retries=2, base_delay=0.001, max_delay=0.001)
+        with self.assertRaises(FakeAPIError):
+            self.run_with(scheduler, scheduler.submit("prompt"))
+        self.assertEqual(scheduler.retries, 2)
+
+    def test_retry_delay_from_error_details(self):
+        error = FakeAPIError(429, details={'error': {'details': [{'retryDelay': '17s'}]}})
+        self.assertEqual(retry_after_seconds(error), 17.0)
+        self.assertIsNone(retry_after_seconds(FakeAPIError(500)))
+
+    def test_token_bucket_waits_for_refill(self):
+        bucket = TokenBucket(rate_per_minute=600, capacity=1)  # 10 per second
+
+        async def run():
+            start = time.monotonic()
+            for _ in range(3):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        elapsed = self.loop.run_until_complete(run())
+        self.assertGreaterEqual(elapsed, 0.18)
+
+    def test_token_bucket_is_reusable_across_event_loops(self):
+        bucket = TokenBucket(rate_per_minute=6000, capacity=1)
+
+        async def run():
+            # The second caller sleeps for a refill while holding the lock,
+            # so the third has to wait on it.
+            await asyncio.gather(bucket.acquire(), bucket.acquire(), bucket.acquire())
+
+        self.loop.run_until_complete(run())
+        other_loop = asyncio.new_event_loop()
+        try:
+            other_loop.run_until_complete(run())
+        finally:
+            other_loop.close()
@@ -0,0 +1,81 @@
+import unittest
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from src import main, pdf_generator, scraper
+
+
+class TestCrawlCommand(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_crawl_fails_fast_without_api_key(self):
+        args, parser = main.parse_args(["crawl", "https://example.com/lessons", "--no-corpus"])
+        env = {key: value for key, value in os.environ.items() if key != "GEMINI_API_KEY"}
+        with patch.dict(os.environ, env, clear=True), \
+                patch("dotenv.load_dotenv"), \
+                patch.object(scraper, "gemini_client", None), \
+                patch.object(scraper, "crawl") as crawl, \
+                contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                self.loop.run_until_complete(main.run(args, parser))
+        crawl.assert_not_called()
+        self.assertIn("GEMINI_API_KEY", stderr.getvalue())
+
+    def test_stream_rejects_whole_pdf_options(self):
+        for option in (["--render-workers", "2"], ["--bookmarks"], ["--pdf-cache"]):
+            with self.subTest(option=option), contextlib.redirect_stderr(io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit):
+                    main.parse_args(["crawl", "https://example.com/lessons", "--stream"] + option)
+                self.assertIn("don't apply with --stream", stderr.getvalue())
+
+    def test_stream_stops_crawl_when_renderer_fails(self):
+        handed = []
+
+        async def fake_crawl(urls, on_article=None, **_):
+            for i in range(100):
+                handed.append(i)
+                await on_article(f"https://example.com/{i}", i, {"title": str(i)})
+            return {}, []
+
+        async def failing_renderer(articles, output_path, **_):
+            await articles.__anext__()
+            raise OSError("disk full")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            args, parser = main.parse_args([
+                "crawl", "https://example.com/lessons", "--stream", "--no-corpus",
+                "--no-cache", "--no-llm-cache", "--no-dedup",
+                "--cache-dir", tmp, "--journal", os.path.join(tmp, "journal.jsonl"),
+                "--output", os.path.join(tmp, "out.pdf"),
+            ])
+            with patch.object(scraper, "get_gemini_client"), \
+                    patch.object(scraper, "crawl", fake_crawl), \
+                    patch.object(pdf_generator, "fonts_available", return_value=True), \
+                    patch.object(pdf_generator, "generate_pdf_stream", failing_renderer), \
+                    patch.object(main, "setup_pdf_stack", return_value=MagicMock()), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                with self.assertRaisesRegex(OSError, "disk full"):
+                    self.loop.run_until_complete(main.run(args, parser))
+        self.assertLess(len(handed), 100)
+
+
+class TestRenderCommand(unittest.TestCase):
+    def test_missing_corpus_is_an_error(self):
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stderr(io.StringIO()) as stderr:
+            path = os.path.join(tmp, "corpus.sqlite3")
+            with self.assertRaises(SystemExit):
+                main.parse_args(["render", "--corpus", path])
+            self.assertFalse(os.path.exists(path))
+        self.assertIn("does not exist", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
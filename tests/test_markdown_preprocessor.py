@@ -0,0 +1,98 @@
+import unittest
+import os
+import tempfile
+
+from src.markdown_preprocessor import MarkdownPreprocessor, collapse_link_noise, split_into_chunks
+
+NAVIGATION = "[Home](https://example.com/) [Lessons](https://example.com/lessons) [About us](https://example.com/about)"
+FOOTER = "We use cookies to improve your experience. By continuing you accept our cookie policy."
+
+
+def page(body):
+    return f"Title: Lesson\n\n{NAVIGATION}\n\n## Vocabulary\n\n{body}\n\n{FOOTER}"
+
+
+class TestMarkdownPreprocessor(unittest.TestCase):
+    def test_collapse_link_noise(self):
+        markdown = "![photo](https://cdn.example.com/a.jpg) [![Read more](https://cdn.example.com/b.jpg)](https://example.com/a) [](https://example.com/x)"
+        self.assertEqual(collapse_link_noise(markdown, keep_links=True), "photo [Read more](https://example.com/a) ")
+        self.assertEqual(collapse_link_noise(markdown, keep_links=False), "photo Read more ")
+
+    def test_strips_blocks_repeated_across_pages_of_a_host(self):
+        preprocessor = MarkdownPreprocessor(None, min_pages=3)
+        for i in range(2):
+            result = preprocessor.process(page(f"Lesson text number {i}."), f"https://example.com/lessons/{i}")
+            self.assertIn("cookies", result)
+
+        result = preprocessor.process(page("Lesson text number 2."), "https://example.com/lessons/2")
+        self.assertNotIn("cookies", result)
+        self.assertNotIn("About us", result)
+        # Short recurring headings and Jina's headers are kept
+        self.assertIn("## Vocabulary", result)
+        self.assertIn("Title: Lesson", result)
+        self.assertIn("Lesson text number 2.", result)
+        self.assertEqual(preprocessor.stats.boilerplate_blocks, 2)
+        self.assertGreater(preprocessor.stats.tokens_saved, 0)
+
+        # Other hosts learn their own boilerplate
+        result = preprocessor.process(page("Other text."), "https://other.example.org/lesson")
+        self.assertIn("cookies", result)
+
+    def test_refetching_the_same_page_is_not_boilerplate(self):
+        preprocessor = MarkdownPreprocessor(None, min_pages=2)
+        for _ in range(3):
+            result = preprocessor.process(page("The same lesson body, fetched again."), "https://example.com/lessons/1")
+        self.assertIn("The same lesson body", result)
+
+    def test_token_budget_keeps_links_on_listing_pages(self):
+        preprocessor = MarkdownPreprocessor(None, token_budget=40)
+        intro = "An introduction to this week's lessons. " * 5
+        listing = f"{intro}\n\n[Lesson one](https://example.com/l/1)\n\n{intro}\n\n[Next](https://example.com/page/2)"
+        result = preprocessor.process(listing, "https://example.com/lessons", keep_links=True)
+        self.assertIn("[Lesson one](https://example.com/l/1)", result)
+        self.assertIn("[Next](https://example.com/page/2)", result)
+        self.assertEqual(preprocessor.stats.truncated_pages, 1)
+
+        # Articles are translated in chunks instead, so they're never cut.
+        article = preprocessor.process("Paragraph. " * 100 + "\n\nThe end.", "https://example.com/l/1")
+        self.assertIn("The end.", article)
+        self.assertEqual(preprocessor.stats.truncated_pages, 1)
+
+    def test_cache_key_ignores_learned_boilerplate(self):
+        preprocessor = MarkdownPreprocessor(None, min_pages=2)
+        markdown = page("Lesson text number 0.")
+        first = preprocessor.process(markdown, "https://example.com/lessons/0")
+        first_key = preprocessor.cache_key(markdown)
+        preprocessor.process(page("Lesson text number 1."), "https://example.com/lessons/1")
+        self.assertNotEqual(preprocessor.process(markdown, "https://example.com/lessons/0"), first)
+        self.assertEqual(preprocessor.cache_key(markdown), first_key)
+        self.assertNotEqual(preprocessor.cache_key(page("Lesson text number 1.")), first_key)
+
+    def test_learned_boilerplate_is_saved(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "boilerplate.json")
+            preprocessor = MarkdownPreprocessor(path, min_pages=2)
+            for i in range(2):
+                preprocessor.process(page(f"Body {i}."), f"https://example.com/lessons/{i}")
+            preprocessor.save()
+
+            result = MarkdownPreprocessor(path, min_pages=2).process(page("Body 3."), "https://example.com/lessons/3")
+            self.assertNotIn("cookies", result)
+
+
+class TestSplitIntoChunks(unittest.TestCase):
+    def test_packs_whole_paragraphs(self):
+        paragraphs = ["a" * 40, "b" * 40, "c" * 40]
+        self.assertEqual(split_into_chunks("\n\n".join(paragraphs), max_tokens=20),
+                         ["a" * 40 + "\n\n" + "b" * 40, "c" * 40])
+
+    def test_splits_overlong_paragraphs(self):
+        sentence = "هذه جملة طويلة في الدرس. "
+        chunks = split_into_chunks(sentence * 20, max_tokens=20)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 80 for chunk in chunks))
+        self.assertEqual("".join(chunks).replace(" ", ""), (sentence * 20).replace(" ", ""))
+
+
+if __name__ == '__main__':
+    unittest.main()
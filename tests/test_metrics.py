@@ -0,0 +1,80 @@
+import unittest
+import json
+import os
+import tempfile
+
+from src.metrics import Metrics, percentile
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+        self.metrics.enable()
+
+    def test_disabled_metrics_record_nothing(self):
+        metrics = Metrics()
+        metrics.incr("articles")
+        with metrics.span("fetch"):
+            pass
+        self.assertEqual(metrics.report()['counters'], [])
+        self.assertEqual(metrics.report()['histograms'], [])
+
+    def test_counters_and_spans(self):
+        self.metrics.incr("fetch_bytes", 100, backend="jina")
+        self.metrics.incr("fetch_bytes", 50, backend="jina")
+        self.metrics.incr("articles")
+        for _ in range(3):
+            with self.metrics.span("gemini_call", kind="listing"):
+                pass
+        with self.assertRaises(ValueError):
+            with self.metrics.span("gemini_call", kind="filter_article"):
+                raise ValueError("failed calls are timed too")
+
+        self.assertEqual(self.metrics.counter("fetch_bytes", backend="jina"), 150)
+        report = self.metrics.report()
+        histograms = {(h['name'], h['labels']['kind']): h for h in report['histograms']}
+        self.assertEqual(histograms[("gemini_call_seconds", "listing")]['count'], 3)
+        self.assertEqual(histograms[("gemini_call_seconds", "filter_article")]['count'], 1)
+        self.assertEqual(len(self.metrics.samples("gemini_call_seconds")), 4)
+        self.assertGreater(report['articles_per_second'], 0)
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 0.5), 50)
+        self.assertEqual(percentile(samples, 0.99), 99)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_percentile_rounds_ranks_up(self):
+        self.assertEqual(percentile([5, 1, 4, 2, 3], 0.5), 3)
+        ten = list(range(1, 11))
+        self.assertEqual(percentile(ten, 0.25), 3)
+        self.assertEqual(percentile(ten, 0.5), 5)
+        self.assertEqual(percentile(ten, 0.95), 10)
+        twenty = list(range(1, 21))
+        self.assertEqual(percentile(twenty, 0.95), 19)
+        self.assertEqual(percentile(twenty, 0.99), 20)
+        self.assertEqual(percentile(list(range(1, 101)), 0.07), 7)
+        self.assertEqual(percentile(ten, 0), 1)
+        self.assertEqual(percentile(ten, 1), 10)
+
+    def test_writes_json_and_prometheus_reports(self):
+        self.metrics.incr("llm_cache_hits", kind="listing")
+        self.metrics.observe("fetch_seconds", 0.02, backend="jina")
+        self.metrics.observe("fetch_seconds", 3.0, backend="jina")
+        with tempfile.TemporaryDirectory() as tmp:
+            self.metrics.write_json(os.path.join(tmp, "profile.json"))
+            self.metrics.write_prometheus(os.path.join(tmp, "profile.prom"))
+            with open(os.path.join(tmp, "profile.json")) as f:
+                report = json.load(f)
+            with open(os.path.join(tmp, "profile.prom")) as f:
+                prom = f.read().splitlines()
+
+        self.assertEqual(report['histograms'][0]['count'], 2)
+        self.assertIn('arabic_scraper_llm_cache_hits_total{kind="listing"} 1', prom)
+        self.assertIn('arabic_scraper_fetch_seconds_bucket{backend="jina",le="0.025"} 1', prom)
+        self.assertIn('arabic_scraper_fetch_seconds_bucket{backend="jina",le="+Inf"} 2', prom)
+        self.assertIn('arabic_scraper_fetch_seconds_count{backend="jina"} 2', prom)
+
+
+if __name__ == '__main__':
+    unittest.main()
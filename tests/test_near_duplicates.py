@@ -0,0 +1,132 @@
+import unittest
+import asyncio
+import os
+import tempfile
+
+from src.near_duplicates import NearDuplicateIndex
+from src.pipeline import ArticlePipeline
+
+LESSON = """Title: The Market
+URL Source: https://example.com/en/lessons/market
+
+Markdown Content:
+# ذَهَبْتُ إِلَى السُّوقِ
+
+ذَهَبْتُ إِلَى السُّوقِ يَوْمَ الْجُمُعَةِ مَعَ أَبِي وَأَخِي الصَّغِيرِ. اِشْتَرَيْنَا خُبْزًا وَفَاكِهَةً وَخُضَارًا.
+كَانَ السُّوقُ مُزْدَحِمًا جِدًّا، وَكَانَ الْبَائِعُونَ يُنَادُونَ عَلَى بَضَائِعِهِمْ بِأَصْوَاتٍ عَالِيَةٍ.
+بَعْدَ ذَلِكَ جَلَسْنَا فِي مَقْهًى صَغِيرٍ وَشَرِبْنَا الشَّايَ بِالنَّعْنَاعِ ثُمَّ رَجَعْنَا إِلَى الْبَيْتِ.
+"""
+
+# The same lesson republished under another URL with a share line added.
+REPUBLISHED = LESSON.replace("/en/lessons/market", "/ar/lessons/market?ref=home") + "\nشارك الدرس\n"
+
+OTHER_LESSON = """Title: The School
+URL Source: https://example.com/en/lessons/school
+
+Markdown Content:
+# الْمَدْرَسَةُ
+
+مَدْرَسَتِي كَبِيرَةٌ وَجَمِيلَةٌ، وَفِيهَا مَكْتَبَةٌ وَمَلْعَبٌ وَحَدِيقَةٌ. أُحِبُّ مُعَلِّمِي كَثِيرًا لِأَنَّهُ يَشْرَحُ الدُّرُوسَ بِصَبْرٍ.
+فِي الِاسْتِرَاحَةِ نَلْعَبُ كُرَةَ الْقَدَمِ مَعَ أَصْدِقَائِنَا، ثُمَّ نَعُودُ إِلَى الْفَصْلِ لِنَدْرُسَ الرِّيَاضِيَّاتِ.
+"""
+
+ARTICLE = {"title": "السوق", "title_english": "The Market", "content": "...", "content_english": "..."}
+
+# A site menu of 60 links, as Jina renders it above every page.
+NAVIGATION = "\n".join(f"*   [Lesson {i}: الدرس رقم {i}](https://example.com/en/lessons/{i})" for i in range(60))
+
+
+def framed(lesson):
+    header, content = lesson.split("Markdown Content:\n")
+    return f"{header}Markdown Content:\n{NAVIGATION}\n\n{content}\n\n[Privacy](https://example.com/privacy) [Terms](https://example.com/terms)\n"
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'near_duplicates.sqlite3')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_finds_near_duplicates_only(self):
+        index = NearDuplicateIndex(None)
+        index.add("https://example.com/en/lessons/market", index.signature(LESSON))
+
+        self.assertGreater(index.similarity(index.signature(LESSON), index.signature(REPUBLISHED)), 0.9)
+        self.assertEqual(index.find(index.signature(REPUBLISHED)), "https://example.com/en/lessons/market")
+        self.assertIsNone(index.find(index.signature(OTHER_LESSON)))
+        self.assertIsNone(index.find(index.signature(LESSON), exclude="https://example.com/en/lessons/market"))
+
+    def test_only_the_article_body_is_compared(self):
+        index = NearDuplicateIndex(None)
+        self.assertEqual(index.signature(framed(LESSON)), index.signature(LESSON))
+        index.add("https://example.com/en/lessons/market", index.signature(framed(LESSON)))
+        self.assertIsNone(index.find(index.signature(framed(OTHER_LESSON))))
+
+    def test_short_articles_are_not_compared(self):
+        index = NearDuplicateIndex(None)
+        self.assertIsNone(index.signature("Title: Home\n\nMarkdown Content:\n" + NAVIGATION))
+        self.assertIsNone(index.signature("# الدرس\n\nمرحبا بكم في الدرس الأول"))
+
+    def test_translations_and_aliases_persist(self):
+        index = NearDuplicateIndex(self.path)
+        index.add("https://example.com/en/lessons/market", index.signature(LESSON))
+        index.add("https://example.com/en/lessons/school", index.signature(OTHER_LESSON))
+        index.set_article("https://example.com/en/lessons/market", ARTICLE)
+        index.add_alias("https://example.com/ar/lessons/market", "https://example.com/en/lessons/market")
+        index.close()
+
+        reopened = NearDuplicateIndex(self.path)
+        # Only articles with a stored translation are kept.
+        self.assertEqual(len(reopened), 1)
+        original = reopened.find(reopened.signature(REPUBLISHED))
+        self.assertEqual(original, "https://example.com/en/lessons/market")
+        self.assertEqual(reopened.article(original), ARTICLE)
+        self.assertEqual(reopened.aliases(original), ["https://example.com/ar/lessons/market"])
+        reopened.close()
+
+
+class TestPipelineDeduplication(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_near_duplicates_reuse_translations(self):
+        pages = {
+            "https://example.com/en/lessons/market": LESSON,
+            "https://example.com/ar/lessons/market": REPUBLISHED,
+            "https://example.com/en/lessons/school": OTHER_LESSON,
+        }
+        translated = []
+
+        async def fetch(url):
+            return pages[url]
+
+        async def process(markdown):
+            translated.append(markdown)
+            await asyncio.sleep(0.01)
+            return {**ARTICLE, "content": markdown}
+
+        async def run():
+            index = NearDuplicateIndex(None)
+            # The copies are translated concurrently, so the second one has to
+            # wait for the first translation rather than start its own.
+            async with ArticlePipeline(fetch, process, llm_concurrency=3, duplicates=index) as pipeline:
+                for url in pages:
+                    pipeline.submit(url)
+                await pipeline.join()
+            return pipeline.results(), index
+
+        results, index = self.loop.run_until_complete(run())
+        self.assertEqual(len(translated), 2)
+        self.assertEqual(list(results), list(pages))
+        self.assertEqual(results["https://example.com/ar/lessons/market"], results["https://example.com/en/lessons/market"])
+        self.assertEqual(index.aliases("https://example.com/en/lessons/market"), ["https://example.com/ar/lessons/market"])
+        self.assertEqual(index.reused, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import os
+import tempfile
+
+from src.pdf_cache import FragmentCache
+
+ARTICLE = {'title': 'عنوان', 'title_english': 'Title', 'content': 'نص', 'content_english': 'Text'}
+
+
+class TestFragmentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = FragmentCache(self.tmp.name, max_bytes=1024)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _render(self, key, size=100):
+        path = f"{self.cache.path_for(key)}.tmp"
+        with open(path, 'wb') as f:
+            f.write(b'%PDF' + b'0' * (size - 4))
+        return self.cache.put(key, path)
+
+    def test_key_depends_on_text_and_layout(self):
+        key = FragmentCache.make_key(ARTICLE, 'layout=1')
+        self.assertEqual(key, FragmentCache.make_key(dict(ARTICLE), 'layout=1'))
+        self.assertNotEqual(key, FragmentCache.make_key(dict(ARTICLE, content_english='Other'), 'layout=1'))
+        self.assertNotEqual(key, FragmentCache.make_key(ARTICLE, 'layout=2'))
+
+    def test_get_and_put(self):
+        key = FragmentCache.make_key(ARTICLE, 'layout=1')
+        self.assertIsNone(self.cache.get(key))
+        path = self._render(key)
+        self.assertEqual(self.cache.get(key), path)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        # A new cache over the same directory sees the fragment
+        self.assertEqual(FragmentCache(self.tmp.name).get(key), path)
+
+    def test_evicts_least_recently_used(self):
+        paths = [self._render(f"key{i}", size=400) for i in range(3)]
+        os.utime(paths[0], (1, 1))
+        os.utime(paths[1], (2, 2))
+        self.cache.evict()
+        self.assertEqual([os.path.exists(path) for path in paths], [False, True, True])
+        self.assertLessEqual(self.cache.total_bytes, 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
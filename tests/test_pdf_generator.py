@@ -0,0 +1,120 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+from unittest.mock import patch
+
+from src import config, pdf_generator
+from src.font_cache import FontCache, get_font_cache, set_font_cache
+from pypdf import PdfReader
+
+from src.dummy_articles import DUMMY_ARTICLES
+from src.pdf_cache import FragmentCache
+from src.pdf_generator import StreamingPDFWriter, generate_pdf, generate_pdf_stream, render_shard, split_into_shards
+
+
+class TestSplitIntoShards(unittest.TestCase):
+    def test_shards_are_contiguous_and_balanced(self):
+        articles = [{'title': '', 'content': 'x' * size, 'title_english': '', 'content_english': ''}
+                    for size in (100, 100, 100, 100, 400)]
+        shards = split_into_shards(articles, 2)
+        self.assertEqual([article for shard in shards for article in shard], articles)
+        self.assertEqual([len(shard) for shard in shards], [4, 1])
+
+    def test_never_more_shards_than_articles(self):
+        articles = list(DUMMY_ARTICLES.values())
+        shards = split_into_shards(articles, 10)
+        self.assertLessEqual(len(shards), len(articles))
+        self.assertEqual([article for shard in shards for article in shard], articles)
+
+
+FONTS_INSTALLED = all(
+    os.path.exists(os.path.join(config.FONTS_DIR, name))
+    for name in ('NotoSansArabic-Regular.ttf', 'NotoSansArabic-Bold.ttf', 'NotoSans-Regular.ttf', 'NotoSans-Bold.ttf')
+)
+
+
+@unittest.skipUnless(FONTS_INSTALLED, "Noto fonts are not installed in the fonts directory")
+class TestPDFGenerator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.tmp.name, "lessons.pdf")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_generate_pdf(self):
+        generate_pdf(DUMMY_ARTICLES, self.output_path)
+        with open(self.output_path, "rb") as f:
+            self.assertTrue(f.read(5).startswith(b"%PDF"))
+
+    def test_parallel_render_matches_shards(self):
+        generate_pdf(DUMMY_ARTICLES, self.output_path, workers=2, bookmarks=True)
+
+        expected_pages = 0
+        for i, shard in enumerate(split_into_shards(list(DUMMY_ARTICLES.values()), 2)):
+            expected_pages += render_shard(shard, os.path.join(self.tmp.name, f"shard{i}.pdf"))
+        reader = PdfReader(self.output_path)
+        self.assertEqual(len(reader.pages), expected_pages)
+        # One bookmark per article, in article order
+        self.assertEqual([item.title for item in reader.outline],
+                         [article['title_english'] for article in DUMMY_ARTICLES.values()])
+
+    def test_spawned_workers_use_configured_font_cache(self):
+        font_cache_dir = os.path.join(self.tmp.name, "fonts")
+        previous = get_font_cache()
+        set_font_cache(FontCache(font_cache_dir))
+        spawn_pool = partial(ProcessPoolExecutor, mp_context=get_context("spawn"))
+        try:
+            with patch.object(pdf_generator, "ProcessPoolExecutor", spawn_pool):
+                generate_pdf(DUMMY_ARTICLES, self.output_path, workers=2)
+        finally:
+            set_font_cache(previous)
+        # Only the workers lay out pages, so the metrics were cached by them.
+        self.assertTrue(os.listdir(font_cache_dir))
+
+    def test_fragment_cache_renders_only_changed_articles(self):
+        cache = FragmentCache(os.path.join(self.tmp.name, "fragments"))
+        generate_pdf(DUMMY_ARTICLES, self.output_path, fragment_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (0, len(DUMMY_ARTICLES)))
+
+        changed = dict(DUMMY_ARTICLES)
+        url = next(iter(changed))
+        changed[url] = dict(changed[url], content_english="A revised translation.")
+        generate_pdf(changed, self.output_path, workers=2, fragment_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (len(DUMMY_ARTICLES) - 1, len(DUMMY_ARTICLES) + 1))
+        self.assertGreaterEqual(len(PdfReader(self.output_path).pages), len(changed))
+
+    def test_streaming_writer_flushes_volumes_by_article_count(self):
+        writer = StreamingPDFWriter(self.output_path, volume_articles=2)
+        for article in DUMMY_ARTICLES.values():
+            writer.add(article)
+        # The first volume is on disk before the stream ends
+        self.assertEqual(writer.volume_paths, [os.path.join(self.tmp.name, "lessons_vol001.pdf")])
+        paths = writer.close()
+
+        self.assertEqual([os.path.basename(path) for path in paths], ["lessons_vol001.pdf", "lessons_vol002.pdf"])
+        self.assertTrue(all(os.path.getsize(path) > 0 for path in paths))
+        self.assertEqual(writer.articles_written, len(DUMMY_ARTICLES))
+
+    def test_streaming_writer_flushes_volumes_by_size(self):
+        writer = StreamingPDFWriter(self.output_path, volume_articles=100, volume_bytes=1)
+        for article in DUMMY_ARTICLES.values():
+            writer.add(article)
+        self.assertEqual(len(writer.close()), len(DUMMY_ARTICLES))
+
+    def test_generate_pdf_stream(self):
+        async def articles():
+            for url, article in DUMMY_ARTICLES.items():
+                await asyncio.sleep(0)
+                yield url, article
+
+        loop = asyncio.new_event_loop()
+        try:
+            paths = loop.run_until_complete(generate_pdf_stream(articles(), self.output_path, volume_articles=10))
+        finally:
+            loop.close()
+        self.assertEqual(paths, [os.path.join(self.tmp.name, "lessons_vol001.pdf")])
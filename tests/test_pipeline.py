@@ -0,0 +1,151 @@
+import unittest
+import asyncio
+
+from src.pipeline import ArticlePipeline
+
+
+def make_article(url):
+    return {
+        "title": f"عنوان {url}",
+        "title_english": f"Title {url}",
+        "content": "محتوى",
+        "content_english": "Content",
+    }
+
+
+class TestArticlePipeline(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_results_keep_submission_order(self):
+        urls = [f"https://example.com/article{i}" for i in range(10)]
+
+        async def fetch(url):
+            # Later articles finish first to exercise reordering
+            await asyncio.sleep(0.001 * (10 - int(url[-1])))
+            return url
+
+        async def process(markdown):
+            return make_article(markdown)
+
+        async def run():
+            async with ArticlePipeline(fetch, process, fetch_concurrency=4, llm_concurrency=2) as pipeline:
+                for url in urls:
+                    pipeline.submit(url)
+                await pipeline.join()
+            return pipeline.results()
+
+        results = self.loop.run_until_complete(run())
+        self.assertEqual(list(results), urls)
+        self.assertEqual(results[urls[3]]["title_english"], f"Title {urls[3]}")
+
+    def test_stages_run_concurrently(self):
+        active = {"fetch": 0, "llm": 0}
+        peak = {"fetch": 0, "llm": 0}
+
+        def tracked(stage):
+            async def run(value):
+                active[stage] += 1
+                peak[stage] = max(peak[stage], active[stage])
+                await asyncio.sleep(0.01)
+                active[stage] -= 1
+                return value if stage == "fetch" else make_article(value)
+            return run
+
+        async def run():
+            async with ArticlePipeline(tracked("fetch"), tracked("llm"), fetch_concurrency=3, llm_concurrency=2) as pipeline:
+                for i in range(12):
+                    pipeline.submit(f"https://example.com/{i}")
+                await pipeline.join()
+            return pipeline.results()
+
+        results = self.loop.run_until_complete(run())
+        self.assertEqual(len(results), 12)
+        self.assertEqual(peak, {"fetch": 3, "llm": 2})
+
+    def test_duplicates_and_failures_are_skipped(self):
+        async def fetch(url):
+            if url.endswith("broken"):
+                raise RuntimeError("boom")
+            return url
+
+        async def process(markdown):
+            return None if markdown.endswith("empty") else make_article(markdown)
+
+        async def run():
+            async with ArticlePipeline(fetch, process) as pipeline:
+                self.assertTrue(pipeline.submit("https://example.com/a"))
+                self.assertFalse(pipeline.submit("https://example.com/a"))
+                pipeline.submit("https://example.com/broken")
+                pipeline.submit("https://example.com/empty")
+                await pipeline.join()
+            return pipeline.results()
+
+        results = self.loop.run_until_complete(run())
+        self.assertEqual(list(results), ["https://example.com/a"])
+
+    def test_articles_can_be_streamed_without_keeping_results(self):
+        streamed = []
+
+        async def fetch(url):
+            return url
+
+        async def process(markdown):
+            return make_article(markdown)
+
+        async def run():
+            async with ArticlePipeline(
+                fetch, process,
+                on_article=lambda url, order, article: streamed.append((url, order)),
+                keep_results=False,
+            ) as pipeline:
+                pipeline.restore("https://example.com/done", make_article("done"), order=(0, 1, 0))
+                pipeline.submit("https://example.com/new", order=(0, 1, 1))
+                await pipeline.join()
+            return pipeline.results()
+
+        results = self.loop.run_until_complete(run())
+        self.assertEqual(results, {})
+        self.assertEqual(streamed, [("https://example.com/done", (0, 1, 0)), ("https://example.com/new", (0, 1, 1))])
+
+    def test_asynchronous_consumer_holds_back_the_pipeline(self):
+        urls = [f"https://example.com/article{i}" for i in range(6)]
+        consumed = []
+
+        async def fetch(url):
+            return url
+
+        async def process(markdown):
+            return make_article(markdown)
+
+        async def run():
+            queue = asyncio.Queue(maxsize=1)
+
+            async def consume():
+                while True:
+                    url = await queue.get()
+                    await asyncio.sleep(0.005)
+                    consumed.append(url)
+                    queue.task_done()
+
+            consumer = asyncio.create_task(consume())
+            async with ArticlePipeline(
+                fetch, process, llm_concurrency=3,
+                on_article=lambda url, order, article: queue.put(url),
+                keep_results=False,
+            ) as pipeline:
+                pipeline.restore("https://example.com/done", make_article("done"))
+                for url in urls:
+                    pipeline.submit(url)
+                await pipeline.join()
+                # Every article has been handed over, and at most one is still waiting.
+                waiting = queue.qsize()
+            await queue.join()
+            consumer.cancel()
+            return waiting
+
+        self.assertLessEqual(self.loop.run_until_complete(run()), 1)
+        self.assertEqual(sorted(consumed), sorted(urls + ["https://example.com/done"]))
@@ -2,14 +2,31 @@ import unittest
 import asyncio
 from unittest.mock import patch, AsyncMock, MagicMock
 import json
+import os
+import tempfile
 
 from src.scraper import (
-    ArabicScraper,
+    crawl,
+    ScraperClient,
     extract_links_from_markdown_with_gemini,
     extract_next_page_link_from_markdown_with_gemini,
     filter_article_with_gemini,
-    scrape_all_articles
+    extract_listing_links,
+    extract_listing_with_gemini,
+    scrape_all_articles,
 )
+from src.corpus_store import CorpusStore
+from src.journal import CrawlJournal
+from src.link_extractor import LinkExtractor
+from src.llm_cache import LLMCache
+from src.markdown_preprocessor import MarkdownPreprocessor
+
+
+def mock_gemini_client():
+    """Return a stand-in Gemini client whose generate_content is an AsyncMock."""
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock()
+    return client
 
 # Mock data
 MOCK_MARKDOWN = """
@@ -40,7 +57,7 @@ class TestScraper(unittest.TestCase):
     def setUp(self):
         self.loop = asyncio.get_event_loop()
 
-    @patch('src.scraper.aiohttp.ClientSession')
+    @patch('src.scraper_client.aiohttp.ClientSession')
     def test_fetch_page(self, MockSession):
         mock_response_text = "MOCKED PAGE"
 
@@ -64,25 +81,26 @@ class TestScraper(unittest.TestCase):
         MockSession.return_value = mock_session_instance
 
         async def run():
-            async with ArabicScraper("http://test.com") as scraper:
+            async with ScraperClient("http://test.com") as scraper:
                 result = await scraper.fetch_page("http://test.com/page")
                 self.assertEqual(result, mock_response_text)
         self.loop.run_until_complete(run())
 
-    @patch('src.scraper.geminiClient.models.generate_content')
-    def test_extract_links_from_markdown_with_gemini(self, mock_gemini):
+    @patch('src.scraper.gemini_client', new_callable=mock_gemini_client)
+    def test_extract_links_from_markdown_with_gemini(self, gemini_client):
+        mock_gemini = gemini_client.aio.models.generate_content
         mock_resp = MagicMock()
         mock_resp.text = MOCK_LINKS_RESPONSE
         mock_gemini.return_value = mock_resp
 
         async def run():
             links = await extract_links_from_markdown_with_gemini(MOCK_MARKDOWN, "https://example.com/main")
-            self.assertIn("https://example.com/article1", links)
-            self.assertIn("https://example.com/article2", links)
+            self.assertEqual(links, ["https://example.com/article1", "https://example.com/article2"])
         self.loop.run_until_complete(run())
 
-    @patch('src.scraper.geminiClient.models.generate_content')
-    def test_extract_next_page_link_from_markdown_with_gemini(self, mock_gemini):
+    @patch('src.scraper.gemini_client', new_callable=mock_gemini_client)
+    def test_extract_next_page_link_from_markdown_with_gemini(self, gemini_client):
+        mock_gemini = gemini_client.aio.models.generate_content
         mock_resp = MagicMock()
         mock_resp.text = MOCK_NEXT_PAGE_RESPONSE
         mock_gemini.return_value = mock_resp
@@ -92,8 +110,9 @@ class TestScraper(unittest.TestCase):
             self.assertEqual(next_link, "https://example.com/page/2")
         self.loop.run_until_complete(run())
 
-    @patch('src.scraper.geminiClient.models.generate_content')
-    def test_filter_article_with_gemini(self, mock_gemini):
+    @patch('src.scraper.gemini_client', new_callable=mock_gemini_client)
+    def test_filter_article_with_gemini(self, gemini_client):
+        mock_gemini = gemini_client.aio.models.generate_content
         mock_resp = MagicMock()
         mock_resp.text = MOCK_FILTERED_ARTICLE_RESPONSE
         mock_gemini.return_value = mock_resp
@@ -107,14 +126,17 @@ class TestScraper(unittest.TestCase):
     @patch('src.scraper.filter_article_with_gemini')
     @patch('src.scraper.extract_next_page_link_from_markdown_with_gemini')
     @patch('src.scraper.extract_links_from_markdown_with_gemini')
-    @patch('src.scraper.ArabicScraper.fetch_page')
+    @patch('src.scraper.ScraperClient.fetch_page')
     def test_scrape_all_articles(self, mock_fetch_page, mock_extract_links, mock_extract_next, mock_filter_article):
         # Setup mocks
-        mock_fetch_page.side_effect = [
-            MOCK_MARKDOWN,  # main page
-            MOCK_ARTICLE_MARKDOWN,  # article 1
-            MOCK_ARTICLE_MARKDOWN   # article 2
-        ]
+        # Listing pages are prefetched while articles are processed, so serve
+        # pages by URL rather than by call order. Page 2 is not available.
+        pages = {
+            "https://example.com/main": MOCK_MARKDOWN,
+            "https://example.com/article1": MOCK_ARTICLE_MARKDOWN,
+            "https://example.com/article2": MOCK_ARTICLE_MARKDOWN,
+        }
+        mock_fetch_page.side_effect = lambda url: pages[url]
         mock_extract_links.return_value = [
             "https://example.com/article1",
             "https://example.com/article2"
@@ -126,9 +148,237 @@ class TestScraper(unittest.TestCase):
         mock_filter_article.return_value = json.loads(MOCK_FILTERED_ARTICLE_RESPONSE)
 
         async def run():
-            articles, next_pages = await scrape_all_articles("https://example.com/main")
+            articles, next_pages = await scrape_all_articles("https://example.com/main", listing_mode="separate")
             self.assertEqual(len(articles), 2)
             self.assertIn("https://example.com/article1", articles)
             self.assertIn("https://example.com/article2", articles)
             self.assertEqual(next_pages, ["https://example.com/page/2"])
         self.loop.run_until_complete(run())
+
+    @patch('src.scraper.filter_article_with_gemini')
+    @patch('src.scraper.extract_next_page_link_from_markdown_with_gemini')
+    @patch('src.scraper.extract_links_from_markdown_with_gemini')
+    @patch('src.scraper.ScraperClient.fetch_page')
+    def test_scrape_all_articles_prefetches_listing_pages(self, mock_fetch_page, mock_extract_links, mock_extract_next, mock_filter_article):
+        fetch_order = []
+
+        async def fetch(url):
+            fetch_order.append(url)
+            if "article" in url:
+                await asyncio.sleep(0.01)
+            return url
+
+        mock_fetch_page.side_effect = fetch
+        mock_extract_links.side_effect = lambda markdown, page_url, **_: [f"{page_url}/article{i}" for i in range(3)]
+        mock_extract_next.side_effect = lambda markdown, page_url, **_: None if page_url.endswith("2") else "https://example.com/page2"
+        mock_filter_article.return_value = json.loads(MOCK_FILTERED_ARTICLE_RESPONSE)
+
+        async def run():
+            articles, next_pages = await scrape_all_articles("https://example.com/page1", prefetch_depth=1, listing_mode="separate")
+            self.assertEqual(list(articles), [f"https://example.com/page{p}/article{i}" for p in (1, 2) for i in range(3)])
+            self.assertEqual(next_pages, ["https://example.com/page2"])
+            # The second listing page is fetched before the first page's articles
+            self.assertLess(fetch_order.index("https://example.com/page2"), fetch_order.index("https://example.com/page1/article0"))
+        self.loop.run_until_complete(run())
+
+    @patch('src.config.ARTICLE_CHUNK_TOKENS', 10)
+    @patch('src.config.ARTICLE_CHUNK_MIN_TOKENS', 20)
+    @patch('src.scraper.gemini_client', new_callable=mock_gemini_client)
+    def test_filter_article_with_gemini_translates_long_articles_in_chunks(self, gemini_client):
+        mock_gemini = gemini_client.aio.models.generate_content
+        paragraphs = [f"الفقرة رقم {i} من هذا الدرس الطويل" for i in range(1, 4)]
+
+        async def respond(model, contents):
+            part = next(i for i, paragraph in enumerate(paragraphs, 1) if paragraph in contents)
+            await asyncio.sleep(0.01 * (4 - part))  # later parts finish first
+            result = {"content": f"محتوى {part}", "content_english": f"Paragraph {part}"}
+            if "part 1 of" in contents:
+                result.update(title="عنوان", title_english="Title")
+            response = MagicMock()
+            response.text = json.dumps(result)
+            return response
+        mock_gemini.side_effect = respond
+
+        filtered = self.loop.run_until_complete(filter_article_with_gemini("\n\n".join(paragraphs)))
+        self.assertEqual(mock_gemini.call_count, 3)
+        self.assertEqual(filtered, {
+            "title": "عنوان",
+            "title_english": "Title",
+            "content": "محتوى 1\n\nمحتوى 2\n\nمحتوى 3",
+            "content_english": "Paragraph 1\n\nParagraph 2\n\nParagraph 3",
+        })
+
+        # A failed chunk drops the whole article rather than leaving a gap
+        mock_gemini.side_effect = None
+        mock_gemini.return_value = MagicMock(text="not json")
+        self.assertIsNone(self.loop.run_until_complete(filter_article_with_gemini("\n\n".join(paragraphs) + "\n\nx")))
+
+    @patch('src.scraper.gemini_client', new_callable=mock_gemini_client)
+    def test_filter_article_with_gemini_uses_llm_cache(self, gemini_client):
+        mock_gemini = gemini_client.aio.models.generate_content
+        mock_resp = MagicMock()
+        mock_resp.text = MOCK_FILTERED_ARTICLE_RESPONSE
+        mock_gemini.return_value = mock_resp
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LLMCache(os.path.join(tmp, "llm.sqlite3"))
+            first = self.loop.run_until_complete(filter_article_with_gemini(MOCK_ARTICLE_MARKDOWN, llm_cache=cache))
+            second = self.loop.run_until_complete(filter_article_with_gemini(MOCK_ARTICLE_MARKDOWN, llm_cache=cache))
+            cache.close()
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_gemini.call_count, 1)
+        self.assertEqual(cache.hits, 1)
+
+    @patch('src.scraper.gemini_client', new_callable=mock_gemini_client)
+    @patch('src.scraper.extract_listing_links')
+    @patch('src.scraper.ScraperClient.fetch_page')
+    def test_crawl_llm_cache_survives_learned_boilerplate(self, mock_fetch_page, mock_extract_listing, gemini_client):
+        footer = "We use cookies to improve your experience. By continuing you accept our cookie policy."
+        pages = {
+            "https://example.com/main": MOCK_MARKDOWN,
+            "https://example.com/article1": f"# Lesson one\n\nFirst body.\n\n{footer}",
+            "https://example.com/article2": f"# Lesson two\n\nSecond body.\n\n{footer}",
+        }
+        mock_fetch_page.side_effect = lambda url: pages[url]
+        mock_extract_listing.return_value = (["https://example.com/article1", "https://example.com/article2"], None)
+        mock_gemini = gemini_client.aio.models.generate_content
+        mock_gemini.return_value = MagicMock(text=MOCK_FILTERED_ARTICLE_RESPONSE)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LLMCache(os.path.join(tmp, "llm.sqlite3"))
+            # The footer is learned as boilerplate during the first crawl, so
+            # the second one trims both articles differently.
+            preprocessor = MarkdownPreprocessor(None, min_pages=2)
+            for _ in range(2):
+                articles, _ = self.loop.run_until_complete(crawl(
+                    ["https://example.com/main"], fetch_concurrency=1, llm_concurrency=1,
+                    llm_cache=cache, preprocessor=preprocessor,
+                ))
+                self.assertEqual(len(articles), 2)
+            cache.close()
+
+        self.assertEqual(mock_gemini.call_count, 2)
+        self.assertEqual(cache.hits, 2)
+
+    @patch('src.scraper.extract_next_page_link_from_markdown_with_gemini')
+    @patch('src.scraper.extract_links_from_markdown_with_gemini')
+    def test_extract_listing_links_falls_back_to_gemini_and_learns(self, mock_extract_links, mock_extract_next):
+        mock_extract_links.return_value = ["https://example.com/article1", "https://example.com/article2"]
+        extractor = LinkExtractor(patterns_path=None)
+        first = self.loop.run_until_complete(extract_listing_links(
+            MOCK_MARKDOWN, "https://example.com/main", link_extractor=extractor, listing_mode="separate"))
+        second = self.loop.run_until_complete(extract_listing_links(
+            MOCK_MARKDOWN, "https://example.com/main", link_extractor=extractor, listing_mode="separate"))
+
+        # Only the low-confidence article links needed Gemini, and only once.
+        self.assertEqual(mock_extract_links.call_count, 1)
+        mock_extract_next.assert_not_called()
+        self.assertEqual(first, (["https://example.com/article1", "https://example.com/article2"], "https://example.com/page/2"))
+        self.assertEqual(second, first)
+
+    @patch('src.scraper.gemini_client', new_callable=mock_gemini_client)
+    def test_extract_listing_with_gemini(self, gemini_client):
+        mock_gemini = gemini_client.aio.models.generate_content
+        mock_resp = MagicMock()
+        mock_resp.text = json.dumps({"articles": ["/article2", "https://example.com/article1", "/article2"], "next_page": "/page/2"})
+        mock_gemini.return_value = mock_resp
+
+        async def run():
+            links, next_page = await extract_listing_with_gemini(MOCK_MARKDOWN, "https://example.com/main")
+            # Duplicates are dropped, keeping the page's order.
+            self.assertEqual(links, ["https://example.com/article2", "https://example.com/article1"])
+            self.assertEqual(next_page, "https://example.com/page/2")
+        self.loop.run_until_complete(run())
+        self.assertEqual(mock_gemini.call_count, 1)
+
+    @patch('src.scraper.extract_next_page_link_from_markdown_with_gemini')
+    @patch('src.scraper.extract_links_from_markdown_with_gemini')
+    @patch('src.scraper.extract_listing_with_gemini')
+    def test_extract_listing_links_combined_mode_falls_back_to_separate_calls(self, mock_combined, mock_extract_links, mock_extract_next):
+        mock_combined.return_value = None
+        mock_extract_links.return_value = ["https://example.com/article1"]
+        mock_extract_next.return_value = None
+
+        result = self.loop.run_until_complete(extract_listing_links(MOCK_MARKDOWN, "https://example.com/main"))
+
+        self.assertEqual(result, (["https://example.com/article1"], None))
+        mock_combined.assert_called_once()
+        mock_extract_links.assert_called_once()
+        mock_extract_next.assert_called_once()
+
+    @patch('src.scraper.filter_article_with_gemini')
+    @patch('src.scraper.extract_next_page_link_from_markdown_with_gemini')
+    @patch('src.scraper.extract_links_from_markdown_with_gemini')
+    @patch('src.scraper.ScraperClient.fetch_page')
+    def test_crawl_shares_visited_index_across_seeds(self, mock_fetch_page, mock_extract_links, mock_extract_next, mock_filter_article):
+        mock_fetch_page.side_effect = lambda url: url
+        listings = {
+            "https://example.com/level/1": ["https://example.com/shared", "https://example.com/a"],
+            "https://example.com/level/2": ["https://example.com/shared?utm_source=level2", "https://example.com/b"],
+        }
+        mock_extract_links.side_effect = lambda markdown, page_url, **_: listings[page_url]
+        mock_extract_next.return_value = None
+        mock_filter_article.return_value = json.loads(MOCK_FILTERED_ARTICLE_RESPONSE)
+
+        articles, _ = self.loop.run_until_complete(crawl(list(listings), per_host_delay=0, listing_mode="separate"))
+
+        self.assertEqual(len(articles), 3)
+        self.assertEqual(mock_filter_article.call_count, 3)
+        self.assertEqual(list(articles)[-1], "https://example.com/b")
+
+    @patch('src.scraper.filter_article_with_gemini')
+    @patch('src.scraper.extract_next_page_link_from_markdown_with_gemini')
+    @patch('src.scraper.extract_links_from_markdown_with_gemini')
+    @patch('src.scraper.ScraperClient.fetch_page')
+    def test_crawl_resumes_from_journal(self, mock_fetch_page, mock_extract_links, mock_extract_next, mock_filter_article):
+        mock_fetch_page.side_effect = lambda url: url
+        mock_extract_links.side_effect = lambda markdown, page_url, **_: [f"{page_url}/a", f"{page_url}/b"]
+        mock_extract_next.side_effect = lambda markdown, page_url, **_: None if page_url.endswith("2") else "https://example.com/page2"
+        article = json.loads(MOCK_FILTERED_ARTICLE_RESPONSE)
+        # The first run is interrupted before page 1's second article is translated
+        mock_filter_article.side_effect = lambda markdown, **_: None if markdown == "https://example.com/page1/b" else article
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "journal.jsonl")
+            journal = CrawlJournal(path, fsync=False)
+            first, _ = self.loop.run_until_complete(crawl(["https://example.com/page1"], per_host_delay=0, journal=journal, listing_mode="separate"))
+            journal.close()
+            self.assertEqual(len(first), 3)
+
+            mock_fetch_page.reset_mock()
+            mock_filter_article.reset_mock()
+            mock_filter_article.side_effect = None
+            mock_filter_article.return_value = article
+            journal = CrawlJournal(path, resume=True, fsync=False)
+            second, next_pages = self.loop.run_until_complete(crawl(["https://example.com/page1"], per_host_delay=0, journal=journal, listing_mode="separate"))
+            journal.close()
+
+        self.assertEqual(list(second), [
+            "https://example.com/page1/a", "https://example.com/page1/b",
+            "https://example.com/page2/a", "https://example.com/page2/b",
+        ])
+        self.assertEqual(next_pages, ["https://example.com/page2"])
+        self.assertEqual([c.args[0] for c in mock_fetch_page.call_args_list], ["https://example.com/page1/b"])
+        self.assertEqual(mock_filter_article.call_count, 1)
+
+    @patch('src.scraper.filter_article_with_gemini')
+    @patch('src.scraper.extract_next_page_link_from_markdown_with_gemini')
+    @patch('src.scraper.extract_links_from_markdown_with_gemini')
+    @patch('src.scraper.ScraperClient.fetch_page')
+    def test_crawl_writes_articles_to_corpus(self, mock_fetch_page, mock_extract_links, mock_extract_next, mock_filter_article):
+        mock_fetch_page.side_effect = lambda url: url
+        listings = {
+            "https://example.com/level/elementary": ["https://example.com/a", "https://example.com/b"],
+            "https://example.com/level/advanced": ["https://example.com/c"],
+        }
+        mock_extract_links.side_effect = lambda markdown, page_url, **_: listings[page_url]
+        mock_extract_next.return_value = None
+        mock_filter_article.return_value = json.loads(MOCK_FILTERED_ARTICLE_RESPONSE)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = CorpusStore(os.path.join(tmp, "corpus.sqlite3"))
+            self.loop.run_until_complete(crawl(list(listings), per_host_delay=0, corpus=corpus, keep_results=False, listing_mode="separate"))
+            self.assertEqual(list(corpus.select()), ["https://example.com/a", "https://example.com/b", "https://example.com/c"])
+            self.assertEqual(list(corpus.select(level="advanced")), ["https://example.com/c"])
+            corpus.close()
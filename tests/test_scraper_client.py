@@ -0,0 +1,90 @@
+import unittest
+import asyncio
+import contextlib
+import time
+
+import aiohttp
+from aiohttp import web
+
+from src.latency_tracker import LatencyTracker
+from src.scraper_client import ScraperClient
+
+
+class TestResilientFetch(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.requests = 0
+        self.release = asyncio.Event()
+
+    async def slow_response(self, text):
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.release.wait(), 2)
+        return web.Response(text=text)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def fetch(self, respond, times=1, **client_options):
+        """Fetch a page times times from a local server whose n-th request is answered by respond(n)."""
+        async def handle(request):
+            self.requests += 1
+            return await respond(self.requests)
+
+        async def run():
+            app = web.Application()
+            app.router.add_get('/page', handle)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            host, port = runner.addresses[0][:2]
+            try:
+                async with ScraperClient("", direct_hosts=[host], **client_options) as scraper:
+                    for _ in range(times):
+                        page = await scraper.fetch_page(f"http://{host}:{port}/page")
+                    return page
+            finally:
+                # Let slow handlers still waiting on the server finish first.
+                self.release.set()
+                await asyncio.sleep(0.05)
+                await runner.cleanup()
+
+        return self.loop.run_until_complete(run())
+
+    def test_transient_errors_are_retried(self):
+        async def respond(n):
+            return web.Response(status=503) if n < 3 else web.Response(text="page")
+
+        self.assertEqual(self.fetch(respond, retry_base_delay=0.01), "page")
+        self.assertEqual(self.requests, 3)
+
+    def test_missing_pages_are_not_retried(self):
+        async def respond(n):
+            return web.Response(status=404)
+
+        with self.assertRaises(aiohttp.ClientResponseError):
+            self.fetch(respond, retry_base_delay=0.01)
+        self.assertEqual(self.requests, 1)
+
+    def test_timed_out_request_is_retried(self):
+        async def respond(n):
+            return await self.slow_response("slow") if n == 1 else web.Response(text="page")
+
+        tracker = LatencyTracker(max_timeout=0.2, hedge_percentile=0)
+        self.assertEqual(self.fetch(respond, latency=tracker, retry_base_delay=0.01), "page")
+        self.assertEqual(self.requests, 2)
+
+    def test_slow_request_is_hedged(self):
+        async def respond(n):
+            # The first request gives the host a latency sample, the second stalls.
+            return await self.slow_response("slow") if n == 2 else web.Response(text=f"response {n}")
+
+        start = time.perf_counter()
+        page = self.fetch(respond, times=2, latency=LatencyTracker(min_samples=1, min_timeout=5.0))
+        self.assertEqual(page, "response 3")
+        self.assertLess(time.perf_counter() - start, 1.5)
+        self.assertEqual(self.requests, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
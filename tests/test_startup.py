@@ -0,0 +1,62 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Wall-clock budget for importing everything `main.py render` needs. It is
+# about 0.5s on a laptop; the margin absorbs slow CI machines.
+RENDER_STARTUP_BUDGET = 2.0
+
+# Only the crawl command needs these.
+CRAWL_ONLY_MODULES = ("google.genai", "dotenv", "aiohttp", "bs4", "tqdm")
+
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import src.main
+args, _ = src.main.parse_args(["render", "--dummy-data"])
+cli_modules = set(sys.modules)
+import src.pdf_generator
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "cli_modules": sorted(cli_modules),
+    "render_modules": sorted(sys.modules),
+    "command": args.command,
+}))
+"""
+
+
+def measure_startup():
+    """Import the render path in a fresh interpreter and report what it loaded."""
+    env = {key: value for key, value in os.environ.items() if key != "GEMINI_API_KEY"}
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT], cwd=PROJECT_ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+class TestStartup(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.startup = measure_startup()
+
+    def test_render_path_does_not_load_crawl_dependencies(self):
+        self.assertEqual(self.startup["command"], "render")
+        loaded = set(self.startup["render_modules"])
+        for module in CRAWL_ONLY_MODULES:
+            self.assertNotIn(module, loaded)
+
+    def test_parsing_arguments_does_not_load_the_pdf_stack(self):
+        self.assertNotIn("fpdf", self.startup["cli_modules"])
+        self.assertNotIn("src.scraper", self.startup["cli_modules"])
+
+    def test_render_path_fits_startup_budget(self):
+        self.assertLess(self.startup["seconds"], RENDER_STARTUP_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
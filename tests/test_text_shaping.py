@@ -0,0 +1,69 @@
+import unittest
+import os
+import tempfile
+
+import arabic_reshaper
+import bidi.algorithm
+
+from src.dummy_articles import DUMMY_ARTICLES
+from src.text_shaping import TextShaper, shape_line
+
+
+def shape_whole_string(text):
+    return bidi.algorithm.get_display(arabic_reshaper.reshape(text))
+
+
+class TestTextShaper(unittest.TestCase):
+    def test_shape_line_matches_stock_reshaper(self):
+        for article in DUMMY_ARTICLES.values():
+            self.assertEqual(shape_line(article['content']), shape_whole_string(article['content']))
+
+    def test_lines_are_resolved_independently(self):
+        text = "Hello\nمرحبا بك يا صديقي 12 3\n- بند"
+        shaper = TextShaper()
+        shaped = shaper.shape(text).split("\n")
+        self.assertEqual(shaped, [shape_line(line, "L") for line in text.split("\n")])
+        # Shaped as a whole, the dash would take the direction of the line above.
+        self.assertTrue(shaped[2].startswith("- "))
+        self.assertNotEqual(shaper.shape(text), shape_whole_string(text))
+
+    def test_line_by_line_matches_whole_string(self):
+        # Where no line's edges depend on its neighbours, the output is unchanged.
+        texts = [
+            "الدرس الأول\n\nمرحبا بكم في الدرس (1)\nالمفردات: كتاب، قلم",
+            # Mixed directions: every line takes the direction of the first one.
+            "English line\nسطر عربي - 45%",
+            "سطر عربي\nEnglish line (2) - 45%",
+        ]
+        shaper = TextShaper()
+        for text in texts:
+            self.assertEqual(shaper.shape(text), shape_whole_string(text))
+
+    def test_repeated_lines_hit_the_cache(self):
+        shaper = TextShaper()
+        shaper.shape("المفردات\nكتاب")
+        shaper.shape("المفردات\nقلم")
+        self.assertEqual((shaper.hits, shaper.misses), (1, 3))
+
+    def test_cache_is_bounded(self):
+        shaper = TextShaper(max_entries=2)
+        for word in ("كتاب", "قلم", "بيت"):
+            shaper.shape(word)
+        self.assertEqual(len(shaper), 2)
+        shaper.shape("كتاب")
+        self.assertEqual(shaper.hits, 0)
+
+    def test_persists_across_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "shaped.json")
+            first_run = TextShaper(path=path)
+            first_run.shape("مرحبا بكم")
+            first_run.save()
+
+            shaper = TextShaper(path=path)
+            shaper.shape("مرحبا بكم")
+            self.assertEqual((shaper.hits, shaper.misses), (1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()